@@ -6,12 +6,25 @@ import streamlit as st
 import json
 from datetime import datetime
 import pandas as pd
+from app.lead_ranking import LeadIndex, LeadRanker
 from app.orchestrator import CareerCopilotOrchestrator
+from app.resume_session import ResumeSession
+from app.tracing import tracer
+from app.tracker_store import (
+    STATUSES,
+    per_week,
+    query_applications,
+    response_time_by_source,
+    status_funnel,
+)
+from tools.ats_scoring import ATSScoreInput, ats_score
+from tools.skill_taxonomy import profile_index
 from config import config
 
 # Initialize orchestrator
 @st.cache_resource
 def get_orchestrator():
+    tracer.start_exporters()
     return CareerCopilotOrchestrator()
 
 orchestrator = get_orchestrator()
@@ -86,11 +99,11 @@ def main():
     setup_sidebar()
     
     # Main tabs
-    # Note: Job Tracker tab temporarily disabled for hackathon submission due to API limitations
-    tab1, tab2, tab3 = st.tabs([
+    tab1, tab2, tab3, tab4 = st.tabs([
         "📧 Job Email Scanner", 
         "📄 Resume Optimizer", 
         "🎤 Interview Prep", 
+        "📊 Job Tracker",
     ])
     
     with tab1:
@@ -102,10 +115,8 @@ def main():
     with tab3:
         interview_prep()
     
-    # Job Tracker hidden for hackathon submission
-    # Uncomment for future development
-    # with tab4:
-    #     job_tracker()
+    with tab4:
+        job_tracker()
 
 def setup_sidebar():
     """Setup user profile sidebar"""
@@ -125,10 +136,14 @@ def setup_sidebar():
         value=st.session_state.user_profile.get('email', '')
     )
     
+    # "Auto" (None) lets the ATS score use the years derived from the resume
+    experience_options = [None, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 15, 20]
+    current_years = st.session_state.user_profile.get('experience_years')
     st.session_state.user_profile['experience_years'] = st.sidebar.selectbox(
         "Years of Experience",
-        options=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 15, 20],
-        index=st.session_state.user_profile.get('experience_years', 2)
+        options=experience_options,
+        index=experience_options.index(current_years) if current_years in experience_options else 0,
+        format_func=lambda years: "Auto (from resume)" if years is None else str(years)
     )
     
     st.session_state.user_profile['current_role'] = st.sidebar.text_input(
@@ -147,6 +162,10 @@ def setup_sidebar():
         value=st.session_state.user_profile.get('skills', ''),
         height=100
     )
+    # Built once per sidebar change and shared by the ATS score, JD parser and interview prompt
+    skill_profile = profile_index(user_profile=st.session_state.user_profile)
+    if skill_profile.sidebar_skills:
+        st.sidebar.caption("🧠 Recognized skills: " + ", ".join(skill_profile.sidebar_skills))
     
     st.sidebar.markdown("---")
     st.sidebar.markdown("**Configuration Status**")
@@ -164,9 +183,9 @@ def setup_sidebar():
         st.sidebar.warning("☁️ Running w/out PORTIA_API_KEY (tools may be unavailable)")
 
     if status["google_oauth_ready"]:
-        st.sidebar.success("✅ Google OAuth vars present")
+        st.sidebar.success("✅ Google account connected")
     else:
-        st.sidebar.warning("🔑 Google OAuth incomplete")
+        st.sidebar.warning("🔑 Google not connected: run `python cli.py google-auth`")
 
     if status["sheet_target_ready"]:
         st.sidebar.info("📄 Sheet target configured")
@@ -267,22 +286,28 @@ def job_email_scanner():
                     st.code(str(e))
 
 def display_job_emails(result):
-    """Display job email results"""
+    """Display job email results, most urgent first (priority and deadline are computed locally)"""
     if 'job_emails' in result and result['job_emails']:
         st.success(f"✅ Found {len(result['job_emails'])} job-related emails!")
         
+        ranker = LeadRanker(st.session_state.user_profile.get('target_roles', ''))
+        ranked = [(ranker.rank(email), email) for email in result['job_emails']]
+        ranked.sort(key=lambda pair: pair[0]['score'], reverse=True)
+        emails = [{**email, 'priority': rank['priority'], 'deadline': rank['deadline'] or email.get('deadline')}
+                  for rank, email in ranked]
+        
         # Summary
-        if 'summary' in result:
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Emails", result['summary'].get('total_emails', 0))
-            with col2:
-                st.metric("High Priority", result['summary'].get('high_priority', 0))
-            with col3:
-                st.metric("Companies", len(result['summary'].get('companies', [])))
+        summary = result.get('summary') or {}
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Emails", summary.get('total_emails', len(emails)))
+        with col2:
+            st.metric("High Priority", sum(email['priority'] == 'High' for email in emails))
+        with col3:
+            st.metric("Companies", len(summary.get('companies') or {e.get('company') for e in emails}))
         
         # Email list
-        for i, email in enumerate(result['job_emails']):
+        for i, email in enumerate(emails):
             with st.expander(f"📩 {email.get('subject', 'No Subject')} - {email.get('company', 'Unknown')}"):
                 col1, col2 = st.columns(2)
                 with col1:
@@ -333,15 +358,26 @@ def resume_optimizer():
         
         if st.button("🚀 Optimize Resume", type="primary", use_container_width=True):
             if final_resume_text and job_description:
-                with st.spinner("Analyzing your resume and optimizing for the target role..."):
+                # The ATS score is local and instant; only the suggestions wait on the LLM
+                years = st.session_state.user_profile.get('experience_years')
+                display_ats_score(ats_score(ATSScoreInput(
+                    resume_text=final_resume_text,
+                    job_description=job_description,
+                    experience_years=years if isinstance(years, int) else None,
+                )))
+                with st.spinner("Writing improvement suggestions for the target role..."):
                     try:
+                        # Per-user session: follow-up clicks only re-analyze edited sections
+                        if 'resume_session' not in st.session_state:
+                            st.session_state.resume_session = ResumeSession()
                         result = orchestrator.analyze_resume_and_job(
                             final_resume_text,
                             job_description,
-                            st.session_state.user_profile
+                            st.session_state.user_profile,
+                            session=st.session_state.resume_session,
                         )
-                        if 'error' in result:
-                            st.error(f"❌ Error: {result['error']}")
+                        if result.error:
+                            st.error(f"❌ Error: {result.error}")
                         else:
                             display_resume_analysis(result)
                     except Exception as e:
@@ -385,8 +421,8 @@ def interview_prep():
                             job_description, 
                             st.session_state.user_profile
                         )
-                        if 'error' in result:
-                            st.error(f"❌ Error: {result['error']}")
+                        if result.error:
+                            st.error(f"❌ Error: {result.error}")
                         else:
                             st.markdown("---")
                             st.markdown("<h4 style='color:#1f77b4;'>📝 Interview Q&A</h4>", unsafe_allow_html=True)
@@ -398,43 +434,26 @@ def interview_prep():
 
 def display_interview_questions(result):
     """Display interview questions and answers"""
-    if 'interview_prep' in result:
+    if result.interview_prep:
         st.success("✅ Interview preparation ready!")
-        # Show final_output or value if present
-        if 'final_output' in result and result['final_output']:
-            st.markdown("---")
-            st.markdown("<h4 style='color:#1f77b4;'>📝 Interview Q&A</h4>", unsafe_allow_html=True)
-            st.write(result['final_output'])
-        elif 'value' in result and result['value']:
-            st.markdown("---")
-            st.markdown("<h4 style='color:#1f77b4;'>📝 Interview Q&A</h4>", unsafe_allow_html=True)
-            st.write(result['value'])
-        questions = result['interview_prep']
-        # If questions is a string, just print it
-        if isinstance(questions, str):
-            st.write(questions)
-            return
-        # Otherwise group by category
+        # Group by category
         categories = {}
-        for q in questions:
-            cat = q.get('category', 'general')
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(q)
+        for q in result.interview_prep:
+            categories.setdefault(q.category or 'general', []).append(q)
         for category, cat_questions in categories.items():
             st.subheader(f"📚 {category.title()} Questions")
             for i, q in enumerate(cat_questions, 1):
-                with st.expander(f"Q{i}: {q.get('question', 'No question')}"):
-                    if 'sample_answer' in q:
+                with st.expander(f"Q{i}: {q.question}"):
+                    if q.sample_answer:
                         st.markdown("**💡 Sample Answer:**")
-                        st.write(q['sample_answer'])
-                    if 'key_points' in q and q['key_points']:
+                        st.write(q.sample_answer)
+                    if q.key_points:
                         st.markdown("**🎯 Key Points to Cover:**")
-                        for point in q['key_points']:
+                        for point in q.key_points:
                             st.write(f"• {point}")
-                    if 'interviewer_focus' in q:
+                    if q.interviewer_focus:
                         st.markdown("**🔍 What the Interviewer is Evaluating:**")
-                        st.info(q['interviewer_focus'])
+                        st.info(q.interviewer_focus)
 
 def job_tracker():
     """Job application tracker using Google Sheets"""
@@ -478,8 +497,8 @@ def job_tracker():
                 try:
                     result = orchestrator.update_job_tracker(job_data)
                     
-                    if 'error' in result:
-                        st.error(f"❌ Error: {result['error']}")
+                    if result.error:
+                        st.error(f"❌ Error: {result.error}")
                     else:
                         st.success("✅ Application added to tracker!")
                         # Optionally show details for debugging
@@ -490,6 +509,101 @@ def job_tracker():
         else:
             st.warning("⚠️ Please provide at least company name and position.")
 
+    tracker_dashboard()
+
+# Cached on the store version: reruns (every widget change) reuse results until the local copy is written
+@st.cache_data(show_spinner=False, max_entries=8)
+def tracker_summary(version):
+    apps = orchestrator.tracker_store.load("applications")
+    sources = sorted(apps["source"].dropna().unique().tolist())
+    return len(apps), sources, status_funnel(apps), response_time_by_source(apps), per_week(apps)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def urgent_leads(version, target_roles, today, k=10):
+    """Top-k scanned leads; ``today`` is part of the key because urgency and recency change daily."""
+    index = LeadIndex(LeadRanker(target_roles, today=today))
+    index.update(orchestrator.tracker_store.load("leads").to_dict("records"))
+    return pd.DataFrame(index.top(k), columns=["priority", "score", "company", "role", "deadline", "days_left",
+                                                "source", "url"])
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def tracker_page(version, statuses, sources, search, sort_by, page, page_size):
+    apps = orchestrator.tracker_store.load("applications")
+    return query_applications(apps, statuses=statuses, sources=sources, search=search, sort_by=sort_by,
+                              page=page, page_size=page_size)
+
+def tracker_dashboard():
+    """Listing, filters and stats over the local tracker copy (app/tracker_store.py)."""
+    st.subheader("📈 Your Applications")
+    store = orchestrator.tracker_store
+    if store is None:
+        st.info("The local tracker copy is disabled (CAREER_COPILOT_TRACKER_STORE=off).")
+        return
+    
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        refresh = st.button("🔄 Refresh from Sheets", help="Pull rows added to the sheet since the last refresh")
+    with col2:
+        full = st.button("♻️ Full resync", help="Re-read the whole tab and update rows edited on the sheet")
+    if refresh or full:
+        with st.spinner("Syncing with Google Sheets..."):
+            try:
+                stats = orchestrator.sync_tracker(full=full)
+                with col3:
+                    st.caption(f"Pulled {stats['pulled']} row(s); {stats['changed']} changed, {stats['added']} new.")
+            except Exception as e:
+                st.error(f"❌ Sync failed: {str(e)}")
+    
+    version = store.version()
+    top = urgent_leads(version, st.session_state.user_profile.get('target_roles', ''), datetime.now().date())
+    if not top.empty:
+        with st.expander(f"🔥 Most urgent scanned leads ({len(top)})", expanded=True):
+            st.dataframe(top, hide_index=True, use_container_width=True)
+    
+    total, sources, funnel, by_source, weekly = tracker_summary(version)
+    if not total:
+        st.info("No applications yet. Add one above or refresh from your Google Sheet.")
+        return
+    
+    counts = funnel.set_index("status")["count"]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Applications", total)
+    m2.metric("Interviews", int(counts[["Interview Scheduled", "Interviewed"]].sum()))
+    m3.metric("Offers", int(counts["Offer"]))
+    m4.metric("Response rate", f"{by_source['responses'].sum() / total:.0%}")
+    
+    with st.expander("📊 Funnel, response times and weekly volume"):
+        c1, c2 = st.columns(2)
+        with c1:
+            st.bar_chart(funnel.set_index("status")["reached"])
+        with c2:
+            st.dataframe(by_source, hide_index=True, use_container_width=True)
+        st.line_chart(weekly.set_index("week")["count"])
+    
+    f1, f2, f3, f4 = st.columns([2, 2, 2, 1])
+    with f1:
+        statuses = st.multiselect("Status", STATUSES, key="tracker_status")
+    with f2:
+        chosen_sources = st.multiselect("Source", sources, key="tracker_source")
+    with f3:
+        search = st.text_input("Search company or position", key="tracker_search")
+    with f4:
+        page_size = st.selectbox("Rows", [25, 50, 100], index=1, key="tracker_page_size")
+    
+    filters = (tuple(statuses), tuple(chosen_sources), search, page_size)
+    if st.session_state.get("tracker_filters") != filters:
+        st.session_state.tracker_filters = filters
+        st.session_state.tracker_page = 1
+    page = st.session_state.get("tracker_page", 1)
+    rows, matched = tracker_page(version, *filters[:3], "date_applied", page - 1, page_size)
+    pages = max(1, -(-matched // page_size))
+    if page > pages:  # the copy shrank since the page was picked
+        page = st.session_state.tracker_page = pages
+        rows, matched = tracker_page(version, *filters[:3], "date_applied", page - 1, page_size)
+    st.caption(f"{matched} matching application(s)")
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+    st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="tracker_page")
+
 def add_to_tracker(email_data):
     """Add email data to job tracker"""
     job_data = {
@@ -506,10 +620,10 @@ def add_to_tracker(email_data):
     
     try:
         result = orchestrator.update_job_tracker(job_data)
-        if 'error' not in result:
+        if result.ok:
             st.success("✅ Added to job tracker!")
         else:
-            st.error(f"❌ Failed to add: {result['error']}")
+            st.error(f"❌ Failed to add: {result.error}")
     except Exception as e:
         st.error(f"❌ Error: {str(e)}")
 
@@ -524,17 +638,33 @@ def get_ats_feedback(score):
     else:
         return "Poor match. Major revisions required to pass ATS screening."
 
+def display_ats_score(ats):
+    """Display the local ATS score with its per-feature breakdown"""
+    st.metric("🎯 ATS Compatibility Score", f"{ats.ats_score}/100")
+    st.progress(min(ats.ats_score, 100) / 100)
+    st.caption(get_ats_feedback(ats.ats_score))
+    if ats.breakdown:
+        st.dataframe(
+            pd.DataFrame([
+                {"Feature": f.name.replace("_", " ").title(), "Points": f"{f.points:g}/{f.weight:g}", "Why": f.detail}
+                for f in ats.breakdown
+            ]),
+            hide_index=True,
+            use_container_width=True,
+        )
+
 def display_resume_analysis(result):
     """Display resume analysis results"""
-    if isinstance(result, dict):
+    if result.ok:
         st.success("✅ Resume analysis completed!")
-        ats_raw = result.get('ats_score', "0")
-        import re
-        score_match = re.search(r"(\d{1,3})", str(ats_raw))
-        ats_score = int(score_match.group(1)) if score_match else 0
-        st.metric("🎯 ATS Compatibility Score", f"{ats_score}/100")
-        st.progress(min(ats_score, 100) / 100)
-        # Only show ATS score for now (no summary or suggestions)
+        if result.reused_sections and result.changed_sections:
+            st.caption(f"♻️ Re-analyzed {', '.join(result.changed_sections)}; "
+                       f"kept suggestions for {', '.join(result.reused_sections)}")
+        elif result.reused_sections:
+            st.caption("♻️ No changes since the last analysis; suggestions reused")
+        if result.suggestions:
+            st.markdown("**💡 Suggestions:**")
+            st.markdown(result.suggestions)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,300 @@
+"""ASGI HTTP API over the orchestrator workflows, for many concurrent clients.
+
+Endpoints (JSON in, JSON out):
+    POST /v1/resume-analysis       {"resume_text", "job_description", "user_profile"?}
+    POST /v1/interview-questions   {"job_description", "user_profile"?}
+    POST /v1/job-tracker           {"job_data", "sheet_id"?, "sheet_tab"?}
+    POST /v1/gmail-scan            {"sheet_id"?, "sheet_tab"?, "demo"?, "direct"?, "query"?, ...}
+    GET  /healthz                  liveness plus queue/coalescing counters
+
+Workflows are blocking, so they run on a bounded thread pool. Identical requests that
+arrive while one is already in flight share its run (coalescing); once ``max_queue``
+distinct runs are pending, new ones get ``429`` with ``Retry-After``. Send
+``Accept: application/x-ndjson`` (or ``?stream=1``) to get a stream of events instead:
+``queued`` → ``progress``/``heartbeat`` … → ``result``. Heartbeats keep load balancers from
+dropping long runs, and Gmail scans report per-stage progress.
+
+The app keeps no state beyond in-flight runs, so instances can be scaled horizontally.
+Run it with any ASGI server, e.g. ``python -m app.api --port 8000`` (needs ``uvicorn``).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+MAX_BODY_BYTES = 1 << 20
+
+ENDPOINTS = {
+    # path: (orchestrator method, required fields, optional fields)
+    "/v1/resume-analysis": ("analyze_resume_and_job", ("resume_text", "job_description"), ("user_profile",)),
+    "/v1/interview-questions": ("generate_interview_questions", ("job_description",), ("user_profile",)),
+    "/v1/job-tracker": ("update_job_tracker", ("job_data",), ("sheet_id", "sheet_tab")),
+    "/v1/gmail-scan": ("gmail_to_sheets", (), (
+        "sheet_id", "sheet_tab", "demo", "direct", "query", "page_size", "max_messages", "extract_batch", "resume",
+        "group_threads", "target_roles", "attachments", "resume_file",
+    )),
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: list | None = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or []
+
+
+class _Flight:
+    """One in-flight workflow run and everyone waiting on it."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.submitted_at = time.time()
+        self.future = loop.create_future()
+        self.subscribers: list[asyncio.Queue] = []
+        self.waiters = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        events = asyncio.Queue()
+        self.subscribers.append(events)
+        return events
+
+    def publish(self, event: dict):
+        for events in self.subscribers:
+            events.put_nowait(event)
+
+
+class CareerCopilotAPI:
+    """The ASGI application. ``orchestrator`` is created on startup unless one is injected."""
+
+    def __init__(self, orchestrator=None, max_workers: int | None = None, max_queue: int | None = None,
+                 heartbeat_s: float = 10.0):
+        self.orchestrator = orchestrator
+        self.max_workers = max_workers or int(os.getenv("CAREER_COPILOT_API_WORKERS", "4"))
+        self.max_queue = max_queue or int(os.getenv("CAREER_COPILOT_API_MAX_QUEUE", "32"))
+        self.heartbeat_s = heartbeat_s
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="copilot-api")
+        self._inflight: dict[str, _Flight] = {}
+        self.stats = {"requests": 0, "runs": 0, "coalesced": 0, "rejected": 0, "errors": 0}
+        self.started_at = time.time()
+
+    # ---- ASGI entry point ------------------------------------------------------
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        try:
+            await self._route(scope, receive, send)
+        except HTTPError as e:
+            await self._json(send, e.status, {"error": str(e)}, e.headers)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                from app.tracing import tracer
+
+                tracer.start_exporters()
+                await asyncio.get_running_loop().run_in_executor(self._pool, self._get_orchestrator)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _get_orchestrator(self):
+        if self.orchestrator is None:
+            from app.orchestrator import CareerCopilotOrchestrator
+            self.orchestrator = CareerCopilotOrchestrator()
+        return self.orchestrator
+
+    # ---- routing ---------------------------------------------------------------
+    async def _route(self, scope, receive, send):
+        path, method = scope["path"], scope["method"]
+        if path == "/healthz" and method == "GET":
+            return await self._json(send, 200, self.health())
+        if path not in ENDPOINTS:
+            raise HTTPError(404, "not found")
+        if method != "POST":
+            raise HTTPError(405, "method not allowed", [(b"allow", b"POST")])
+        self.stats["requests"] += 1
+
+        name, required, optional = ENDPOINTS[path]
+        body = await self._read_json(receive)
+        missing = [field for field in required if not body.get(field)]
+        if missing:
+            raise HTTPError(400, f"missing field(s): {', '.join(missing)}")
+        unknown = set(body) - set(required) - set(optional)
+        if unknown:
+            raise HTTPError(400, f"unknown field(s): {', '.join(sorted(unknown))}")
+
+        flight = self._start(name, body)
+        if self._wants_stream(scope):
+            return await self._stream(send, flight)
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.future)
+        except Exception as e:
+            raise HTTPError(500, str(e))
+        await self._json(send, 200, result)
+
+    def health(self) -> dict:
+        from app import singleflight
+        from tools import google_transport
+
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "in_flight": len(self._inflight),
+            "max_queue": self.max_queue,
+            "workers": self.max_workers,
+            **self.stats,
+            "singleflight": singleflight.stats(),
+            "google_http": google_transport.stats(),
+        }
+
+    # ---- runs --------------------------------------------------------------------
+    def _start(self, name: str, body: dict) -> _Flight:
+        """Join an identical in-flight run, or start one if the queue has room."""
+        key = hashlib.sha256(f"{name}\n{json.dumps(body, sort_keys=True, default=str)}".encode()).hexdigest()
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.stats["coalesced"] += 1
+            return flight
+        if len(self._inflight) >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise HTTPError(429, "too many requests in flight, retry later", [(b"retry-after", b"5")])
+
+        loop = asyncio.get_running_loop()
+        flight = self._inflight[key] = _Flight(loop)
+        self.stats["runs"] += 1
+
+        def done(task):
+            self._inflight.pop(key, None)
+            # Cancelled when the server shuts down before the run left the queue
+            error = RuntimeError(f"{name} was cancelled: the server is shutting down") if task.cancelled() \
+                else task.exception()
+            if error is not None:
+                self.stats["errors"] += 1
+                flight.future.set_exception(error)
+                flight.publish({"event": "error", "error": str(error)})
+            else:
+                flight.future.set_result(task.result())
+                flight.publish({"event": "result", "result": task.result()})
+            if not flight.waiters:
+                flight.future.exception()  # nobody awaits it; mark retrieved
+
+        loop.run_in_executor(self._pool, self._run, name, body, flight).add_done_callback(done)
+        return flight
+
+    def _run(self, name: str, body: dict, flight: _Flight) -> dict:
+        from app.tracing import tracer
+
+        orch = self._get_orchestrator()
+        with tracer.queued(flight.submitted_at):
+            if name == "gmail_to_sheets":
+                result = self._run_gmail_scan(orch, body, flight)
+            else:
+                result = getattr(orch, name)(**body)
+        return result.model_dump(mode="json") if hasattr(result, "model_dump") else result
+
+    def _run_gmail_scan(self, orch, body: dict, flight: _Flight):
+        from app.daemon import run_gmail_to_sheets
+        from app.gmail_pipeline import PipelineProgress
+
+        last = [0.0]
+
+        def report(stage, counts):
+            # At most a few progress events per second, handed to the event loop thread
+            now = time.monotonic()
+            if now - last[0] >= 0.25:
+                last[0] = now
+                flight.loop.call_soon_threadsafe(flight.publish, {"event": "progress", "stages": dict(counts)})
+
+        params = {"sheet_id": os.getenv("SHEET_ID", ""), "sheet_tab": os.getenv("SHEET_TAB", "Applications"), **body}
+        if not params["sheet_id"]:
+            raise ValueError("Missing SHEET_ID (env or request body).")
+        return run_gmail_to_sheets(orch, progress=PipelineProgress(callback=report), **params)
+
+    # ---- responses -----------------------------------------------------------------
+    @staticmethod
+    def _wants_stream(scope) -> bool:
+        headers = dict(scope.get("headers") or [])
+        if b"application/x-ndjson" in headers.get(b"accept", b""):
+            return True
+        query = parse_qs(scope.get("query_string", b"").decode())
+        return query.get("stream", ["0"])[0] in ("1", "true")
+
+    async def _stream(self, send, flight: _Flight):
+        events = flight.subscribe()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson"), (b"cache-control", b"no-cache")]})
+
+        async def line(event: dict):
+            body = (json.dumps(event, default=str) + "\n").encode("utf-8")
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+
+        await line({"event": "queued", "in_flight": len(self._inflight)})
+        if flight.future.done():
+            # finished before we subscribed
+            error = flight.future.exception()
+            await line({"event": "error", "error": str(error)} if error else {"event": "result", "result": flight.future.result()})
+        else:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=self.heartbeat_s)
+                except asyncio.TimeoutError:
+                    await line({"event": "heartbeat"})
+                    continue
+                await line(event)
+                if event["event"] in ("result", "error"):
+                    break
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    @staticmethod
+    async def _read_json(receive) -> dict:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                break
+        try:
+            body = json.loads(b"".join(chunks) or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        return body
+
+    @staticmethod
+    async def _json(send, status: int, payload, headers: list | None = None):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                                *(headers or [])]})
+        await send({"type": "http.response.body", "body": body})
+
+
+app = CareerCopilotAPI()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Career Copilot HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The API server needs an ASGI server: pip install uvicorn")
+    uvicorn.run("app.api:app", host=args.host, port=args.port)
@@ -0,0 +1,179 @@
+"""Attachment stage of the Gmail pipeline: JDs and offer letters sent as PDF/DOCX files.
+
+    ... prefilter → attachments → extract ...
+
+For each job email with attached documents:
+
+* Bytes are fetched on a worker pool (``workers`` threads share the pooled Gmail client), so
+  a large file does not hold up the scan. Emails leave the stage in their original order,
+  with at most ``window`` of them waiting on downloads.
+* The base64 payload is decoded in chunks into a ``SpooledTemporaryFile`` (in memory up to
+  ``spool_bytes``, on disk past that) and hashed with SHA-256 as it is written. The file
+  is never held whole as decoded bytes.
+* Identical attachments (same hash; e.g. the same JD forwarded twice) are parsed once.
+* Text goes through ``read_resume_stream`` and the JD parser. Job descriptions are scored
+  against ``resume_text`` when one is given.
+
+The email gets an ``attachments`` summary (kind, skills, ATS score, a short excerpt), which
+the extraction prompt sees in place of the whole document.
+"""
+import base64
+import contextvars
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+
+from tools.ats_scoring import ATSScoreInput, ats_score, jd_sections
+from tools.jd_parser import JDNormalizeInput, normalize_jd
+from tools.resume_parser import read_resume_stream
+
+SUPPORTED_SUFFIXES = (".pdf", ".docx", ".txt", ".md")
+MAX_ATTACHMENT_BYTES = 10 * 1024 * 1024
+SPOOL_BYTES = 1024 * 1024
+MAX_TEXT_CHARS = 50_000
+EXCERPT_CHARS = 300
+_B64_CHUNK = 64 * 1024  # multiple of 4, so every chunk decodes on its own
+
+_OFFER = re.compile(r"offer letter|pleased to offer|offer of employment|we are delighted to offer|"
+                    r"your (?:start|joining) date|accept (?:this|the) offer", re.IGNORECASE)
+
+
+class _HashingWriter:
+    def __init__(self, out, limit: int):
+        self.out = out
+        self.limit = limit
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.limit:
+            raise ValueError(f"attachment larger than {self.limit} bytes")
+        self.digest.update(data)
+        self.out.write(data)
+
+
+def write_base64url(data: str, out) -> int:
+    """Decode base64url ``data`` into ``out`` chunk by chunk; returns the bytes written."""
+    data = data.rstrip("=")
+    written = 0
+    for start in range(0, len(data), _B64_CHUNK):
+        chunk = data[start:start + _B64_CHUNK]
+        decoded = base64.urlsafe_b64decode(chunk + "=" * (-len(chunk) % 4))
+        out.write(decoded)
+        written += len(decoded)
+    return written
+
+
+def gmail_fetcher(service) -> Callable[[str, dict, object], None]:
+    """``fetch(message_id, meta, out)`` for ``AttachmentStage`` over a Gmail API client."""
+
+    def fetch(message_id: str, meta: dict, out):
+        data = meta.get("data")
+        if not data:
+            data = service.users().messages().attachments().get(
+                userId="me", messageId=message_id, id=meta["id"]
+            ).execute().get("data", "")
+        write_base64url(data, out)
+
+    return fetch
+
+
+def supported(meta: dict, max_bytes: int = MAX_ATTACHMENT_BYTES) -> bool:
+    return meta.get("filename", "").lower().endswith(SUPPORTED_SUFFIXES) and (meta.get("size") or 0) <= max_bytes
+
+
+def classify(text: str) -> tuple[str, list[str]]:
+    """``("offer" | "jd" | "other", skills)`` for attachment text."""
+    skills = normalize_jd(JDNormalizeInput(text=text)).skills
+    if _OFFER.search(text[:5000]):
+        return "offer", skills
+    required, preferred, years = jd_sections(text)
+    if len(required | preferred) >= 2 or (skills and years):
+        return "jd", skills
+    return "other", skills
+
+
+class AttachmentStage:
+    """Fetch, dedupe and parse email attachments on a bounded worker pool."""
+
+    def __init__(self, fetch: Callable[[str, dict, object], None], resume_text: str | None = None,
+                 workers: int = 4, window: int = 8, spool_bytes: int = SPOOL_BYTES,
+                 max_bytes: int = MAX_ATTACHMENT_BYTES):
+        self.fetch = fetch
+        self.resume_text = resume_text
+        self.workers = workers
+        self.window = window
+        self.spool_bytes = spool_bytes
+        self.max_bytes = max_bytes
+        self.results: list[dict] = []  # one summary per distinct attachment, in completion order
+        self._by_hash: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def process(self, email: dict, meta: dict) -> dict:
+        """Runs on a worker: download into a spooled file, hash, and parse unless already seen."""
+        summary = {"filename": meta.get("filename", ""), "message_id": email.get("id", "")}
+        with tempfile.SpooledTemporaryFile(max_size=self.spool_bytes) as spool:
+            writer = _HashingWriter(spool, self.max_bytes)
+            self.fetch(email.get("id", ""), meta, writer)
+            sha = writer.digest.hexdigest()
+            with self._lock:
+                known = self._by_hash.get(sha)
+            if known is not None:
+                return {**known, **summary, "duplicate": True}
+            spool.seek(0)
+            text = read_resume_stream(spool, summary["filename"])[:MAX_TEXT_CHARS]
+
+        kind, skills = classify(text)
+        parsed = {"sha256": sha, "bytes": writer.size, "kind": kind, "skills": skills,
+                  "excerpt": " ".join(text.split())[:EXCERPT_CHARS]}
+        if kind == "jd" and self.resume_text:
+            parsed["ats_score"] = ats_score(ATSScoreInput(resume_text=self.resume_text, job_description=text)).ats_score
+        with self._lock:
+            # Two workers can race on the same new file; the first one recorded wins
+            if sha in self._by_hash:
+                return {**self._by_hash[sha], **summary, "duplicate": True}
+            self._by_hash[sha] = parsed
+            self.results.append({**parsed, **summary})
+        return {**parsed, **summary, "duplicate": False}
+
+    def run(self, emails: Iterable[dict], progress) -> Iterator[dict]:
+        """Yield ``emails`` in order, each with an ``attachments`` list of summaries."""
+        pending = deque()
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="gmail-attachments") as pool:
+            for email in emails:
+                metas = [meta for meta in email.get("attachments") or [] if supported(meta, self.max_bytes)]
+                # Each download runs in a copy of the caller's context, so its retries count on the caller's span
+                pending.append((email, [pool.submit(contextvars.copy_context().run, self.process, email, meta)
+                                        for meta in metas]))
+                while pending and (len(pending) > self.window or all(f.done() for f in pending[0][1])):
+                    yield self._finish(*pending.popleft(), progress)
+            while pending:
+                yield self._finish(*pending.popleft(), progress)
+
+    def _finish(self, email: dict, futures: list, progress) -> dict:
+        summaries = []
+        for future in futures:
+            try:
+                summary = future.result()
+            except Exception as e:
+                progress.add("attachment_errors")
+                progress.errors.append(f"Attachment of message {email.get('id', '')}: {e}")
+                continue
+            progress.add("attachment_dupes" if summary.get("duplicate") else "attachments")
+            summaries.append(summary)
+        return {**email, "attachments": summaries}
+
+
+def attachment_stage_from_env(service, resume_path: str | None = None) -> AttachmentStage:
+    """The stage for a Gmail client; ``resume_path`` (a .pdf/.docx/.txt resume) enables JD scoring."""
+    from tools.resume_parser import read_resume_file
+
+    resume_text = read_resume_file(resume_path) if resume_path else None
+    workers = int(os.environ.get("CAREER_COPILOT_ATTACHMENT_WORKERS", 4))
+    return AttachmentStage(gmail_fetcher(service), resume_text=resume_text, workers=workers)
@@ -0,0 +1,229 @@
+"""Bulk ATS scoring: a resume corpus against a set of job descriptions.
+
+``python cli.py batch-score --resumes resumes/ --jds jds/ --out scores.parquet``
+
+* Resume files are read and indexed (``read_resume_file`` → ``extract_resume_text`` →
+  skill profile) in a process pool. Workers send back compact arrays (taxonomy skill ids,
+  the latest year each skill was used, years of experience), never the full text.
+* The main process stacks each chunk of parsed resumes into a skills matrix and scores it
+  against every JD with NumPy, using the same features and weights as ``tools.ats_scoring``.
+* Rows are streamed to CSV, or to Parquet when ``pyarrow`` is installed, one chunk at a time,
+  so memory stays flat however many files there are.
+
+Parsing dominates the cost and is spread over the pool, so throughput grows with cores.
+"""
+import csv
+import datetime
+import glob
+import os
+import time
+from multiprocessing import get_context
+from typing import NamedTuple
+
+import numpy as np
+
+from tools.ats_scoring import RECENCY_BANDS, RECENCY_OLD, RECENCY_UNDATED, WEIGHTS, jd_sections
+from tools.jd_parser import JDNormalizeInput, normalize_jd
+from tools.resume_parser import ResumeTextInput, extract_resume_text, read_resume_file
+from tools.skill_taxonomy import SKILL_TAXONOMY, profile_index
+
+RESUME_SUFFIXES = (".txt", ".md", ".pdf", ".docx")
+JD_SUFFIXES = (".txt", ".md")
+SKILL_NAMES = tuple(SKILL_TAXONOMY)
+SKILL_IDS = {name: i for i, name in enumerate(SKILL_NAMES)}
+FEATURES = ("required_skills", "preferred_skills", "recency", "experience")
+COLUMNS = ("resume", "jd", "ats_score", *FEATURES, "missing_skills")
+
+
+class ParsedResume(NamedTuple):
+    path: str
+    skills: np.ndarray  # uint16 taxonomy ids
+    years: np.ndarray  # uint16 latest year per skill, 0 = undated
+    experience: int  # -1 = unknown
+    error: str = ""
+
+
+class JobSpec(NamedTuple):
+    name: str
+    required: np.ndarray  # bool mask over SKILL_NAMES
+    preferred: np.ndarray
+    years_needed: int | None
+
+
+def collect_files(paths: list[str], suffixes: tuple[str, ...]) -> list[str]:
+    """Files from a mix of file paths, directories (recursive) and glob patterns."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(suffixes))
+        elif os.path.isfile(path):
+            found.append(path)
+        else:
+            found.extend(sorted(p for p in glob.glob(path, recursive=True) if p.lower().endswith(suffixes)))
+    return found
+
+
+def parse_resume(path: str) -> ParsedResume:
+    """Runs in a worker process: file → text → skill profile → compact arrays."""
+    try:
+        text = extract_resume_text(ResumeTextInput(text=read_resume_file(path))).text
+        profile = profile_index(text)
+        ids = np.array([SKILL_IDS[s] for s in profile.skills], dtype=np.uint16)
+        years = np.array([profile.skill_years.get(SKILL_NAMES[i], 0) for i in ids], dtype=np.uint16)
+        experience = profile.experience_years if profile.experience_years is not None else -1
+        return ParsedResume(path, ids, years, experience)
+    except Exception as e:
+        return ParsedResume(path, np.empty(0, np.uint16), np.empty(0, np.uint16), -1, str(e))
+
+
+def load_jobs(paths: list[str]) -> list[JobSpec]:
+    jobs = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        if not normalize_jd(JDNormalizeInput(text=text)).skills:
+            print(f"⚠️ Skipping {path}: no known skills in the job description")
+            continue
+        required, preferred, years = jd_sections(text)
+        masks = []
+        for skills in (required, preferred):
+            mask = np.zeros(len(SKILL_NAMES), dtype=bool)
+            mask[[SKILL_IDS[s] for s in skills]] = True
+            masks.append(mask)
+        jobs.append(JobSpec(os.path.basename(path), masks[0], masks[1], years))
+    return jobs
+
+
+def _recency_matrix(years: np.ndarray, this_year: int) -> np.ndarray:
+    age = this_year - years.astype(np.int32)
+    factors = np.select([age <= max_age for max_age, _ in RECENCY_BANDS],
+                        [factor for _, factor in RECENCY_BANDS], RECENCY_OLD)
+    return np.where(years == 0, RECENCY_UNDATED, factors)
+
+
+def score_chunk(chunk: list[ParsedResume], jobs: list[JobSpec], this_year: int | None = None) -> list[dict]:
+    """Score every resume in the chunk against every job, vectorized per job."""
+    this_year = this_year or datetime.date.today().year
+    has = np.zeros((len(chunk), len(SKILL_NAMES)), dtype=bool)
+    years = np.zeros(has.shape, dtype=np.uint16)
+    for row, parsed in enumerate(chunk):
+        has[row, parsed.skills] = True
+        years[row, parsed.skills] = parsed.years
+    recency = _recency_matrix(years, this_year)
+    experience = np.array([p.experience for p in chunk], dtype=np.float64)
+
+    rows = []
+    for job in jobs:
+        wanted = job.required | job.preferred
+        scores = {}
+        if job.required.any():
+            scores["required_skills"] = has[:, job.required].sum(1) / job.required.sum()
+        if job.preferred.any():
+            scores["preferred_skills"] = has[:, job.preferred].sum(1) / job.preferred.sum()
+        matched = has & wanted
+        n_matched = matched.sum(1)
+        scores["recency"] = np.where(n_matched > 0, (recency * matched).sum(1) / np.maximum(n_matched, 1), 0.0)
+        if job.years_needed:
+            scores["experience"] = np.where(experience < 0, 0.5, np.minimum(1.0, experience / job.years_needed))
+
+        # Same rounding as ats_score: 3-decimal feature scores, 1-decimal rescaled weights
+        total_weight = sum(WEIGHTS[name] for name in scores)
+        total = sum(np.round(100 * WEIGHTS[name] / total_weight, 1) * np.round(s, 3) for name, s in scores.items())
+        missing = wanted & ~has
+        for i, parsed in enumerate(chunk):
+            row = {"resume": parsed.path, "jd": job.name, "ats_score": int(round(total[i]))}
+            row.update({name: round(float(scores[name][i]), 3) if name in scores else None for name in FEATURES})
+            row["missing_skills"] = ", ".join(SKILL_NAMES[j] for j in np.flatnonzero(missing[i]))
+            rows.append(row)
+    return rows
+
+
+class _CSVSink:
+    def __init__(self, path: str):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, rows: list[dict]):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetSink:
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow (or write to a .csv file)")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("resume", pa.string()), ("jd", pa.string()), ("ats_score", pa.int16()),
+            *[(name, pa.float32()) for name in FEATURES], ("missing_skills", pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows: list[dict]):
+        self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def open_sink(path: str):
+    return _ParquetSink(path) if path.lower().endswith(".parquet") else _CSVSink(path)
+
+
+def run_batch(resume_paths: list[str], job_paths: list[str], out: str, workers: int | None = None,
+              chunk_size: int = 256, progress=None) -> dict:
+    """Score every resume against every JD and stream rows to ``out``. Returns run stats.
+
+    ``progress(done, total)`` is called after each chunk. ``workers=1`` parses in this process.
+    """
+    started = time.perf_counter()
+    jobs = load_jobs(job_paths)
+    if not jobs:
+        raise ValueError("No usable job descriptions")
+    workers = workers or os.cpu_count() or 1
+    stats = {"resumes": 0, "errors": 0, "rows": 0, "jobs": len(jobs), "workers": workers}
+    sink = open_sink(out)
+    pool = get_context("spawn").Pool(workers) if workers > 1 and len(resume_paths) > 1 else None
+    completed = False
+    try:
+        parsed = (pool.imap_unordered(parse_resume, resume_paths, chunksize=max(1, min(32, chunk_size // workers)))
+                  if pool else map(parse_resume, resume_paths))
+        chunk = []
+        for item in parsed:
+            stats["resumes"] += 1
+            if item.error:
+                stats["errors"] += 1
+                print(f"⚠️ {item.path}: {item.error}")
+            else:
+                chunk.append(item)
+            if len(chunk) >= chunk_size:
+                rows = score_chunk(chunk, jobs)
+                sink.write(rows)
+                stats["rows"] += len(rows)
+                chunk = []
+                if progress:
+                    progress(stats["resumes"], len(resume_paths))
+        if chunk:
+            rows = score_chunk(chunk, jobs)
+            sink.write(rows)
+            stats["rows"] += len(rows)
+        if progress:
+            progress(stats["resumes"], len(resume_paths))
+        completed = True
+    finally:
+        sink.close()
+        if pool is not None:
+            if completed:
+                pool.close()
+            else:  # interrupted (Ctrl-C) or failed: stop the workers instead of leaving them running
+                pool.terminate()
+            pool.join()
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
@@ -0,0 +1,230 @@
+"""Record-and-replay cassettes for Portia runs.
+
+A cassette is a gzip-compressed JSONL file. Each line is one Portia run as the
+orchestrator sees it: the prompt, the final output value, its duration and the
+tool calls made while it executed. Recording wraps a live Portia client;
+replaying serves the same outputs offline, either at full speed or with the
+original timings, so the post-processing code can be profiled on real payloads.
+
+Enable with ``CAREER_COPILOT_CASSETTE`` or the CLI flags, e.g.
+``record:runs.jsonl.gz``, ``replay:runs.jsonl.gz`` or ``replay-realtime:runs.jsonl.gz``.
+"""
+import contextvars
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from app.tracing import chain_hooks
+
+
+def prompt_key(prompt) -> str:
+    return hashlib.sha1(" ".join(str(prompt).split()).encode("utf-8")).hexdigest()
+
+
+def _jsonable(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (str, int, float, bool, type(None), list, dict)):
+        return value
+    return str(value)
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def load_cassette(path: str) -> list[dict]:
+    entries = []
+    with _open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                entries.append(json.loads(line))
+    return entries
+
+
+class RecordingPortia:
+    """Wraps a live Portia client and appends every run (and its tool calls) to a cassette.
+
+    Tool calls are collected through callbacks chained onto the client's execution hooks.
+    Each run collects into its own list (a context variable), so concurrent runs do not mix
+    their calls; ``close()`` takes the callbacks off the hooks again.
+    """
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        self._queries = {}
+        self._calls = contextvars.ContextVar(f"cassette_calls_{id(self)}", default=None)
+        self._started = time.time()
+        self._hooks = getattr(inner, "execution_hooks", None)
+        self._installed = {}
+        if self._hooks is not None:
+            previous = {attr: getattr(self._hooks, attr, None) for attr in ("before_tool_call", "after_tool_call")}
+            chain_hooks(self._hooks, before_tool_call=self._before_tool, after_tool_call=self._after_tool)
+            self._installed = {attr: (getattr(self._hooks, attr, None), callback)
+                               for attr, callback in previous.items()}
+        # Truncate so one cassette holds one session
+        with _open(path, "w"):
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Restore the execution hooks this recorder chained onto (unless something chained on top since)."""
+        for attr, (installed, previous) in self._installed.items():
+            if getattr(self._hooks, attr, None) is installed:
+                setattr(self._hooks, attr, previous)
+        self._installed = {}
+
+    def _before_tool(self, tool, args, plan_run, step):
+        calls = self._calls.get()
+        if calls is None:
+            return
+        calls.append({
+            "tool": getattr(tool, "id", None) or getattr(tool, "name", None) or tool.__class__.__name__,
+            "args": _jsonable(args),
+            "t0": time.perf_counter(),
+        })
+
+    def _after_tool(self, tool, output, plan_run, step):
+        calls = self._calls.get()
+        if calls and "output" not in calls[-1]:
+            call = calls[-1]
+            call["duration_ms"] = round((time.perf_counter() - call.pop("t0")) * 1000, 3)
+            call["output"] = _jsonable(getattr(output, "value", output))
+
+    def plan(self, query, *args, **kwargs):
+        plan = self.inner.plan(query, *args, **kwargs)
+        self._queries[id(plan)] = query
+        return plan
+
+    def run_plan(self, plan, *args, **kwargs):
+        query = self._queries.pop(id(plan), None) or str(getattr(plan, "plan_context", ""))
+        return self._record(query, lambda: self.inner.run_plan(plan, *args, **kwargs))
+
+    def run(self, query, *args, **kwargs):
+        return self._record(query, lambda: self.inner.run(query, *args, **kwargs))
+
+    def _record(self, query, call):
+        calls = []
+        token = self._calls.set(calls)
+        offset = time.time() - self._started
+        t0 = time.perf_counter()
+        try:
+            plan_run = call()
+        finally:
+            self._calls.reset(token)
+        final_output = getattr(plan_run, "final_output", None)
+        entry = {
+            "key": prompt_key(query),
+            "prompt": query,
+            "offset_s": round(offset, 3),
+            "duration_ms": round((time.perf_counter() - t0) * 1000, 3),
+            "plan_run_id": str(getattr(plan_run, "id", "")),
+            "state": str(getattr(plan_run, "state", "")),
+            "value": _jsonable(getattr(final_output, "value", final_output)),
+            "tools": [c for c in calls if "output" in c],
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            with _open(self.path, "a") as f:
+                f.write(line + "\n")
+        return plan_run
+
+
+class ReplayOutput:
+    def __init__(self, value):
+        self.value = value
+        self.summary = None
+
+
+class ReplayPlan:
+    def __init__(self, query):
+        self.id = f"plan-replay-{prompt_key(query)[:12]}"
+        self.query = query
+        self.steps = []
+
+
+class ReplayPlanRun:
+    """Carries the recorded final output with the attributes the orchestrator reads from a PlanRun."""
+
+    def __init__(self, entry: dict):
+        self.id = entry.get("plan_run_id") or "prun-replay"
+        self.state = entry.get("state", "COMPLETE")
+        self.final_output = ReplayOutput(entry.get("value"))
+        self.tool_calls = entry.get("tools", [])
+
+
+class ReplayPortia:
+    """Serves recorded runs instead of calling the LLM.
+
+    ``match="prompt"`` returns the recording for an identical prompt (FIFO among
+    repeats); ``match="sequential"`` ignores prompts and replays in recorded order,
+    which lets a profile run use different inputs. ``realtime=True`` sleeps for the
+    recorded duration of each run.
+    """
+
+    def __init__(self, path: str, realtime: bool = False, match: str = "prompt"):
+        self.entries = load_cassette(path)
+        self.realtime = realtime
+        self.match = match
+        self._lock = threading.Lock()
+        self._by_key = defaultdict(deque)
+        self._cursor = 0
+        for entry in self.entries:
+            self._by_key[entry["key"]].append(entry)
+
+    def _next(self, query) -> dict:
+        with self._lock:
+            if self.match == "sequential":
+                if not self.entries:
+                    raise LookupError("Cassette is empty")
+                entry = self.entries[self._cursor % len(self.entries)]
+                self._cursor += 1
+                return entry
+            pending = self._by_key.get(prompt_key(query))
+            if not pending:
+                raise LookupError(f"No recorded run for prompt: {str(query)[:80]!r}")
+            entry = pending.popleft() if len(pending) > 1 else pending[0]
+            return entry
+
+    def plan(self, query, *args, **kwargs):
+        return ReplayPlan(query)
+
+    def run_plan(self, plan, *args, **kwargs):
+        return self.run(plan.query)
+
+    def run(self, query, *args, **kwargs):
+        entry = self._next(query)
+        if self.realtime:
+            time.sleep(entry.get("duration_ms", 0) / 1000)
+        return ReplayPlanRun(entry)
+
+
+def wrap_client(client, spec: str | None):
+    """Apply a cassette spec (``record:PATH``, ``replay:PATH``, ``replay-realtime:PATH``) to a Portia client."""
+    if not spec:
+        return client
+    mode, _, path = spec.partition(":")
+    if not path:
+        raise ValueError(f"Invalid cassette spec {spec!r}; expected MODE:PATH")
+    if mode == "record":
+        print(f"🎥 Recording Portia runs to {path}")
+        return RecordingPortia(client, path)
+    if mode in {"replay", "replay-realtime"}:
+        print(f"📼 Replaying Portia runs from {path}")
+        return ReplayPortia(path, realtime=mode == "replay-realtime")
+    raise ValueError(f"Unknown cassette mode {mode!r}")
@@ -0,0 +1,259 @@
+"""Local checkpoints for long Gmail → Sheets runs, so a crash costs at most one batch.
+
+State lives in a small SQLite file (``.portia/checkpoints.db`` by default,
+``CAREER_COPILOT_CHECKPOINTS`` to override):
+
+* ``messages`` - emails whose extraction batch finished (skipped on resume, not even fetched again)
+* ``leads``    - extracted leads per run, unique on (company, role, url), with a write state
+* ``written``  - row fingerprints already appended to a sheet tab, so writes are idempotent
+                 across runs, not just within one
+
+Each extraction batch commits its message ids and leads in one transaction; each write
+batch is marked ``writing`` before the append and ``written`` after it. On resume, rows
+left in ``writing`` are checked against the sheet (when the writer can read it back).
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Callable, Iterable, Iterator
+
+from app.gmail_pipeline import lead_key
+from tools.schemas import JobLead
+
+DEFAULT_CHECKPOINT_DB = os.path.join(".portia", "checkpoints.db")
+
+PENDING, WRITING, WRITTEN = 0, 1, 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sheet_id TEXT NOT NULL,
+    sheet_tab TEXT NOT NULL,
+    query TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    run_id INTEGER NOT NULL,
+    message_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, message_id)
+);
+CREATE TABLE IF NOT EXISTS leads (
+    run_id INTEGER NOT NULL,
+    lead_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    lead TEXT NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (run_id, lead_key)
+);
+CREATE TABLE IF NOT EXISTS written (
+    sheet_id TEXT NOT NULL,
+    sheet_tab TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    written_at REAL NOT NULL,
+    PRIMARY KEY (sheet_id, sheet_tab, fingerprint)
+);
+"""
+
+
+def row_fingerprint(row: Iterable) -> str:
+    """Content hash of a sheet row; cells are whitespace/case-normalized so re-extractions match."""
+    cells = (" ".join(str(c).split()).lower() for c in row)
+    return hashlib.sha1("\x1f".join(cells).encode("utf-8")).hexdigest()
+
+
+def _lead_key(lead: JobLead) -> str:
+    return "\x1f".join(lead_key(lead))
+
+
+class CheckpointStore:
+    """Opens the checkpoint database and starts or resumes runs."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv("CAREER_COPILOT_CHECKPOINTS", DEFAULT_CHECKPOINT_DB)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+
+    def start(self, sheet_id: str, sheet_tab: str, query: str = "", mode: str = "agent") -> "RunCheckpoint":
+        now = time.time()
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (sheet_id, sheet_tab, query, mode, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'extracting', ?, ?)",
+                (sheet_id, sheet_tab, query, mode, now, now),
+            )
+        return RunCheckpoint(self, cur.lastrowid, sheet_id, sheet_tab, "extracting")
+
+    def latest(self, sheet_id: str, sheet_tab: str, query: str = "", mode: str = "agent") -> "RunCheckpoint | None":
+        """Most recent unfinished run for the same target, query and mode."""
+        row = self.conn.execute(
+            "SELECT id, status FROM runs WHERE sheet_id = ? AND sheet_tab = ? AND query = ? AND mode = ? "
+            "AND status != 'done' ORDER BY id DESC LIMIT 1",
+            (sheet_id, sheet_tab, query, mode),
+        ).fetchone()
+        return RunCheckpoint(self, row[0], sheet_id, sheet_tab, row[1]) if row else None
+
+    def resume(self, sheet_id: str, sheet_tab: str, query: str = "", mode: str = "agent") -> "RunCheckpoint":
+        """Continue the last unfinished run, or start a new one when there is none."""
+        return self.latest(sheet_id, sheet_tab, query, mode) or self.start(sheet_id, sheet_tab, query, mode)
+
+    def close(self):
+        self.conn.close()
+
+
+class RunCheckpoint:
+    """Checkpoint handle for one run; the hooks below are called by the app.gmail_pipeline stages."""
+
+    def __init__(self, store: CheckpointStore, run_id: int, sheet_id: str, sheet_tab: str, status: str):
+        self.store = store
+        self.conn = store.conn
+        self.run_id = run_id
+        self.sheet_id = sheet_id
+        self.sheet_tab = sheet_tab
+        self.status = status
+        # Kept in memory so the Gmail prefetch thread can skip ids without touching SQLite
+        self._done_ids = {
+            r[0] for r in self.conn.execute("SELECT message_id FROM messages WHERE run_id = ?", (run_id,))
+        }
+        self._seq = self.conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM leads WHERE run_id = ?", (run_id,)
+        ).fetchone()[0]
+        self._skipped = []
+
+    # ---- fetch / prefilter -------------------------------------------------
+    def has_message(self, message_id: str) -> bool:
+        return message_id in self._done_ids
+
+    def skip(self, message_id: str):
+        """Remember an email the prefilter dropped; flushed with the next extraction batch."""
+        if message_id:
+            self._skipped.append(message_id)
+
+    # ---- extract -----------------------------------------------------------
+    def commit_batch(self, emails: list[dict], leads: list[JobLead]) -> list[JobLead]:
+        """Record a finished extraction batch; returns only leads not already recorded for this run."""
+        ids = [e.get("id") for e in emails if e.get("id")] + self._skipped
+        fresh = []
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO messages (run_id, message_id) VALUES (?, ?)",
+                [(self.run_id, i) for i in ids],
+            )
+            for lead in leads:
+                self._seq += 1
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO leads (run_id, lead_key, fingerprint, lead, state, seq) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.run_id, _lead_key(lead), row_fingerprint(lead.as_row()), lead.model_dump_json(), PENDING, self._seq),
+                )
+                if cur.rowcount:
+                    fresh.append(lead)
+            self._touch()
+        self._done_ids.update(ids)
+        self._skipped = []
+        return fresh
+
+    def mark_extracted(self):
+        if self._skipped:
+            self.commit_batch([], [])
+        self._set_status("extracted")
+
+    def seen_keys(self) -> set:
+        """Lead keys already recorded for this run (seeds the dedupe stage)."""
+        rows = self.conn.execute("SELECT lead_key FROM leads WHERE run_id = ?", (self.run_id,))
+        return {tuple(r[0].split("\x1f")) for r in rows}
+
+    def pending_leads(self) -> Iterator[JobLead]:
+        """Leads extracted by an earlier attempt but not yet confirmed on the sheet, in extraction order."""
+        rows = self.conn.execute(
+            "SELECT lead FROM leads WHERE run_id = ? AND state != ? ORDER BY seq", (self.run_id, WRITTEN)
+        ).fetchall()
+        for (lead,) in rows:
+            yield JobLead.model_validate_json(lead)
+
+    def counts(self) -> dict:
+        messages = self.conn.execute("SELECT COUNT(*) FROM messages WHERE run_id = ?", (self.run_id,)).fetchone()[0]
+        by_state = dict(self.conn.execute(
+            "SELECT state, COUNT(*) FROM leads WHERE run_id = ? GROUP BY state", (self.run_id,)
+        ).fetchall())
+        return {
+            "messages": messages,
+            "pending": by_state.get(PENDING, 0),
+            "writing": by_state.get(WRITING, 0),
+            "written": by_state.get(WRITTEN, 0),
+        }
+
+    # ---- write -------------------------------------------------------------
+    def begin_write(self, leads: list[JobLead]) -> list[JobLead]:
+        """Drop rows already on this sheet tab (from any run) and mark the rest as being written."""
+        fingerprints = {row_fingerprint(lead.as_row()): lead for lead in leads}
+        on_sheet = self._written(fingerprints)
+        todo = [lead for fp, lead in fingerprints.items() if fp not in on_sheet]
+        with self.conn:
+            self._set_state(on_sheet, WRITTEN)
+            self._set_state([row_fingerprint(lead.as_row()) for lead in todo], WRITING)
+        return todo
+
+    def mark_written(self, leads: list[JobLead]):
+        fingerprints = [row_fingerprint(lead.as_row()) for lead in leads]
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO written (sheet_id, sheet_tab, fingerprint, written_at) VALUES (?, ?, ?, ?)",
+                [(self.sheet_id, self.sheet_tab, fp, now) for fp in fingerprints],
+            )
+            self._set_state(fingerprints, WRITTEN)
+            self._touch()
+
+    def reconcile(self, read_rows: Callable[[], list[list]] | None):
+        """Settle rows left in ``writing`` by a crash: confirmed on the sheet → written, else retried."""
+        in_flight = [r[0] for r in self.conn.execute(
+            "SELECT fingerprint FROM leads WHERE run_id = ? AND state = ?", (self.run_id, WRITING)
+        )]
+        if not in_flight:
+            return
+        on_sheet = {row_fingerprint(row) for row in read_rows()} if read_rows else set()
+        confirmed = [fp for fp in in_flight if fp in on_sheet]
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO written (sheet_id, sheet_tab, fingerprint, written_at) VALUES (?, ?, ?, ?)",
+                [(self.sheet_id, self.sheet_tab, fp, now) for fp in confirmed],
+            )
+            self._set_state(confirmed, WRITTEN)
+            self._set_state([fp for fp in in_flight if fp not in on_sheet], PENDING)
+
+    def finish(self):
+        self._set_status("done")
+
+    # ---- internals ---------------------------------------------------------
+    def _written(self, fingerprints) -> set:
+        found = set()
+        fps = list(fingerprints)
+        for i in range(0, len(fps), 500):
+            chunk = fps[i:i + 500]
+            found.update(r[0] for r in self.conn.execute(
+                f"SELECT fingerprint FROM written WHERE sheet_id = ? AND sheet_tab = ? "
+                f"AND fingerprint IN ({','.join('?' * len(chunk))})",
+                (self.sheet_id, self.sheet_tab, *chunk),
+            ))
+        return found
+
+    def _set_state(self, fingerprints, state: int):
+        self.conn.executemany(
+            "UPDATE leads SET state = ? WHERE run_id = ? AND fingerprint = ?",
+            [(state, self.run_id, fp) for fp in fingerprints],
+        )
+
+    def _set_status(self, status: str):
+        self.status = status
+        with self.conn:
+            self.conn.execute("UPDATE runs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), self.run_id))
+
+    def _touch(self):
+        self.conn.execute("UPDATE runs SET updated_at = ? WHERE id = ?", (time.time(), self.run_id))
+
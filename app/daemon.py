@@ -0,0 +1,334 @@
+"""Long-running Career Copilot daemon: a warm orchestrator behind a localhost HTTP API.
+
+``python cli.py serve`` (API only) or ``python cli.py watch`` (API plus scheduled scans)
+keeps one orchestrator, its Portia client, tool registry, Google credentials and
+caches alive between runs. Jobs run one at a time on a worker thread; scheduled
+incremental scans are queued every ``interval`` seconds with random jitter.
+
+API (bound to 127.0.0.1 only):
+    GET  /health         uptime, queue depth, next scheduled scan
+    GET  /jobs           recent jobs, newest first
+    GET  /jobs/<id>      one job with live per-stage progress
+    POST /jobs           {"cmd": "gmail-to-sheets", "params": {...}} -> 202 {"id": ...}
+
+Only the standard library is imported at module load, so ``DaemonClient`` is cheap
+for thin CLI calls; the orchestrator is imported when the daemon starts.
+"""
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_DAEMON_PORT = 8765
+MAX_JOBS_KEPT = 100
+
+
+def daemon_port() -> int:
+    return int(os.getenv("CAREER_COPILOT_DAEMON_PORT", DEFAULT_DAEMON_PORT))
+
+
+def run_gmail_to_sheets(orch, sheet_id: str, sheet_tab: str = "Applications", demo: bool = False,
+                        direct: bool = False, query: str = "newer_than:30d", page_size: int = 25,
+                        max_messages: int | None = None, extract_batch: int = 10, resume: bool = False,
+                        progress=None, gmail_service=None, store=None, attachments: bool = False,
+                        resume_file: str | None = None, group_threads: bool = True, target_roles=None):
+    """One checkpointed Gmail → Sheets run; shared by the CLI (in process) and the daemon.
+
+    ``attachments`` (direct mode) also parses attached JDs/offer letters, scoring JDs against ``resume_file``.
+    ``group_threads`` (direct mode) sends only the newest message of each recruiter conversation to the LLM.
+    Leads are ranked against ``target_roles`` (default ``CAREER_COPILOT_TARGET_ROLES``); the result's
+    ``top_leads`` are the most urgent.
+    """
+    from app.checkpoints import CheckpointStore
+    from app.lead_ranking import lead_index_from_env
+
+    own_store = store is None
+    store = store or CheckpointStore()
+    mode, scan_query = ("direct", query) if direct else ("agent", "")
+    if resume:
+        checkpoint = store.resume(sheet_id, sheet_tab, query=scan_query, mode=mode)
+        done = checkpoint.counts()
+        print(f"⏩ Resuming run #{checkpoint.run_id}: {done['messages']} message(s) processed, "
+              f"{done['written']} row(s) written, {done['pending'] + done['writing']} row(s) pending")
+    else:
+        checkpoint = store.start(sheet_id, sheet_tab, query=scan_query, mode=mode)
+    try:
+        pages, stage, threads = None, None, None
+        if direct:
+            from tools.gmail_direct import get_gmail_service, iter_message_pages
+            gmail_service = gmail_service or get_gmail_service()
+            pages = iter_message_pages(gmail_service, query=query, page_size=page_size,
+                                       max_messages=max_messages, skip=checkpoint.has_message)
+            if attachments:
+                from app.attachments import attachment_stage_from_env
+                stage = attachment_stage_from_env(gmail_service, resume_file)
+            if group_threads:
+                from app.threads import ThreadGrouper
+                threads = ThreadGrouper()
+        return orch.gmail_to_sheets(sheet_id=sheet_id, sheet_tab=sheet_tab, demo_mode=demo, pages=pages,
+                                    progress=progress, extract_batch=extract_batch, checkpoint=checkpoint,
+                                    attachments=stage, threads=threads,
+                                    ranking=lead_index_from_env(target_roles))
+    finally:
+        if own_store:
+            store.close()
+
+
+class Job:
+    def __init__(self, cmd: str, params: dict, source: str = "api"):
+        self.id = uuid.uuid4().hex[:12]
+        self.cmd = cmd
+        self.params = params
+        self.source = source
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = None
+        self.result = None
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "cmd": self.cmd,
+            "params": self.params,
+            "source": self.source,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stages": dict(self.progress.counts) if self.progress is not None else {},
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class CopilotDaemon:
+    """Owns the warm orchestrator, the job queue, the worker thread and the scan scheduler."""
+
+    def __init__(self, sheet_id: str = "", sheet_tab: str = "Applications", port: int | None = None,
+                 interval: float | None = None, jitter: float = 60.0, direct: bool = False,
+                 query: str = "newer_than:30d", orchestrator=None):
+        self.sheet_id = sheet_id
+        self.sheet_tab = sheet_tab
+        self.port = port if port is not None else daemon_port()
+        self.interval = interval
+        self.jitter = jitter
+        self.direct = direct
+        self.query = query
+        self.started_at = time.time()
+        self.next_scan_at = None
+        self.last_scan_at = None
+        self._orch = orchestrator
+        self._gmail_service = None
+        self._store = None
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = None
+
+    # ---- warm state ----------------------------------------------------------
+    def warm_up(self):
+        """Pay the cold-start cost once: Portia SDK, tool registry, credentials."""
+        if self._orch is None:
+            from app.orchestrator import CareerCopilotOrchestrator
+            self._orch = CareerCopilotOrchestrator()
+        if self.direct and self._gmail_service is None:
+            from tools.gmail_direct import get_gmail_service
+            self._gmail_service = get_gmail_service()
+
+    # ---- jobs ----------------------------------------------------------------
+    def submit(self, cmd: str, params: dict | None = None, source: str = "api") -> Job:
+        if cmd != "gmail-to-sheets":
+            raise ValueError(f"Unknown command: {cmd}")
+        job = Job(cmd, params or {}, source)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_JOBS_KEPT:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest].status in ("queued", "running"):
+                    break
+                del self._jobs[oldest]
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[dict]:
+        with self._lock:
+            return [job.to_dict() for job in reversed(list(self._jobs.values()))]
+
+    def _work(self):
+        from app.checkpoints import CheckpointStore
+        from app.gmail_pipeline import PipelineProgress
+        from app.tracing import tracer
+
+        # SQLite connections stay on the thread that opened them
+        self._store = CheckpointStore()
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            job.status = "running"
+            job.started_at = time.time()
+            job.progress = PipelineProgress()
+            params = {"sheet_id": self.sheet_id, "sheet_tab": self.sheet_tab, **job.params}
+            try:
+                if params.get("direct") and self._gmail_service is None:
+                    from tools.gmail_direct import get_gmail_service
+                    self._gmail_service = get_gmail_service()
+                with tracer.queued(job.created_at):
+                    result = run_gmail_to_sheets(self._orch, progress=job.progress,
+                                                 gmail_service=self._gmail_service, store=self._store, **params)
+                job.result = result.model_dump(mode="json")
+                job.status = "failed" if result.error else "done"
+                job.error = result.error
+                if job.source == "schedule" and not result.error:
+                    self.last_scan_at = job.started_at
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                print(f"❌ Job {job.id} failed: {e}")
+            finally:
+                job.finished_at = time.time()
+
+    # ---- schedule ------------------------------------------------------------
+    def _scan_params(self) -> dict:
+        """Incremental scan: only mail newer than the last successful scheduled scan."""
+        params = {"direct": self.direct, "query": self.query}
+        if self.direct and self.last_scan_at:
+            params["query"] = f"{self.query} after:{int(self.last_scan_at) - 300}"
+        return params
+
+    def _schedule(self):
+        while not self._stop.is_set():
+            delay = max(1.0, self.interval + random.uniform(-self.jitter, self.jitter))
+            self.next_scan_at = time.time() + delay
+            if self._stop.wait(delay):
+                return
+            with self._lock:
+                busy = any(j.source == "schedule" and j.status in ("queued", "running") for j in self._jobs.values())
+            if not busy:
+                self.submit("gmail-to-sheets", self._scan_params(), source="schedule")
+
+    # ---- http ----------------------------------------------------------------
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "queued": self._queue.qsize(),
+            "jobs": len(self._jobs),
+            "sheet_id": self.sheet_id,
+            "next_scan_at": self.next_scan_at,
+            "last_scan_at": self.last_scan_at,
+        }
+
+    def serve_forever(self):
+        from app.tracing import tracer
+
+        tracer.start_exporters()
+        self.warm_up()
+        threading.Thread(target=self._work, name="copilot-worker", daemon=True).start()
+        if self.interval:
+            threading.Thread(target=self._schedule, name="copilot-scheduler", daemon=True).start()
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), _handler_for(self))
+        self.port = self._server.server_address[1]
+        print(f"🟢 Career Copilot daemon listening on http://127.0.0.1:{self.port}")
+        if self.interval:
+            print(f"⏰ Scheduled scans every {self.interval / 60:.0f} min (±{self.jitter:.0f}s jitter)")
+        try:
+            self._server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.server_close()
+
+
+def _handler_for(daemon: CopilotDaemon):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                return self._send(200, daemon.health())
+            if self.path == "/jobs":
+                return self._send(200, daemon.jobs())
+            if self.path.startswith("/jobs/"):
+                job = daemon.get(self.path[len("/jobs/"):])
+                return self._send(200, job.to_dict()) if job else self._send(404, {"error": "unknown job"})
+            self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/jobs":
+                return self._send(404, {"error": "not found"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                job = daemon.submit(body.get("cmd", ""), body.get("params") or {})
+            except (ValueError, AttributeError) as e:
+                return self._send(400, {"error": str(e)})
+            self._send(202, {"id": job.id, "status": job.status})
+
+        def log_message(self, format, *args):
+            pass  # keep the daemon console for job output
+
+    return Handler
+
+
+class DaemonClient:
+    """Thin client for a running daemon; standard library only."""
+
+    def __init__(self, port: int | None = None, timeout: float = 5.0):
+        self.base = f"http://127.0.0.1:{port or daemon_port()}"
+        self.timeout = timeout
+
+    def _call(self, method: str, path: str, payload=None, timeout: float | None = None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.base + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+            return json.loads(response.read())
+
+    def available(self) -> bool:
+        try:
+            return self._call("GET", "/health", timeout=0.3).get("status") == "ok"
+        except (OSError, urllib.error.URLError, ValueError):
+            return False
+
+    def submit(self, cmd: str, params: dict) -> str:
+        return self._call("POST", "/jobs", {"cmd": cmd, "params": params})["id"]
+
+    def job(self, job_id: str) -> dict:
+        return self._call("GET", f"/jobs/{job_id}")
+
+    def jobs(self) -> list[dict]:
+        return self._call("GET", "/jobs")
+
+    def wait(self, job_id: str, poll_s: float = 0.5, on_update=None) -> dict:
+        while True:
+            job = self.job(job_id)
+            if on_update is not None and job.get("stages"):
+                on_update(job["stages"])
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(poll_s)
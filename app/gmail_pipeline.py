@@ -0,0 +1,300 @@
+"""Streaming Gmail → Sheets pipeline built from generator stages.
+
+    fetch pages → normalize → prefilter → [attachments] → [threads]
+    → extract (LLM, one small batch per prompt) → dedupe → [ranking] → batch write (no LLM)
+
+Every stage pulls from the one before it, so only one page, one extraction batch and
+one write batch are in memory at a time and no prompt ever holds more than
+``extract_batch`` emails. ``prefetch`` lets the next Gmail page download while the
+current one is being extracted; its bounded queue stops the fetcher from running ahead.
+
+``normalize`` (tools/email_normalizer.py) strips quoted replies, signatures, tracking
+footers and HTML from each body before any prompt is built.
+
+The optional attachment stage (app/attachments.py) parses attached JDs/offer letters on a
+worker pool; extraction then sees a short summary of each instead of the document. The optional thread
+stage (app/threads.py) merges the messages of one recruiter conversation so only its
+newest message is sent to the LLM. With a ``ranking`` index (app/lead_ranking.py) every
+lead on its way to the sheet is also scored, so the most urgent ones can be shown after the run.
+
+Pass a ``RunCheckpoint`` (app/checkpoints.py) to make a run resumable: finished
+extraction batches and written rows are committed as they happen and skipped next time.
+"""
+import contextvars
+import queue
+import re
+import threading
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator
+
+from app.results import to_prompt_json
+from tools.email_normalizer import normalize_body
+from tools.llm_json import LLMJSONError, decode_llm_json
+from tools.schemas import JobLead
+
+# Pipeline order; ``PipelineProgress.counts`` and the CLI progress line are built from it
+# threads: conversations sent on to extraction; threaded: earlier messages merged into them
+STAGES = ("fetch", "normalize", "prefilter", "attachments", "threads", "threaded", "extract", "dedupe", "rank",
+          "write")
+
+JOB_HINTS = re.compile(
+    r"job|application|applied|interview|hiring|position|role|recruit|opening|offer|career|intern|shortlist",
+    re.IGNORECASE,
+)
+
+EXTRACT_PROMPT = """
+You are the Career Copilot Orchestrator.
+Task: From the emails below, extract one entry per job lead (application update, recruiter outreach,
+interview invite or job opening) with the fields [date, company, role, source, url, deadline, message_id].
+Use the email's "id" as message_id. Skip emails that are not about a job.
+An email's "thread" lists earlier messages of the same conversation: return one entry for the whole
+conversation, reflecting its latest state.
+Return ONLY a JSON array (use [] when there are no leads).
+
+Emails: {emails}
+"""
+
+
+class PipelineProgress:
+    """Per-stage item counters plus an optional ``callback(stage, counts)`` fired on every update."""
+
+    def __init__(self, callback: Callable[[str, dict], None] | None = None, sample_size: int = 5):
+        self.counts = {stage: 0 for stage in STAGES}
+        self.counts.update(pages=0, batches=0, extract_errors=0, duplicates=0, resumed=0,
+                           attachment_dupes=0, attachment_errors=0)
+        self.callback = callback
+        self.sample: list[JobLead] = []
+        self.sample_size = sample_size
+        self.errors: list[str] = []
+
+    def add(self, stage: str, amount: int = 1):
+        self.counts[stage] = self.counts.get(stage, 0) + amount
+        if self.callback:
+            self.callback(stage, self.counts)
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def prefetch(items: Iterable, maxsize: int = 2) -> Iterator:
+    """Produce ``items`` on a background thread, at most ``maxsize`` ahead of the consumer."""
+    if maxsize <= 0:
+        yield from items
+        return
+    buffer = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as e:  # surfaced in the consumer
+            put((done, e))
+
+    # The producer runs in the caller's context, so its Gmail retries count on the caller's trace span
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(produce,), name="gmail-prefetch",
+                              daemon=True)
+    worker.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def fetch(pages: Iterable[list[dict]], progress: PipelineProgress, checkpoint=None) -> Iterator[dict]:
+    for page in pages:
+        progress.add("pages")
+        progress.add("fetch", len(page))
+        for email in page:
+            if checkpoint is None or not checkpoint.has_message(email.get("id", "")):
+                yield email
+
+
+def normalize(emails: Iterable[dict], progress: PipelineProgress, max_body_chars: int = 1500) -> Iterator[dict]:
+    """Cut each body down to its informative content; counts the characters dropped."""
+    for email in emails:
+        body = email.get("body", "")
+        cleaned = normalize_body(body, max_body_chars)
+        progress.add("body_chars_dropped", len(body) - len(cleaned))
+        progress.add("normalize")
+        yield {**email, "body": cleaned}
+
+
+def prefilter(emails: Iterable[dict], progress: PipelineProgress, checkpoint=None) -> Iterator[dict]:
+    """Drop emails with no job vocabulary in the subject or the start of the body before any LLM call."""
+    for email in emails:
+        if JOB_HINTS.search(email.get("subject", "")) or JOB_HINTS.search(email.get("body", "")[:500]):
+            progress.add("prefilter")
+            yield email
+        elif checkpoint is not None:
+            checkpoint.skip(email.get("id", ""))
+
+
+def extract(
+    emails: Iterable[dict],
+    complete: Callable[[str], object],
+    progress: PipelineProgress,
+    batch_size: int = 10,
+    max_body_chars: int = 1500,
+    checkpoint=None,
+) -> Iterator[JobLead]:
+    """Ask the LLM for leads one small batch of emails at a time; each finished batch is checkpointed."""
+    for batch in batched(emails, batch_size):
+        payload = [
+            {k: e.get(k, "") for k in ("id", "date", "from", "subject")} | {"body": e.get("body", "")[:max_body_chars]}
+            | _attachment_notes(e) | ({"thread": e["thread"]} if e.get("thread") else {})
+            for e in batch
+        ]
+        progress.add("batches")
+        try:
+            leads = decode_llm_json(complete(EXTRACT_PROMPT.format(emails=to_prompt_json(payload))),
+                                    model=list[JobLead], expect=list)
+        except LLMJSONError as e:
+            progress.add("extract_errors")
+            progress.errors.append(f"Could not decode extraction batch: {e}")
+            continue
+        senders = {e.get("id"): e.get("from", "") for e in batch}
+        for lead in leads:
+            if not lead.source:
+                lead.source = "Gmail"
+            if not getattr(lead, "sender", None):
+                lead.sender = senders.get(getattr(lead, "message_id", None), "")
+        if checkpoint is not None:
+            leads = checkpoint.commit_batch(batch, leads)
+        for lead in leads:
+            progress.add("extract")
+            yield lead
+
+
+def _attachment_notes(email: dict) -> dict:
+    """What the extraction prompt gets from parsed attachments (kind, skills, excerpt), if any."""
+    notes = [
+        {k: a[k] for k in ("filename", "kind", "skills", "excerpt") if k in a}
+        for a in email.get("attachments") or [] if a.get("kind") in ("jd", "offer")
+    ]
+    return {"attachments": notes} if notes else {}
+
+
+def lead_key(lead: JobLead) -> tuple:
+    return (lead.company.strip().lower(), lead.role.strip().lower(), lead.url.strip())
+
+
+def dedupe(leads: Iterable[JobLead], progress: PipelineProgress, seen: set | None = None) -> Iterator[JobLead]:
+    """Drop repeats of (company, role, url); ``seen`` holds only these small keys."""
+    seen = set() if seen is None else seen
+    for lead in leads:
+        key = lead_key(lead)
+        if key in seen:
+            progress.add("duplicates")
+            continue
+        seen.add(key)
+        progress.add("dedupe")
+        if len(progress.sample) < progress.sample_size:
+            progress.sample.append(lead)
+        yield lead
+
+
+def write(
+    leads: Iterable[JobLead],
+    append: Callable[[list[list]], int] | None,
+    progress: PipelineProgress,
+    batch_size: int = 50,
+    checkpoint=None,
+) -> Iterator[int]:
+    """Append rows in batches; ``append`` returns the number of rows written. ``None`` drains without writing.
+
+    With a checkpoint, rows whose fingerprint is already on the sheet are skipped, so replays are idempotent.
+    """
+    for batch in batched(leads, batch_size):
+        if append is None:
+            progress.add("write", 0)
+            yield 0
+            continue
+        if checkpoint is not None:
+            batch = checkpoint.begin_write(batch)
+        written = append([lead.as_row() for lead in batch]) if batch else 0
+        if checkpoint is not None:
+            checkpoint.mark_written(batch)
+        progress.add("write", written)
+        yield written
+
+
+def run_pipeline(
+    pages: Iterable[list[dict]],
+    complete: Callable[[str], object],
+    append: Callable[[list[list]], int] | None,
+    progress: PipelineProgress | None = None,
+    extract_batch: int = 10,
+    write_batch: int = 50,
+    prefetch_pages: int = 2,
+    checkpoint=None,
+    read_rows: Callable[[], list[list]] | None = None,
+    attachments=None,
+    threads=None,
+    ranking=None,
+) -> PipelineProgress:
+    """Drive all stages to completion and return the progress counters.
+
+    With a checkpoint, leads left unwritten by an earlier attempt are written first
+    (``read_rows`` lets rows caught mid-write be confirmed against the sheet).
+    ``attachments`` is an ``app.attachments.AttachmentStage`` to parse attached documents;
+    ``threads`` an ``app.threads.ThreadGrouper`` to extract each conversation once;
+    ``ranking`` an ``app.lead_ranking.LeadIndex`` that every lead to be written is added to.
+    """
+    progress = progress or PipelineProgress()
+    resumed, seen = iter(()), None
+    if checkpoint is not None:
+        checkpoint.reconcile(read_rows)
+        seen = checkpoint.seen_keys()
+        resumed = _count(checkpoint.pending_leads(), progress, "resumed")
+    emails = normalize(fetch(prefetch(pages, prefetch_pages), progress, checkpoint), progress)
+    emails = prefilter(emails, progress, checkpoint)
+    if attachments is not None:
+        emails = attachments.run(emails, progress)
+    if threads is not None:
+        emails = threads.run(emails, progress, checkpoint)
+    fresh = dedupe(extract(emails, complete, progress, batch_size=extract_batch, checkpoint=checkpoint), progress, seen)
+    leads = chain(resumed, fresh)
+    if ranking is not None:
+        leads = _ranked(leads, ranking, progress)
+    for _ in write(leads, append, progress, batch_size=write_batch, checkpoint=checkpoint):
+        pass
+    if checkpoint is not None:
+        checkpoint.mark_extracted()
+        if append is not None:
+            checkpoint.finish()
+    return progress
+
+
+def _count(items: Iterable, progress: PipelineProgress, stage: str) -> Iterator:
+    for item in items:
+        progress.add(stage)
+        yield item
+
+
+def _ranked(leads: Iterable[JobLead], ranking, progress: PipelineProgress) -> Iterator[JobLead]:
+    for lead in leads:
+        ranking.upsert(lead)
+        progress.add("rank")
+        yield lead
@@ -0,0 +1,320 @@
+"""Local priority ranking of job leads, and the top-K index the UI and CLI read from.
+
+Every lead gets a score in [0, 1] from four signals, with no LLM call:
+
+* urgency    - days until the deadline. ``parse_deadline`` understands "August 18, 2025",
+               "18/08/2025", "Aug 18", "tomorrow" and "in 3 days". The text-to-date step is
+               cached, because job alerts repeat the same few deadline strings.
+* role match - how much of one of the user's ``target_roles`` the role title covers
+* reputation - the sender: a recruiter at the company or an ATS beats job-board alerts and
+               no-reply blasts; ``reputation`` overrides it per domain
+* recency    - the lead's age, halving every ``RECENCY_HALF_LIFE_DAYS``
+
+``LeadIndex`` keeps the scored leads in two heaps, by score and by deadline, with lazy
+deletion. Adding or updating a lead is O(log n) and the top K come out in O(k log n). Scores
+depend on today's date, so the index rescores everything once when the day changes.
+"""
+import datetime
+import heapq
+import os
+import re
+from functools import lru_cache
+from itertools import count
+from typing import Iterable
+
+from app.threads import AUTOMATED_SENDER, JOB_BOARD_DOMAINS, message_time, sender_domain
+
+WEIGHTS = {"urgency": 0.35, "role_match": 0.3, "reputation": 0.15, "recency": 0.2}
+PRIORITIES = ((0.65, "High"), (0.45, "Medium"), (0.0, "Low"))
+RECENCY_HALF_LIFE_DAYS = 7
+NO_DEADLINE_URGENCY = 0.3
+UNKNOWN_SIGNAL = 0.5
+
+_MONTHS = {name: i for i, names in enumerate(
+    ("jan january", "feb february", "mar march", "apr april", "may", "jun june", "jul july", "aug august",
+     "sep sept september", "oct october", "nov november", "dec december"), start=1) for name in names.split()}
+_MONTH = r"(" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")"
+_ISO = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_NUMERIC = re.compile(r"\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{2}|\d{4})\b")
+_DAY_MONTH = re.compile(r"\b(\d{1,2}) " + _MONTH + r"\b(?: (\d{4}))?")
+_MONTH_DAY = re.compile(r"\b" + _MONTH + r" (\d{1,2})\b(?: (\d{4}))?")
+_RELATIVE = re.compile(r"\b(?:in|within|next) (\d{1,3}|a|one|two|three) (day|week)s?\b|\b(\d{1,3}) (day|week)s? left\b")
+_NAMED = {"today": 0, "tonight": 0, "end of day": 0, "eod": 0, "tomorrow": 1, "next week": 7}
+_WORDS = {"a": 1, "one": 1, "two": 2, "three": 3}
+_ORDINAL = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)\b")
+_NOISE = re.compile(r"[,()]|\.(?=\s|$)|\b(?:mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun)(?:day|nesday|urday|sday)?\b")
+
+# Senders: applicant tracking systems and free mail (by registrable domain); job boards are in app/threads.py
+ATS_DOMAINS = {"greenhouse.io", "lever.co", "myworkdayjobs.com", "workday.com", "ashbyhq.com", "smartrecruiters.com",
+               "icims.com", "jobvite.com", "successfactors.com", "taleo.net", "workable.com", "recruitee.com",
+               "homerun.co", "breezy.hr", "zohorecruit.com", "darwinbox.in"}
+FREE_MAIL_DOMAINS = {"gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "live.com", "proton.me", "icloud.com"}
+
+_ROLE_WORD = re.compile(r"[a-z0-9+#]+")
+_TARGET_SPLIT = re.compile(r"[\n,;|]+")
+_ROLE_ALIASES = {"dev": "developer", "developers": "developer", "engg": "engineer", "eng": "engineer",
+                 "engineers": "engineer", "mgr": "manager", "sde": "software", "swe": "software",
+                 "analysts": "analyst", "ml": "machine", "fe": "frontend", "be": "backend",
+                 "front": "frontend", "back": "backend", "fullstack": "full", "qa": "quality"}
+_ROLE_STOPWORDS = {"senior", "sr", "junior", "jr", "lead", "principal", "staff", "associate", "intern", "internship",
+                   "trainee", "i", "ii", "iii", "iv", "the", "a", "an", "of", "and", "for", "to", "in", "at", "with",
+                   "remote", "hybrid", "onsite", "end", "stack"}
+
+
+@lru_cache(maxsize=4096)
+def _deadline_parts(text: str) -> tuple | None:
+    """``("date", year | None, month, day)`` or ``("days", n)`` for deadline text; cached on the text."""
+    text = " ".join(_NOISE.sub(" ", _ORDINAL.sub(r"\1", text.lower())).split())
+    if m := _ISO.search(text):
+        return "date", int(m[1]), int(m[2]), int(m[3])
+    if m := _NUMERIC.search(text):
+        first, second, year = int(m[1]), int(m[2]), int(m[3])
+        year += 2000 if year < 100 else 0
+        # Day first (the Indian and European order) unless that cannot be a date
+        day, month = (second, first) if second > 12 else (first, second)
+        return "date", year, month, day
+    if m := _DAY_MONTH.search(text):
+        return "date", int(m[3]) if m[3] else None, _MONTHS[m[2]], int(m[1])
+    if m := _MONTH_DAY.search(text):
+        return "date", int(m[3]) if m[3] else None, _MONTHS[m[1]], int(m[2])
+    if m := _RELATIVE.search(text):
+        amount, unit = (m[1], m[2]) if m[1] else (m[3], m[4])
+        n = _WORDS.get(amount) or int(amount)
+        return "days", n * (7 if unit == "week" else 1)
+    for phrase, days in _NAMED.items():
+        if phrase in text:
+            return "days", days
+    return None
+
+
+def parse_deadline(value, reference: datetime.date | None = None) -> datetime.date | None:
+    """The date a deadline falls on, or None. Relative and year-less dates count from ``reference``.
+
+    ``reference`` is the lead's date when known (an email saying "closes Aug 18" means the
+    next Aug 18 after it was sent), else today. ``value`` may already be a date or datetime.
+    """
+    if value is None or value != value:  # None or NaN/NaT from a pandas frame
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    parts = _deadline_parts(str(value).strip()[:200]) if str(value).strip() else None
+    if parts is None:
+        return None
+    reference = reference or datetime.date.today()
+    if parts[0] == "days":
+        return reference + datetime.timedelta(days=parts[1])
+    _, year, month, day = parts
+    try:
+        if year is not None:
+            return datetime.date(year, month, day)
+        found = datetime.date(reference.year, month, day)
+        return found if found >= reference else datetime.date(reference.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def lead_day(value) -> datetime.date | None:
+    """The day a lead arrived: an email date (RFC 2822 or ISO), a date, or deadline-style text."""
+    if value is None or value != value or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    sent = message_time({"date": str(value)})
+    if sent.year > 1:
+        return sent.date()
+    parts = _deadline_parts(str(value)[:200])
+    if parts and parts[0] == "date" and parts[1] is not None:
+        try:
+            return datetime.date(*parts[1:])
+        except ValueError:
+            return None
+    return None
+
+
+@lru_cache(maxsize=2048)
+def sender_reputation(sender: str, source: str = "") -> float:
+    """How much a lead from this sender is worth acting on, in [0, 1]."""
+    domain = sender_domain(sender)
+    if not domain:
+        return 0.4 if any(board.split(".")[0] in source.lower() for board in JOB_BOARD_DOMAINS) else UNKNOWN_SIGNAL
+    local = sender.rpartition("@")[0].rpartition("<")[2]
+    automated = bool(AUTOMATED_SENDER.search(local))
+    if domain in ATS_DOMAINS:
+        return 0.8
+    if domain in JOB_BOARD_DOMAINS:
+        return 0.3 if automated else 0.45
+    if domain in FREE_MAIL_DOMAINS:
+        return 0.35  # a recruiter on personal mail, or a scam
+    return 0.6 if automated else 0.9
+
+
+@lru_cache(maxsize=4096)
+def role_words(title: str) -> frozenset:
+    words = (_ROLE_ALIASES.get(w, w) for w in _ROLE_WORD.findall(title.lower()))
+    return frozenset(w for w in words if w not in _ROLE_STOPWORDS)
+
+
+def parse_target_roles(target_roles) -> list[str]:
+    """Target roles from the sidebar text (one per line) or a comma-separated string or list."""
+    if isinstance(target_roles, str):
+        target_roles = _TARGET_SPLIT.split(target_roles)
+    return [r.strip() for r in target_roles or () if r and r.strip()]
+
+
+def priority_label(score: float) -> str:
+    return next(label for floor, label in PRIORITIES if score >= floor)
+
+
+def lead_key(lead: dict) -> str:
+    """Same identity as the pipeline dedupe: (company, role, url), case-insensitive."""
+    return "\x1f".join(str(lead.get(k) or "").strip().lower() for k in ("company", "role", "url"))
+
+
+class LeadRanker:
+    """Scores leads for one user and day; ``today=None`` follows the calendar."""
+
+    def __init__(self, target_roles=(), reputation: dict[str, float] | None = None,
+                 today: datetime.date | None = None, weights: dict[str, float] | None = None):
+        self.target_roles = parse_target_roles(target_roles)
+        self._targets = [words for words in map(role_words, self.target_roles) if words]
+        self.reputation = {d.lower(): v for d, v in (reputation or {}).items()}
+        self.fixed_day = today
+        self.today = today or datetime.date.today()
+        self.weights = weights or WEIGHTS
+
+    def current_day(self) -> datetime.date:
+        return self.fixed_day or datetime.date.today()
+
+    def role_match(self, role: str) -> float:
+        if not self._targets:
+            return UNKNOWN_SIGNAL
+        words = role_words(role or "")
+        if not words:
+            return 0.0
+        return max(len(words & target) / len(target) for target in self._targets)
+
+    def reputation_of(self, sender: str, source: str = "") -> float:
+        domain = sender_domain(sender)
+        if domain in self.reputation:
+            return self.reputation[domain]
+        return sender_reputation(sender or "", source or "")
+
+    def rank(self, lead, sender: str = "") -> dict:
+        """A ranked copy of ``lead`` (a ``JobLead`` or a dict; ``position``/``links`` are accepted)."""
+        lead = lead.model_dump() if hasattr(lead, "model_dump") else dict(lead)
+        role = lead.get("role") or lead.get("position") or ""
+        url = lead.get("url") or next(iter(lead.get("links") or []), "")
+        sender = sender or lead.get("sender") or lead.get("from") or ""
+        arrived = lead_day(lead.get("date"))
+        deadline = parse_deadline(lead.get("deadline"), arrived or self.today)
+        days_left = (deadline - self.today).days if deadline else None
+        if days_left is None:
+            urgency = NO_DEADLINE_URGENCY
+        else:
+            urgency = 0.0 if days_left < 0 else 1 / (1 + days_left / 7)
+        age = (self.today - arrived).days if arrived else None
+        signals = {
+            "urgency": urgency,
+            "role_match": self.role_match(role),
+            "reputation": self.reputation_of(sender, lead.get("source") or ""),
+            "recency": UNKNOWN_SIGNAL if age is None else 0.5 ** (max(age, 0) / RECENCY_HALF_LIFE_DAYS),
+        }
+        score = sum(self.weights[name] * value for name, value in signals.items())
+        return {
+            "company": lead.get("company") or "", "role": role, "url": url, "source": lead.get("source") or "",
+            "sender": sender, "date": arrived.isoformat() if arrived else "",
+            "deadline": deadline.isoformat() if deadline else "",
+            "days_left": days_left, "expired": days_left is not None and days_left < 0,
+            "score": round(score, 3), "priority": priority_label(score),
+            "signals": {name: round(value, 3) for name, value in signals.items()},
+        }
+
+
+class LeadIndex:
+    """Ranked leads in a score heap and a deadline heap; stale heap entries are skipped, then pruned."""
+
+    def __init__(self, ranker: LeadRanker | None = None):
+        self.ranker = ranker or LeadRanker()
+        self._leads: dict[str, tuple[int, dict, object, str]] = {}  # key -> (seq, ranked, lead, sender)
+        self._by_score: list[tuple] = []
+        self._by_deadline: list[tuple] = []
+        self._seq = count()
+
+    def __len__(self) -> int:
+        return len(self._leads)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._leads
+
+    def upsert(self, lead, sender: str = "") -> dict:
+        """Add or re-score one lead; O(log n)."""
+        ranked = self.ranker.rank(lead, sender)
+        key = lead_key(ranked)
+        seq = next(self._seq)
+        self._leads[key] = (seq, ranked, lead, sender)
+        heapq.heappush(self._by_score, (-ranked["score"], seq, key))
+        if ranked["deadline"] and not ranked["expired"]:
+            heapq.heappush(self._by_deadline, (ranked["deadline"], -ranked["score"], seq, key))
+        if len(self._by_score) > 2 * len(self._leads) + 64:
+            self._rebuild()
+        return ranked
+
+    def update(self, leads: Iterable, sender: str = ""):
+        for lead in leads:
+            self.upsert(lead, sender)
+
+    def remove(self, key: str) -> bool:
+        """Forget a lead (its heap entries go stale); O(1)."""
+        return self._leads.pop(key, None) is not None
+
+    def top(self, k: int = 10) -> list[dict]:
+        """The ``k`` highest-priority leads, best first."""
+        return self._peek("_by_score", k, lambda entry: entry[1])
+
+    def due_soon(self, k: int = 10, within_days: int | None = None) -> list[dict]:
+        """Leads with the nearest deadlines that have not passed, soonest first."""
+        due = self._peek("_by_deadline", k, lambda entry: entry[2])
+        return [r for r in due if within_days is None or r["days_left"] <= within_days]
+
+    def refresh(self):
+        """Re-score every lead for today's date; O(n). Done automatically when the day changes."""
+        self.ranker.today = self.ranker.current_day()
+        leads = list(self._leads.values())
+        self._leads.clear()
+        self._by_score, self._by_deadline = [], []
+        for _, _, lead, sender in sorted(leads, key=lambda entry: entry[0]):
+            self.upsert(lead, sender)
+
+    def _peek(self, heap_name: str, k: int, seq_of) -> list[dict]:
+        if self.ranker.current_day() != self.ranker.today:
+            self.refresh()
+        heap = getattr(self, heap_name)
+        found, live = [], []
+        while heap and len(found) < k:
+            entry = heapq.heappop(heap)
+            current = self._leads.get(entry[-1])
+            if current is None or current[0] != seq_of(entry):
+                continue  # removed or re-scored since this entry was pushed
+            found.append(current[1])
+            live.append(entry)
+        for entry in live:
+            heapq.heappush(heap, entry)
+        return found
+
+    def _rebuild(self):
+        self._by_score = [(-r["score"], seq, key) for key, (seq, r, _, _) in self._leads.items()]
+        self._by_deadline = [(r["deadline"], -r["score"], seq, key) for key, (seq, r, _, _) in self._leads.items()
+                             if r["deadline"] and not r["expired"]]
+        heapq.heapify(self._by_score)
+        heapq.heapify(self._by_deadline)
+
+
+def lead_index_from_env(target_roles=None) -> LeadIndex:
+    """An index for ``target_roles`` (default ``CAREER_COPILOT_TARGET_ROLES``, comma or newline separated)."""
+    if target_roles is None:
+        target_roles = os.environ.get("CAREER_COPILOT_TARGET_ROLES", "")
+    return LeadIndex(LeadRanker(target_roles))
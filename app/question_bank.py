@@ -0,0 +1,195 @@
+"""Persistent interview question bank, so the LLM only writes the role-specific questions.
+
+Behavioral and culture-fit questions barely change between roles, and technical questions
+about a skill carry over to any JD that asks for that skill. Every generated question is
+filed here by category group, skills and seniority; the next prep request takes matching
+questions from the bank and asks the LLM only for the remainder, which cuts output tokens
+(the bulk of generation latency).
+
+The bank is seeded from the ``$interview_qa.json`` / ``$interview_prep.json`` /
+``$interview_questions.json`` outputs Portia leaves in ``.portia/cache/agent_memory``;
+new files there are picked up the next time the bank opens. State lives in
+``.portia/question_bank.db`` (``CAREER_COPILOT_QUESTION_BANK`` to move it, ``off`` to disable).
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from app.singleflight import fingerprint, normalize
+from tools.llm_json import LLMJSONError, decode_llm_json
+from tools.schemas import InterviewPrep, InterviewQuestion
+from tools.skill_taxonomy import extract_skills
+
+DEFAULT_QUESTION_BANK = os.path.join(".portia", "question_bank.db")
+AGENT_MEMORY_DIR = os.path.join(".portia", "cache", "agent_memory")
+AGENT_MEMORY_FILES = ("$interview_qa.json", "$interview_prep.json", "$interview_questions.json")
+
+MAX_BANKED = 6
+MAX_BEHAVIORAL = 4
+
+# Categories whose questions do not depend on the role; everything else is filed as technical
+_BEHAVIORAL = re.compile(r"behav|cultur|career|goal|team|learning|future|motivation|open|other|situational|soft",
+                         re.IGNORECASE)
+
+_SENIORITY = (
+    ("lead", re.compile(r"\b(lead|principal|staff|head of|architect)\b", re.IGNORECASE)),
+    ("senior", re.compile(r"\b(senior|sr\.?)\b", re.IGNORECASE)),
+    ("junior", re.compile(r"\b(junior|jr\.?|intern|internship|graduate|entry[- ]level)\b", re.IGNORECASE)),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question_key TEXT NOT NULL UNIQUE,
+    category_group TEXT NOT NULL,
+    seniority TEXT NOT NULL,
+    profile_key TEXT NOT NULL,
+    question TEXT NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS question_skills (
+    question_id INTEGER NOT NULL,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (skill, question_id)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_lookup ON questions (category_group, seniority, profile_key);
+"""
+
+
+def skills_in(text: str) -> set[str]:
+    return extract_skills(text or "")
+
+
+def seniority_of(job_description: str) -> str:
+    for level, pattern in _SENIORITY:
+        if pattern.search(job_description or ""):
+            return level
+    return "mid"
+
+
+def category_group(category: str) -> str:
+    return "behavioral" if _BEHAVIORAL.search(category or "") else "technical"
+
+
+def _question_key(question: InterviewQuestion) -> str:
+    return hashlib.sha1(normalize(question.question).lower().encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """SQLite-backed question index by category group, skill and seniority. Thread-safe."""
+
+    def __init__(self, path: str | None = None, agent_memory_dir: str | None = AGENT_MEMORY_DIR):
+        self.path = path or os.getenv("CAREER_COPILOT_QUESTION_BANK", DEFAULT_QUESTION_BANK)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        if agent_memory_dir:
+            self.import_agent_memory(agent_memory_dir)
+
+    @classmethod
+    def from_env(cls) -> "QuestionBank | None":
+        if os.getenv("CAREER_COPILOT_QUESTION_BANK", "").lower() in ("off", "0", "false"):
+            return None
+        try:
+            return cls()
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Question bank disabled: {e}")
+            return None
+
+    # ---- ingest ----------------------------------------------------------------
+    def add(self, questions: list[InterviewQuestion], job_description: str = "",
+            user_profile: dict | None = None) -> int:
+        """File questions from one prep; duplicates (same normalized text) are ignored. Returns rows added."""
+        seniority = seniority_of(job_description) if job_description else "any"
+        profile = fingerprint(user_profile) if user_profile else ""
+        added = 0
+        now = time.time()
+        with self._lock, self.conn:
+            for q in questions:
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO questions "
+                    "(question_key, category_group, seniority, profile_key, question, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (_question_key(q), category_group(q.category), seniority, profile, q.model_dump_json(), now),
+                )
+                if not cur.rowcount:
+                    continue
+                added += 1
+                text = " ".join([q.question, q.category, *q.key_points])
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO question_skills (question_id, skill) VALUES (?, ?)",
+                    [(cur.lastrowid, skill) for skill in skills_in(text)],
+                )
+        return added
+
+    def import_agent_memory(self, directory: str = AGENT_MEMORY_DIR) -> int:
+        """Ingest interview preps cached by Portia runs; files already seen (same mtime) are skipped."""
+        added = 0
+        for name in AGENT_MEMORY_FILES:
+            for path in glob.glob(os.path.join(glob.escape(directory), "*", name)):
+                mtime = os.path.getmtime(path)
+                seen = self.conn.execute("SELECT mtime FROM sources WHERE path = ?", (path,)).fetchone()
+                if seen and seen[0] == mtime:
+                    continue
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        value = json.load(f).get("value")
+                    added += self.add(decode_llm_json(value, model=InterviewPrep).interview_prep)
+                except (OSError, ValueError, AttributeError, LLMJSONError):
+                    pass  # partial or non-JSON outputs are not worth a warning on every start
+                with self._lock, self.conn:
+                    self.conn.execute("INSERT OR REPLACE INTO sources (path, mtime) VALUES (?, ?)", (path, mtime))
+        return added
+
+    # ---- retrieval ---------------------------------------------------------------
+    def retrieve(self, job_description: str, user_profile: dict | None = None,
+                 limit: int = MAX_BANKED) -> list[InterviewQuestion]:
+        """Questions that fit this JD: behavioral ones at its seniority, technical ones on skills it asks for.
+
+        Only questions from this profile (or imported, profile-less ones) are used, since sample
+        answers are written in the candidate's voice. Less-used questions come first so repeat
+        requests rotate through the bank.
+        """
+        seniority = seniority_of(job_description)
+        profiles = ("", fingerprint(user_profile) if user_profile else "")
+        jd_skills = sorted(skills_in(job_description))
+        with self._lock:
+            behavioral = self.conn.execute(
+                "SELECT id, question FROM questions WHERE category_group = 'behavioral' "
+                "AND seniority IN (?, 'any') AND profile_key IN (?, ?) ORDER BY uses, id LIMIT ?",
+                (seniority, *profiles, min(limit, MAX_BEHAVIORAL)),
+            ).fetchall()
+            technical = []
+            if jd_skills and limit > len(behavioral):
+                marks = ",".join("?" * len(jd_skills))
+                # Every skill the question touches must be one the JD asks for
+                technical = self.conn.execute(
+                    f"SELECT q.id, q.question FROM questions q JOIN question_skills s ON s.question_id = q.id "
+                    f"WHERE q.category_group = 'technical' AND q.seniority IN (?, 'any') AND q.profile_key IN (?, ?) "
+                    f"GROUP BY q.id HAVING SUM(s.skill IN ({marks})) = COUNT(*) "
+                    f"ORDER BY COUNT(*) DESC, q.uses, q.id LIMIT ?",
+                    (seniority, *profiles, *jd_skills, limit - len(behavioral)),
+                ).fetchall()
+            rows = behavioral + technical
+            if rows:
+                with self.conn:
+                    self.conn.executemany("UPDATE questions SET uses = uses + 1 WHERE id = ?", [(r[0],) for r in rows])
+        return [InterviewQuestion.model_validate_json(r[1]) for r in rows]
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,86 @@
+"""Typed results returned by the orchestrator workflows.
+
+Results carry decoded Python objects end to end; JSON is produced only where a
+payload crosses into an LLM prompt or a tool call (``to_prompt_json``). For the
+Streamlit/CLI code that still reads results like dicts, ``WorkflowResult``
+supports ``result["key"]``, ``"key" in result`` and ``result.get(...)``;
+unset (``None``) fields count as absent, so ``"error" in result`` keeps working.
+"""
+import json
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from tools.ats_scoring import ATSFeature
+from tools.schemas import InterviewQuestion, JobLead
+
+
+def to_prompt_json(value) -> str:
+    """Serialize a value exactly once, at the prompt/tool boundary."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], BaseModel):
+        return "[" + ",".join(v.model_dump_json() for v in value) + "]"
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class WorkflowResult(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    error: str | None = Field(None, description="Error message when the workflow failed")
+    raw: Any = Field(None, description="Undecodable agent output, kept for debugging")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __contains__(self, key) -> bool:
+        return getattr(self, key, None) is not None
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+
+class EmailScanResult(WorkflowResult):
+    leads: list[JobLead] = Field(default_factory=list, description="Job leads extracted from Gmail")
+
+
+class GmailToSheetsResult(WorkflowResult):
+    email_scan: EmailScanResult | None = None
+    sheet_update: str | None = Field(None, description="Summary of the sheet write")
+    demo_mode: bool = False
+    stages: dict[str, int] = Field(default_factory=dict, description="Items that passed each pipeline stage")
+    attachments: list[dict] = Field(default_factory=list,
+                                    description="Distinct attached documents parsed (kind, skills, ATS score)")
+    top_leads: list[dict] = Field(default_factory=list,
+                                  description="Most urgent leads of the run, ranked locally (app/lead_ranking.py)")
+
+
+class InterviewPrepResult(WorkflowResult):
+    interview_prep: list[InterviewQuestion] | None = None
+
+
+class ResumeAnalysisResult(WorkflowResult):
+    ats_score: int | None = None
+    ats_breakdown: list[ATSFeature] | None = Field(None, description="Per-feature ATS score breakdown")
+    matched_keywords: list[str] | None = None
+    missing_keywords: list[str] | None = None
+    suggestions: str | None = None
+    changed_sections: list[str] | None = Field(None, description="Resume sections re-analyzed (session runs only)")
+    reused_sections: list[str] | None = Field(None, description="Sections whose suggestions were reused")
+
+
+class TrackerUpdateResult(WorkflowResult):
+    success: bool | None = None
+    row_count_appended: int | None = None
+    message: str | None = None
+    demo_mode: bool = False
+    data: list[Any] | None = None
@@ -0,0 +1,70 @@
+"""Per-session state for incremental resume re-analysis.
+
+Users tweak one bullet and click "Optimize Resume" again. A ``ResumeSession`` remembers
+the previous resume section by section (content hashes) together with the suggestions
+the LLM gave for each section, so a follow-up analysis against the same job description:
+
+* re-scores locally (the skill profile is cached per section, so only edited sections are re-scanned),
+* asks the LLM only about sections that changed, and
+* reuses the stored suggestions for every other section; no changes means no LLM call at all.
+
+One session per user (``st.session_state`` in Streamlit); it is not shared across users.
+"""
+import hashlib
+import threading
+
+from tools.resume_parser import split_sections
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class ResumeSession:
+    def __init__(self):
+        self.job_key = None
+        self.sections: dict[str, str] = {}  # title -> content hash
+        self.suggestions: dict[str, list[str]] = {}  # title -> suggestions for that section
+        self.analyses = 0
+        self._lock = threading.Lock()
+
+    def diff(self, resume_text: str, job_description: str) -> tuple[list[tuple[str, str]], list[str], list[str]]:
+        """Split the resume and compare it with the last analysis.
+
+        Returns ``(sections, changed, removed)``: all ``(title, body)`` sections in order, titles
+        whose content changed (or is new, or lost its suggestions), and titles that disappeared.
+        A different job description marks every section as changed.
+        """
+        sections = split_sections(resume_text)
+        with self._lock:
+            same_job = self.job_key == _digest(job_description)
+            changed = [
+                title for title, body in sections
+                if not same_job or self.sections.get(title) != _digest(body) or title not in self.suggestions
+            ]
+            current = {title for title, _ in sections}
+            removed = [title for title in self.sections if title not in current]
+        return sections, changed, removed
+
+    def update(self, sections: list[tuple[str, str]], job_description: str, suggestions: dict[str, list[str]]):
+        """Record this analysis; ``suggestions`` only needs the sections that were re-analyzed."""
+        with self._lock:
+            job_key = _digest(job_description)
+            if job_key != self.job_key:
+                self.suggestions = {}
+            self.job_key = job_key
+            self.sections = {title: _digest(body) for title, body in sections}
+            kept = {title: self.suggestions[title] for title in self.sections if title in self.suggestions}
+            kept.update({title: items for title, items in suggestions.items() if title in self.sections})
+            self.suggestions = kept
+            self.analyses += 1
+
+    def render(self, sections: list[tuple[str, str]]) -> str:
+        """Stored suggestions for the given sections, in resume order, as markdown."""
+        with self._lock:
+            blocks = []
+            for title, _ in sections:
+                items = self.suggestions.get(title) or []
+                if items:
+                    blocks.append(f"**{title}**\n" + "\n".join(f"- {item}" for item in items))
+        return "\n\n".join(blocks)
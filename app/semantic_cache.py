@@ -0,0 +1,225 @@
+"""Near-duplicate cache for interview prep, keyed by job description similarity.
+
+Job descriptions for the same role usually differ only in boilerplate (benefits, EEO
+statements, "about us"), so an exact-match cache rarely hits. Here every generated
+question set is stored with an embedding of its job description; a new request whose
+JD is within ``threshold`` cosine similarity of a stored one, for the same user
+profile, gets the stored questions back instead of a fresh LLM generation.
+
+Embeddings come from a small local sentence-transformers model when
+``CAREER_COPILOT_EMBEDDING_MODEL`` is set (e.g. ``all-MiniLM-L6-v2``) and the package is
+installed; otherwise from hashed word/bigram counts weighted by TF-IDF over the cache
+itself. Employer boilerplate sentences are dropped before embedding, and IDF further
+down-weights terms that every stored JD shares. Search is a NumPy
+matrix product over the in-memory vectors; entries live in ``.portia/interview_cache.db``
+(``CAREER_COPILOT_INTERVIEW_CACHE`` to move it, ``off`` to disable).
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from app.singleflight import fingerprint
+from tools.schemas import InterviewQuestion
+
+DEFAULT_INTERVIEW_CACHE = os.path.join(".portia", "interview_cache.db")
+MAX_ENTRIES = 500
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the this to we will with you your"
+    .split()
+)
+
+# Sentences about the employer rather than the role; dropped before embedding
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+_BOILERPLATE = re.compile(
+    r"about us|equal opportunity|why join|we offer|benefits|perks|salary|insurance|stock options|diversity|"
+    r"inclusive|accommodation|pto|paid time off|learning budget|flexible hours|remote work|visa sponsorship",
+    re.IGNORECASE,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS preps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    embedder TEXT NOT NULL,
+    profile_key TEXT NOT NULL,
+    job_description TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    prep TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class HashingEmbedder:
+    """Dependency-free fallback: hashed unigram + bigram counts (sublinear TF), IDF applied at search time."""
+
+    weighted = True
+    default_threshold = 0.8
+
+    def __init__(self, dim: int = 4096):
+        self.dim = dim
+        self.name = f"hashing-tfidf-{dim}"
+
+    def _bucket(self, term: str) -> int:
+        return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest(), "little") % self.dim
+
+    def embed(self, text: str) -> np.ndarray:
+        words = [w.rstrip(".") for w in _WORD.findall(text.lower())]
+        words = [w for w in words if w and w not in _STOPWORDS]
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            vector[self._bucket(term)] += 1.0
+        np.log1p(vector, out=vector)
+        return vector
+
+
+class SentenceEmbedder:
+    """Small local CPU model through sentence-transformers (optional dependency)."""
+
+    weighted = False
+    default_threshold = 0.9
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"st-{model_name}"
+
+    def embed(self, text: str) -> np.ndarray:
+        return np.asarray(self.model.encode(text, normalize_embeddings=True), dtype=np.float32)
+
+
+def get_embedder():
+    model_name = os.getenv("CAREER_COPILOT_EMBEDDING_MODEL", "")
+    if model_name:
+        try:
+            return SentenceEmbedder(model_name)
+        except ImportError:
+            print("⚠️ CAREER_COPILOT_EMBEDDING_MODEL is set but sentence-transformers is not installed "
+                  "(pip install sentence-transformers); using the TF-IDF fallback")
+    return HashingEmbedder()
+
+
+def strip_boilerplate(text: str) -> str:
+    """Keep the sentences that describe the role; fall back to the full text if nothing is left."""
+    kept = [s for s in _SENTENCE.split(text) if s.strip() and not _BOILERPLATE.search(s)]
+    return " ".join(kept) or text
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class InterviewCache:
+    """Stores generated interview preps and finds near-duplicate job descriptions.
+
+    Thread-safe; one instance is shared by every workflow call on an orchestrator.
+    """
+
+    def __init__(self, path: str | None = None, threshold: float | None = None, embedder=None,
+                 max_entries: int = MAX_ENTRIES):
+        self.path = path or os.getenv("CAREER_COPILOT_INTERVIEW_CACHE", DEFAULT_INTERVIEW_CACHE)
+        self.embedder = embedder or get_embedder()
+        env_threshold = os.getenv("CAREER_COPILOT_INTERVIEW_CACHE_THRESHOLD")
+        self.threshold = threshold or (float(env_threshold) if env_threshold else self.embedder.default_threshold)
+        self.max_entries = max_entries
+        self.stats = {"lookups": 0, "hits": 0, "stores": 0}
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> "InterviewCache | None":
+        if os.getenv("CAREER_COPILOT_INTERVIEW_CACHE", "").lower() in ("off", "0", "false"):
+            return None
+        try:
+            return cls()
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Interview cache disabled: {e}")
+            return None
+
+    def _load(self):
+        rows = self.conn.execute(
+            "SELECT id, profile_key, vector FROM preps WHERE embedder = ? ORDER BY id DESC LIMIT ?",
+            (self.embedder.name, self.max_entries),
+        ).fetchall()
+        self._ids = [r[0] for r in rows]
+        self._profiles = np.array([r[1] for r in rows], dtype=object)
+        self._vectors = (np.stack([np.frombuffer(r[2], dtype=np.float32) for r in rows])
+                         if rows else np.empty((0, 0), dtype=np.float32))
+
+    @staticmethod
+    def profile_key(user_profile: dict | None) -> str:
+        return fingerprint(user_profile or {})
+
+    def _similarities(self, query: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        matrix = self._vectors[candidates]
+        if self.embedder.weighted:
+            # IDF over everything stored: terms every JD shares (boilerplate) count for little
+            df = np.count_nonzero(self._vectors, axis=0)
+            idf = np.log((1 + len(self._vectors)) / (1 + df)) + 1
+            matrix, query = matrix * idf, query * idf
+        return _unit_rows(matrix) @ _unit_rows(query)
+
+    def lookup(self, job_description: str, user_profile: dict | None = None):
+        """Return ``(questions, similarity)`` for the closest stored prep above the threshold, else ``None``."""
+        query = self.embedder.embed(strip_boilerplate(job_description))
+        with self._lock:
+            self.stats["lookups"] += 1
+            if not self._ids:
+                return None
+            candidates = np.flatnonzero(self._profiles == self.profile_key(user_profile))
+            if not len(candidates):
+                return None
+            scores = self._similarities(query, candidates)
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                return None
+            entry_id = self._ids[candidates[best]]
+            with self.conn:
+                self.conn.execute("UPDATE preps SET hits = hits + 1 WHERE id = ?", (entry_id,))
+            prep = self.conn.execute("SELECT prep FROM preps WHERE id = ?", (entry_id,)).fetchone()[0]
+            self.stats["hits"] += 1
+        return [InterviewQuestion.model_validate(q) for q in json.loads(prep)], similarity
+
+    def store(self, job_description: str, user_profile: dict | None, questions: list[InterviewQuestion]):
+        if not questions:
+            return
+        vector = self.embedder.embed(strip_boilerplate(job_description))
+        prep = json.dumps([q.model_dump() for q in questions], ensure_ascii=False)
+        profile = self.profile_key(user_profile)
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO preps (embedder, profile_key, job_description, vector, prep, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.embedder.name, profile, job_description, vector.tobytes(), prep, time.time()),
+            )
+            self.conn.execute(
+                "DELETE FROM preps WHERE embedder = ? AND id NOT IN "
+                "(SELECT id FROM preps WHERE embedder = ? ORDER BY id DESC LIMIT ?)",
+                (self.embedder.name, self.embedder.name, self.max_entries),
+            )
+            self.stats["stores"] += 1
+            self._ids.insert(0, cur.lastrowid)
+            self._profiles = np.concatenate([np.array([profile], dtype=object), self._profiles])[:self.max_entries]
+            self._vectors = (np.vstack([vector, self._vectors]) if len(self._vectors) else vector[None, :])[:self.max_entries]
+            del self._ids[self.max_entries:]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def close(self):
+        self.conn.close()
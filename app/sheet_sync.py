@@ -0,0 +1,338 @@
+"""Delta sync between the local tracker copy (``app.tracker_store``) and the tracker tab.
+
+Every synced sheet row is recorded in ``sheet_sync.db`` next to the local copy: its row
+number, the application key (date applied, company, position) and two content fingerprints,
+one of the row as it is on the sheet and one of the local row it was synced with.
+
+* ``pull``  - reads the rows below the last known one (``full=True``: the whole tab) and
+  upserts into the local copy only the rows whose sheet fingerprint changed (a full pull
+  also restores rows the local copy no longer has).
+* ``push``  - looks only at local rows changed since the last push (the revision is the
+  newest ``updated_at`` pushed), diffs them against the recorded fingerprints, and applies
+  the result as at most one ``values.batchUpdate`` (contiguous rows merged into one range),
+  one ``deleteDimension`` batch and one append. Only rows of applications removed through
+  ``TrackerStore.remove_applications`` (tombstones) are deleted; a push refuses to run when
+  the local copy is empty but rows were synced from it. The rows about to be overwritten or deleted
+  are read back first; if any moved (someone edited the tab), the tab is re-indexed with a
+  full pull before anything is written.
+
+So the Sheets calls of a sync grow with the change set, not the sheet. The first push to a
+tab pulls it in full first, so rows already on the sheet are adopted instead of duplicated.
+
+The local copy is one table for every tab, so a push only considers the applications that
+belong to its tab: rows pulled from or pushed to it, and rows ``claim``-ed for it (a new
+application added through ``update_job_tracker``). An application no tab knows yet (added
+before sync existed, or in demo mode) is adopted by the first tab that pushes.
+"""
+import bisect
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from app.checkpoints import row_fingerprint
+from app.tracker_store import APPLICATION_COLUMNS, TrackerStore, applications_frame
+
+TRACKER_HEADERS = ["Date Applied", "Company", "Position", "Status", "Source", "Contact Person", "Next Action",
+                   "Application Link", "Notes"]
+SYNC_DB = "sheet_sync.db"
+LAST_COLUMN = chr(ord("A") + len(APPLICATION_COLUMNS) - 1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheet_rows (
+    target TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    app_key TEXT NOT NULL,
+    sheet_fp TEXT NOT NULL,
+    local_fp TEXT NOT NULL,
+    PRIMARY KEY (target, row)
+);
+CREATE INDEX IF NOT EXISTS sheet_rows_key ON sheet_rows (target, app_key);
+CREATE TABLE IF NOT EXISTS app_targets (
+    target TEXT NOT NULL,
+    app_key TEXT NOT NULL,
+    PRIMARY KEY (target, app_key)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    target TEXT PRIMARY KEY,
+    revision TEXT,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+def _squash(values: pd.Series) -> pd.Series:
+    return values.fillna("").astype(str).str.lower().str.split().str.join(" ")
+
+
+def sheet_rows(values: list[list]) -> list[list[str]]:
+    """Sheet cells → canonical rows: exactly one cell per column, dates as YYYY-MM-DD when parseable."""
+    width = len(APPLICATION_COLUMNS)
+    padded = [[("" if c is None else str(c)).strip() for c in (row or [])[:width]] for row in values]
+    padded = [row + [""] * (width - len(row)) for row in padded]
+    if not padded:
+        return []
+    dates = pd.Series([row[0] for row in padded])
+    parsed = pd.to_datetime(dates.replace("", None), errors="coerce", format="mixed").dt.strftime("%Y-%m-%d")
+    for row, date in zip(padded, parsed.fillna(dates)):
+        row[0] = date
+    return padded
+
+
+def application_rows(frame: pd.DataFrame) -> list[list[str]]:
+    """Local applications rendered the way they are written to the sheet."""
+    out = pd.DataFrame({c: frame[c].astype(object).where(frame[c].notna(), "").astype(str)
+                        for c in APPLICATION_COLUMNS})
+    out["date_applied"] = frame["date_applied"].dt.strftime("%Y-%m-%d").fillna("")
+    return out.to_numpy().tolist()
+
+
+def _keys(dates: pd.Series, companies: pd.Series, positions: pd.Series) -> list[str]:
+    return (_squash(dates) + "\x1f" + _squash(companies) + "\x1f" + _squash(positions)).tolist()
+
+
+def row_keys(rows: list[list[str]]) -> list[str]:
+    """Application keys (date applied, company, position) of rendered rows."""
+    frame = pd.DataFrame([r[:3] for r in rows], columns=["date", "company", "position"])
+    return _keys(frame["date"], frame["company"], frame["position"])
+
+
+def frame_keys(frame: pd.DataFrame) -> list[str]:
+    """Same keys straight from the typed columns, without rendering whole rows."""
+    return _keys(frame["date_applied"].dt.strftime("%Y-%m-%d"), frame["company"], frame["position"])
+
+
+def _runs(numbers: list[int]) -> list[tuple[int, int]]:
+    """Sorted row numbers → inclusive (first, last) runs of consecutive rows."""
+    runs = []
+    for n in sorted(numbers):
+        if runs and n == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], n)
+        else:
+            runs.append((n, n))
+    return runs
+
+
+def _is_header(row: list) -> bool:
+    return bool(row) and str(row[0]).strip().lower().replace(" ", "_") in ("date_applied", "date")
+
+
+class TrackerSheetSync:
+    """Two-way delta sync for one sheet tab.
+
+    ``sheet`` is a ``tools.google_sheets_direct.SheetsAppender`` (or anything with the same
+    ``read_range`` / ``read_ranges`` / ``write_ranges`` / ``append_rows`` / ``delete_rows`` methods).
+    """
+
+    def __init__(self, store: TrackerStore, sheet, sheet_id: str, sheet_tab: str):
+        self.store = store
+        self.sheet = sheet
+        self.tab = sheet_tab
+        self.target = f"{sheet_id}/{sheet_tab}"
+        self.conn = sqlite3.connect(os.path.join(store.path, SYNC_DB), check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+
+    def _range(self, first: int, last: int | None = None) -> str:
+        return f"{self.tab}!A{first}:{LAST_COLUMN}" + ("" if last is None else str(last))
+
+    def _last_row(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(row), 0) FROM sheet_rows WHERE target = ?",
+                                 (self.target,)).fetchone()[0]
+
+    def _revision(self) -> tuple[bool, pd.Timestamp | None]:
+        row = self.conn.execute("SELECT revision FROM sync_state WHERE target = ?", (self.target,)).fetchone()
+        return row is not None, pd.Timestamp(row[0]) if row and row[0] else None
+
+    def _set_revision(self, revision):
+        revision = None if revision is None or pd.isna(revision) else str(revision)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO sync_state (target, revision, synced_at) VALUES (?, ?, ?)",
+                              (self.target, revision, time.time()))
+
+    # ---- sheet → local ------------------------------------------------------------
+    def pull(self, full: bool = False) -> dict:
+        """Upsert rows changed on the sheet into the local copy (rows deleted on the sheet are kept locally)."""
+        with self._lock:
+            start = 1 if full else self._last_row() + 1
+            values = self.sheet.read_range(self._range(start)) or []
+            rows = sheet_rows(values)
+            known = dict(self.conn.execute("SELECT row, sheet_fp FROM sheet_rows WHERE target = ? AND row >= ?",
+                                           (self.target, start)).fetchall())
+            moved = {}
+            if full:
+                # Rows the local copy no longer has (it was lost) are imported again
+                apps = self.store.load("applications")
+                present = set(frame_keys(apps)) if len(apps) else set()
+                state = [r for r in self.conn.execute("SELECT row, sheet_fp, app_key, local_fp FROM sheet_rows "
+                                                      "WHERE target = ?", (self.target,)) if r[2] in present]
+                known = {row: fp for row, fp, _, _ in state}
+                # Rows that only moved (rows inserted or deleted above them) keep their state and are not re-imported
+                moved = {fp: (key, local_fp) for _, fp, key, local_fp in state}
+            changed, numbers, fps, blank, relocated = [], [], [], [], []
+            for number, (raw, row) in enumerate(zip(values, rows), start):
+                if number == 1 and _is_header(raw):
+                    continue
+                if not any(row):
+                    blank.append(number)
+                    continue
+                fp = row_fingerprint(row)
+                if known.get(number) == fp:
+                    continue
+                if fp in moved:
+                    relocated.append((self.target, number, moved[fp][0], fp, moved[fp][1]))
+                else:
+                    changed.append(row)
+                    numbers.append(number)
+                    fps.append(fp)
+            added = self.store.add_applications(changed) if changed else 0
+            # Key and fingerprint what the local copy made of each row, so the next push does not write it back
+            local = application_rows(applications_frame(changed)) if changed else []
+            with self.conn:
+                if full:
+                    self.conn.execute("DELETE FROM sheet_rows WHERE target = ? AND row >= ?",
+                                      (self.target, start + len(values)))
+                self.conn.executemany("DELETE FROM sheet_rows WHERE target = ? AND row = ?",
+                                      [(self.target, n) for n in blank])
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO sheet_rows (target, row, app_key, sheet_fp, local_fp) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(self.target, n, key, fp, row_fingerprint(row))
+                     for n, key, fp, row in zip(numbers, row_keys(local) if local else [], fps, local)] + relocated,
+                )
+            if not self._revision()[0]:
+                self._set_revision(None)
+            return {"pulled": len(values), "changed": len(changed), "added": added, "full": start == 1}
+
+    # ---- local → sheet ------------------------------------------------------------
+    def claim(self, rows) -> int:
+        """Mark applications (dicts or rows in column order) as belonging to this tab, so a push writes them."""
+        keys = frame_keys(applications_frame(rows))
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO app_targets (target, app_key) VALUES (?, ?)",
+                                  [(self.target, key) for key in keys])
+        return len(keys)
+
+    def _owned(self, keys: pd.Series) -> pd.Series:
+        """Which application keys this tab pushes: its own, plus those no other tab has."""
+        def query(op):
+            return {k for (k,) in self.conn.execute(
+                f"SELECT app_key FROM sheet_rows WHERE target {op} ? "
+                f"UNION SELECT app_key FROM app_targets WHERE target {op} ?", (self.target, self.target))}
+
+        return keys.isin(query("=")) | ~keys.isin(query("!="))
+
+    def plan(self) -> dict:
+        """Inserts, updates (row → values) and deleted row numbers needed to bring the sheet up to date."""
+        apps = self.store.load("applications")
+        _, revision = self._revision()
+        state = pd.DataFrame(
+            self.conn.execute("SELECT row, app_key, sheet_fp, local_fp FROM sheet_rows WHERE target = ?",
+                              (self.target,)).fetchall(),
+            columns=["row", "app_key", "sheet_fp", "local_fp"],
+        )
+        local_keys = pd.Series(frame_keys(apps) if len(apps) else [], index=apps.index, dtype=object)
+        removed = self.store.load("removed")
+        # Only applications removed on purpose are deleted; a key missing from the copy is not a delete
+        tombstones = frame_keys(removed) if len(removed) else []
+        deletes = state[state["app_key"].isin(tombstones) & ~state["app_key"].isin(local_keys)]
+        candidates = apps[self._owned(local_keys)]
+        if revision is not None:
+            candidates = candidates[candidates["updated_at"] > revision]
+        by_key = state.drop_duplicates("app_key", keep="last").set_index("app_key")
+        inserts, updates = [], {}
+        rows = application_rows(candidates) if len(candidates) else []
+        for key, row in zip(row_keys(rows) if rows else [], rows):
+            fp = row_fingerprint(row)
+            if key not in by_key.index:
+                inserts.append(row)
+            elif by_key.at[key, "local_fp"] != fp:
+                updates[int(by_key.at[key, "row"])] = row
+        return {
+            "inserts": inserts,
+            "updates": updates,
+            "deletes": deletes["row"].astype(int).tolist(),
+            "revision": apps["updated_at"].max() if len(apps) else revision,
+            "expected": dict(zip(state["row"].astype(int), state["sheet_fp"])),
+        }
+
+    def _rows_moved(self, plan: dict) -> bool:
+        """Read back only the rows we are about to overwrite or delete and compare fingerprints."""
+        numbers = sorted(set(plan["updates"]) | set(plan["deletes"]))
+        if not numbers:
+            return False
+        found = self.sheet.read_ranges([self._range(a, b) for a, b in _runs(numbers)])
+        current = {}
+        for (a, _), values in zip(_runs(numbers), found):
+            for number, row in enumerate(sheet_rows(values), a):
+                current[number] = row_fingerprint(row)
+        return any(current.get(n) != plan["expected"].get(n) for n in numbers)
+
+    def push(self) -> dict:
+        """Apply local changes to the sheet. Returns counts and the number of Sheets requests made."""
+        with self._lock:
+            requests = 0
+            if not self._revision()[0]:
+                self.pull(full=True)
+                requests += 1
+            synced = self.conn.execute("SELECT COUNT(*) FROM sheet_rows WHERE target = ?", (self.target,)).fetchone()[0]
+            if synced and self.store.load("applications").empty:
+                raise RuntimeError(f"The local tracker copy is empty but {synced} rows of '{self.tab}' were synced "
+                                   "from it; not pushing. Run a full resync to restore the copy from the sheet.")
+            plan = self.plan()
+            if plan["updates"] or plan["deletes"]:
+                requests += 1
+                if self._rows_moved(plan):
+                    self.pull(full=True)
+                    requests += 1
+                    plan = self.plan()
+
+            if plan["updates"]:
+                self.sheet.write_ranges({
+                    self._range(a, b): [plan["updates"][n] for n in range(a, b + 1)]
+                    for a, b in _runs(list(plan["updates"]))
+                })
+                requests += 1
+                self._record(plan["updates"])
+            if plan["deletes"]:
+                self.sheet.delete_rows(plan["deletes"])
+                requests += 1
+                self._forget(plan["deletes"])
+            if plan["inserts"]:
+                first = self.sheet.append_rows(plan["inserts"])
+                requests += 1
+                self._record({first + i: row for i, row in enumerate(plan["inserts"])})
+            self._set_revision(plan["revision"])
+            return {"inserted": len(plan["inserts"]), "updated": len(plan["updates"]),
+                    "deleted": len(plan["deletes"]), "requests": requests}
+
+    def _record(self, rows: dict[int, list[str]]):
+        numbers = list(rows)
+        values = [rows[n] for n in numbers]
+        fps = [row_fingerprint(r) for r in values]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sheet_rows (target, row, app_key, sheet_fp, local_fp) VALUES (?, ?, ?, ?, ?)",
+                [(self.target, n, k, fp, fp) for n, k, fp in zip(numbers, row_keys(values), fps)],
+            )
+
+    def _forget(self, numbers: list[int]):
+        """Drop deleted rows and shift the rows below them up, as the sheet did."""
+        deleted = sorted(set(numbers))
+        with self.conn:
+            below = self.conn.execute(
+                "SELECT row, app_key, sheet_fp, local_fp FROM sheet_rows WHERE target = ? AND row >= ?",
+                (self.target, deleted[0]),
+            ).fetchall()
+            self.conn.execute("DELETE FROM sheet_rows WHERE target = ? AND row >= ?", (self.target, deleted[0]))
+            gone = set(deleted)
+            self.conn.executemany(
+                "INSERT INTO sheet_rows (target, row, app_key, sheet_fp, local_fp) VALUES (?, ?, ?, ?, ?)",
+                [(self.target, row - bisect.bisect_left(deleted, row), *rest)
+                 for row, *rest in below if row not in gone],
+            )
+
+    def close(self):
+        self.conn.close()
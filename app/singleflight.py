@@ -0,0 +1,109 @@
+"""In-flight request coalescing ("single-flight") for orchestrator workflows.
+
+When the same workflow is called with the same normalized input while an earlier
+call is still running, the duplicate waits for that call instead of starting its own
+LLM run. Everyone gets the same result (followers get a copy) or the same exception.
+Nothing is cached after the run finishes: that is the job of a cache, not of this layer.
+
+Collapsed calls are counted per workflow (``stats()``) and on the caller's trace span
+as ``singleflight_collapsed``.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import re
+import threading
+from concurrent.futures import Future
+
+from app.tracing import tracer
+
+_WHITESPACE = re.compile(r"\s+")
+
+_flights: dict[str, "SingleFlight"] = {}
+
+
+def normalize(value):
+    """Whitespace-insensitive text, key-order-insensitive dicts; used only to build keys."""
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+def fingerprint(*parts) -> str:
+    payload = json.dumps(normalize(list(parts)), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self.stats = {"calls": 0, "executions": 0, "collapsed": 0}
+
+    def do(self, key: str, fn, *args, **kwargs):
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.stats["executions"] += 1
+            else:
+                self.stats["collapsed"] += 1
+        if not leader:
+            tracer.count("singleflight_collapsed")
+            result = future.result()
+            return result.model_copy(deep=True) if hasattr(result, "model_copy") else result
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def get_flight(name: str) -> SingleFlight:
+    flight = _flights.get(name)
+    if flight is None:
+        flight = _flights.setdefault(name, SingleFlight(name))
+    return flight
+
+
+def stats() -> dict:
+    """Counters per workflow: ``calls``, ``executions``, ``collapsed`` and ``in_flight``."""
+    return {name: {**flight.stats, "in_flight": flight.in_flight()} for name, flight in _flights.items()}
+
+
+def singleflight(name: str | None = None):
+    """Method decorator: coalesce concurrent calls on the same instance with equal normalized arguments."""
+    def decorator(fn):
+        flight = get_flight(name or fn.__name__)
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            # Positional vs keyword and omitted defaults all map to the same key
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            del arguments[next(iter(signature.parameters))]
+            return flight.do(fingerprint(id(self), arguments), fn, self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,184 @@
+"""Thread grouping stage of the Gmail pipeline: one extraction per recruiter conversation.
+
+    ... prefilter → [attachments] → threads → extract ...
+
+A recruiter thread (acknowledgment, scheduling, follow-up) used to send every message to
+the LLM, and each could become its own tracker row. ``ThreadGrouper`` merges messages into
+one application group when they share either key:
+
+* the Gmail ``thread_id``, or
+* the normalized subject (``Re:``/``Fwd:``/``[tags]`` removed) plus the sender's
+  registrable domain, so ``careers@mail.acme.com`` and ``hr@acme.com`` match. Only an
+  email without a thread id (forwarded from another client, an import) joins a group by
+  subject; emails with one just register the key. Job boards and automated senders get
+  no subject key at all: their digests reuse one subject ("Jobs you may be interested
+  in") for unrelated leads.
+
+Emails are held in a window of at most ``window`` messages. When the window fills (or the
+input ends), each group's newest message goes on to extraction, carrying short notes
+about the older ones (date, subject, excerpt) and their parsed attachments. Older
+messages are merged without an LLM call and are marked done in the checkpoint. A message
+in a group that already went to extraction is only sent again if it is newer than the
+one extracted. Groups live in memory for one run.
+"""
+import re
+from datetime import datetime, timezone
+from email.utils import parseaddr, parsedate_to_datetime
+from typing import Iterable, Iterator
+
+EARLIER_NOTES = 3
+EXCERPT_CHARS = 200
+
+_SUBJECT_PREFIX = re.compile(r"^(?:\s*(?:re|fw|fwd|aw|sv|tr|wg)\s*(?:\[\d+\])?\s*:\s*|\s*\[[^\]]{1,40}\]\s*)+",
+                             re.IGNORECASE)
+_NON_WORD = re.compile(r"[\W_]+")
+# Second-level labels under which the registrable domain has three labels (mail.tcs.co.in → tcs.co.in)
+_SECOND_LEVEL = {"co", "com", "ac", "org", "net", "gov", "edu"}
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+# Senders of bulk mail: job boards (by registrable domain) and automated local parts
+JOB_BOARD_DOMAINS = {"linkedin.com", "indeed.com", "naukri.com", "foundit.in", "glassdoor.com", "monster.com",
+                     "unstop.com", "dare2compete.news", "hireclap.com", "internshala.com", "freelancer.com",
+                     "ziprecruiter.com", "wellfound.com", "instahyre.com", "cutshort.io"}
+AUTOMATED_SENDER = re.compile(r"no-?reply|do-?not-?reply|alert|notification|newsletter|digest|update|marketing|"
+                              r"mailer|news|info|hello|team", re.IGNORECASE)
+
+
+def normalize_subject(subject: str) -> str:
+    """``"RE: Fwd: [External] Interview  – Acme!"`` → ``"interview acme"``."""
+    return _NON_WORD.sub(" ", _SUBJECT_PREFIX.sub("", subject or "")).strip().lower()
+
+
+def sender_domain(sender: str) -> str:
+    """Registrable domain of a From header: ``"Acme <jobs@mail.acme.co.uk>"`` → ``"acme.co.uk"``."""
+    address = parseaddr(sender or "")[1]
+    labels = address.rpartition("@")[2].lower().strip(".").split(".")
+    if len(labels) < 2:
+        return ""
+    keep = 3 if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL else 2
+    return ".".join(labels[-keep:])
+
+
+def is_bulk_sender(sender: str) -> bool:
+    """A job board or an automated address (``noreply@``, ``alerts@`` ...), as opposed to a person."""
+    local = (sender or "").rpartition("@")[0].rpartition("<")[2]
+    return sender_domain(sender) in JOB_BOARD_DOMAINS or bool(AUTOMATED_SENDER.search(local))
+
+
+def thread_keys(email: dict) -> list[tuple]:
+    """Grouping keys of an email: its thread id first, then the subject key when one applies."""
+    keys = []
+    if email.get("thread_id"):
+        keys.append(("thread", email["thread_id"]))
+    subject = normalize_subject(email.get("subject", ""))
+    domain = sender_domain(email.get("from", ""))
+    if subject and domain and not is_bulk_sender(email.get("from", "")):
+        keys.append(("subject", subject, domain))
+    return keys
+
+
+def message_time(email: dict) -> datetime:
+    """Send time of an email (RFC 2822 or ISO date); unknown dates sort oldest."""
+    value = email.get("date") or ""
+    for parse in (parsedate_to_datetime, datetime.fromisoformat):
+        try:
+            parsed = parse(value)
+        except (TypeError, ValueError, IndexError):
+            continue
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return _EPOCH
+
+
+class ThreadGrouper:
+    """Merge a window of emails into application groups; only each group's newest message is extracted."""
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self.groups: list[dict] = []  # every group of the run, in order of first appearance
+        self._by_key: dict[tuple, dict] = {}
+
+    def assign(self, email: dict) -> dict:
+        """The group ``email`` belongs to (new or existing); groups linked by this email are merged."""
+        keys = thread_keys(email)
+        found = []
+        # With a thread id, the subject key is registered for threadless emails but never joins threads
+        for key in keys[:1] if email.get("thread_id") else keys:
+            group = self._by_key.get(key)
+            if group is not None and group not in found:
+                found.append(group)
+        if not found:
+            group = {"keys": set(), "message_ids": [], "extracted_at": None, "merged_into": None}
+            self.groups.append(group)
+        else:
+            group = found[0]
+            for other in found[1:]:
+                self._merge(group, other)
+        group["keys"].update(keys)
+        for key in group["keys"]:
+            self._by_key[key] = group
+        if email.get("id") and email["id"] not in group["message_ids"]:
+            group["message_ids"].append(email["id"])
+        return group
+
+    def _merge(self, group: dict, other: dict):
+        group["keys"] |= other["keys"]
+        group["message_ids"] += [i for i in other["message_ids"] if i not in group["message_ids"]]
+        if other["extracted_at"] is not None:
+            group["extracted_at"] = max(group["extracted_at"] or _EPOCH, other["extracted_at"])
+        self.groups.remove(other)
+        other["merged_into"] = group
+        for key in other["keys"]:
+            self._by_key[key] = group
+
+    @staticmethod
+    def _resolve(group: dict) -> dict:
+        while group["merged_into"] is not None:
+            group = group["merged_into"]
+        return group
+
+    def run(self, emails: Iterable[dict], progress, checkpoint=None) -> Iterator[dict]:
+        """Yield the newest email of each group per window, annotated with its thread."""
+        pending = []
+        for email in emails:
+            pending.append(email)
+            if len(pending) >= self.window:
+                yield from self._flush(pending, progress, checkpoint)
+                pending = []
+        yield from self._flush(pending, progress, checkpoint)
+
+    def _flush(self, emails: list[dict], progress, checkpoint) -> Iterator[dict]:
+        assigned = [(email, self.assign(email)) for email in emails]
+        members: dict[int, tuple[dict, list]] = {}
+        for email, group in assigned:
+            # A later email in the window may have merged this group into another one
+            group = self._resolve(group)
+            members.setdefault(id(group), (group, []))[1].append(email)
+        for group, messages in members.values():
+            messages.sort(key=message_time, reverse=True)
+            latest, earlier = messages[0], messages[1:]
+            sent_at = message_time(latest)
+            if group["extracted_at"] is not None and sent_at <= group["extracted_at"]:
+                earlier, latest = messages, None
+            for email in earlier:
+                progress.add("threaded")
+                if checkpoint is not None:
+                    checkpoint.skip(email.get("id", ""))
+            if latest is None:
+                continue
+            group["extracted_at"] = sent_at
+            progress.add("threads")
+            yield self._annotate(latest, earlier, group)
+
+    def _annotate(self, latest: dict, earlier: list[dict], group: dict) -> dict:
+        if len(group["message_ids"]) < 2:
+            return latest
+        notes = [
+            {"date": e.get("date", ""), "subject": e.get("subject", ""),
+             "excerpt": " ".join(e.get("body", "").split())[:EXCERPT_CHARS]}
+            for e in earlier[:EARLIER_NOTES]
+        ]
+        annotated = {**latest, "thread": {"messages": len(group["message_ids"]), "earlier": notes}}
+        parsed = [a for e in earlier for a in e.get("attachments") or [] if isinstance(a, dict) and a.get("kind")]
+        if parsed:
+            annotated["attachments"] = list(latest.get("attachments") or []) + parsed
+        return annotated
@@ -0,0 +1,395 @@
+"""Tracing for Portia runs, plan steps and tool calls.
+
+Every finished span is written as one JSON line to the trace log
+(``CAREER_COPILOT_TRACE_FILE``, default ``.portia/traces/trace.jsonl``).
+Optional exporters are enabled with ``CAREER_COPILOT_METRICS`` (comma
+separated: ``prometheus``, ``otel``) when their packages are installed. They
+are started by long-running processes only (``serve``/``watch``, the API and
+Streamlit) through ``tracer.start_exporters()``; one-off CLI commands and
+batch workers just append to the trace log, so they never compete for the
+Prometheus port.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+DEFAULT_TRACE_FILE = os.path.join(".portia", "traces", "trace.jsonl")
+
+# USD per 1M tokens: (prompt, completion)
+MODEL_PRICES = {
+    "openai/gpt-4o-mini": (0.15, 0.60),
+    "google/gemini-1.5-flash": (0.075, 0.30),
+}
+
+_current_span = contextvars.ContextVar("career_copilot_span", default=None)
+_queued_at = contextvars.ContextVar("career_copilot_queued_at", default=None)
+
+
+def _text_length(value) -> int:
+    """Characters of text in a (possibly nested) output without serializing it."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(k)) + _text_length(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_text_length(v) for v in value)
+    return len(str(value)) if value is not None else 0
+
+
+def estimate_tokens(text) -> int:
+    """Rough token count (~4 chars per token) used when the SDK reports no usage."""
+    length = _text_length(text)
+    return max(1, length // 4) if length else 0
+
+
+def estimate_cost(model: str | None, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICES.get(model or "", (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class Span:
+    """A single timed unit of work (workflow, LLM run, plan step or tool call)."""
+
+    def __init__(self, name: str, kind: str, parent=None, queued_at: float | None = None, **attrs):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.workflow = attrs.pop("workflow", None) or (parent.workflow if parent else None)
+        self.attrs = attrs
+        self.start = time.time()
+        self.queue_ms = max(0.0, (self.start - queued_at) * 1000) if queued_at else 0.0
+        self.wall_ms = None
+        self.status = "ok"
+        self.error = None
+        self._t0 = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key: str, amount=1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def fail(self, error):
+        self.status = "error"
+        self.error = str(error)
+
+    def finish(self):
+        if self.wall_ms is None:
+            self.wall_ms = (time.perf_counter() - self._t0) * 1000
+
+    def to_record(self) -> dict:
+        return {
+            "ts": self.start,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "workflow": self.workflow,
+            "wall_ms": round(self.wall_ms or 0.0, 3),
+            "queue_ms": round(self.queue_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """Creates spans, tracks the active span per context and fans records out to sinks."""
+
+    def __init__(self, path: str | None = DEFAULT_TRACE_FILE, exporters=()):
+        self.path = path
+        self.exporters = list(exporters)
+        self._lock = threading.Lock()
+        self._open = {}
+        self._exporters_started = False
+        self._transports = []
+
+    @classmethod
+    def from_env(cls):
+        path = os.getenv("CAREER_COPILOT_TRACE_FILE", DEFAULT_TRACE_FILE)
+        if path.lower() in {"", "0", "off", "false", "none"}:
+            path = None
+        return cls(path=path)
+
+    def start_exporters(self, spec: str | None = None):
+        """Start the ``CAREER_COPILOT_METRICS`` exporters; only the first call in a process does anything."""
+        with self._lock:
+            if self._exporters_started:
+                return self.exporters
+            self._exporters_started = True
+        self.exporters.extend(build_exporters(os.getenv("CAREER_COPILOT_METRICS", "") if spec is None else spec))
+        return self.exporters
+
+    def current(self):
+        return _current_span.get()
+
+    @contextmanager
+    def queued(self, at: float | None):
+        """Work run inside was queued at ``at`` (``time.time()``); its first span reports the wait as ``queue_ms``."""
+        token = _queued_at.set(at)
+        try:
+            yield
+        finally:
+            _queued_at.reset(token)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", queued_at: float | None = None, **attrs):
+        parent = _current_span.get()
+        if queued_at is None and parent is None:
+            queued_at = _queued_at.get()
+        span = Span(name, kind, parent=parent, queued_at=queued_at, **attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def traced(self, name: str | None = None, kind: str = "workflow"):
+        """Decorator: run the function inside a span. Results carrying an ``error`` mark the span failed."""
+        def decorator(fn):
+            span_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, kind=kind, workflow=span_name if kind == "workflow" else None) as span:
+                    result = fn(*args, **kwargs)
+                    error = result.get("error") if isinstance(result, dict) else getattr(result, "error", None)
+                    if error:
+                        span.fail(error)
+                    return result
+            return wrapper
+        return decorator
+
+    # Spans whose start and end arrive in separate callbacks (execution hooks)
+    def start(self, key, name: str, kind: str, **attrs):
+        self._open[key] = Span(name, kind, parent=_current_span.get(), **attrs)
+
+    def end(self, key, error=None, **attrs):
+        span = self._open.pop(key, None)
+        if span is None:
+            return
+        span.set(**attrs)
+        if error:
+            span.fail(error)
+        self.finish(span)
+
+    def count(self, key: str, amount=1):
+        """Add to a counter on the active span (e.g. ``cache_hits``, ``retries``)."""
+        span = _current_span.get()
+        if span is not None:
+            span.add(key, amount)
+
+    def record_usage(self, span, prompt, completion, model: str | None = None, usage=None):
+        """Attach prompt/completion token counts and estimated cost to a span."""
+        prompt_tokens = completion_tokens = None
+        if usage is not None:
+            get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+            prompt_tokens = get("prompt_tokens") or get("input_tokens")
+            completion_tokens = get("completion_tokens") or get("output_tokens")
+        estimated = prompt_tokens is None or completion_tokens is None
+        if estimated:
+            prompt_tokens = estimate_tokens(prompt)
+            completion_tokens = estimate_tokens(completion)
+        span.set(
+            model=model,
+            prompt_tokens=int(prompt_tokens),
+            completion_tokens=int(completion_tokens),
+            tokens_estimated=estimated,
+            cost_usd=round(estimate_cost(model, prompt_tokens, completion_tokens), 8),
+        )
+
+    def finish(self, span):
+        span.finish()
+        record = span.to_record()
+        if self.path:
+            line = json.dumps(record, ensure_ascii=False, default=str)
+            with self._lock:
+                try:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(line + "\n")
+                except OSError as e:
+                    print(f"Error writing trace log: {e}")
+        for exporter in self.exporters:
+            try:
+                exporter.export(record)
+            except Exception as e:
+                print(f"Error exporting span to {exporter.__class__.__name__}: {e}")
+
+    def instrument_transport(self, transport):
+        """Count the retries of a transport module (``tools.google_transport``) on the active span, once."""
+        with self._lock:
+            if transport in self._transports:
+                return
+            self._transports.append(transport)
+        transport.on_retry(lambda: self.count("retries"))
+
+    def instrument_hooks(self, hooks):
+        """Chain step/tool span callbacks onto Portia execution hooks, keeping existing callbacks."""
+        try:
+            from portia.execution_hooks import BeforeStepExecutionOutcome
+            proceed = BeforeStepExecutionOutcome.CONTINUE
+        except Exception:
+            proceed = None
+
+        def step_key(plan_run, step):
+            return ("step", str(getattr(plan_run, "id", "")), id(step))
+
+        def tool_key(plan_run, step):
+            return ("tool", str(getattr(plan_run, "id", "")), id(step))
+
+        def before_step(plan, plan_run, step):
+            self.start(step_key(plan_run, step), "plan.step", "step",
+                       task=str(getattr(step, "task", ""))[:200], tool_id=getattr(step, "tool_id", None))
+            return proceed
+
+        def after_step(plan, plan_run, step, output):
+            self.end(step_key(plan_run, step))
+
+        def before_tool(tool, args, plan_run, step):
+            name = getattr(tool, "id", None) or getattr(tool, "name", None) or tool.__class__.__name__
+            self.start(tool_key(plan_run, step), f"tool:{name}", "tool", tool_id=name)
+
+        def after_tool(tool, output, plan_run, step):
+            self.end(tool_key(plan_run, step))
+
+        return chain_hooks(
+            hooks,
+            before_step_execution=before_step,
+            after_step_execution=after_step,
+            before_tool_call=before_tool,
+            after_tool_call=after_tool,
+        )
+
+
+def chain_hooks(hooks, **callbacks):
+    """Run ``callbacks`` before any callback already set on ``hooks``; the existing result wins."""
+    for attr, extra in callbacks.items():
+        previous = getattr(hooks, attr, None)
+
+        def combined(*args, _extra=extra, _previous=previous):
+            result = _extra(*args)
+            if _previous is not None:
+                return _previous(*args)
+            return result
+
+        try:
+            setattr(hooks, attr, combined)
+        except Exception as e:
+            print(f"Error installing {attr} hook: {e}")
+    return hooks
+
+
+class PrometheusExporter:
+    """Expose span latency, tokens, cost, retries and cache hits on a local /metrics endpoint."""
+
+    def __init__(self, port: int):
+        from prometheus_client import Counter, Histogram, start_http_server
+
+        labels = ["name", "kind", "workflow", "status"]
+        self.latency = Histogram("career_copilot_span_seconds", "Span wall time", labels)
+        self.queue = Histogram("career_copilot_queue_seconds", "Time spent queued before start", labels)
+        self.tokens = Counter("career_copilot_tokens_total", "LLM tokens", ["workflow", "direction"])
+        self.cost = Counter("career_copilot_cost_usd_total", "Estimated LLM cost", ["workflow"])
+        self.events = Counter("career_copilot_events_total", "Retries, cache hits and collapsed duplicate calls",
+                              ["workflow", "event"])
+        start_http_server(port)
+
+    def export(self, record: dict):
+        workflow = record["workflow"] or ""
+        labels = (record["name"], record["kind"], workflow, record["status"])
+        self.latency.labels(*labels).observe(record["wall_ms"] / 1000)
+        self.queue.labels(*labels).observe(record["queue_ms"] / 1000)
+        attrs = record["attrs"]
+        for direction in ("prompt", "completion"):
+            if attrs.get(f"{direction}_tokens"):
+                self.tokens.labels(workflow, direction).inc(attrs[f"{direction}_tokens"])
+        if attrs.get("cost_usd"):
+            self.cost.labels(workflow).inc(attrs["cost_usd"])
+        for event in ("retries", "cache_hits", "singleflight_collapsed"):
+            if attrs.get(event):
+                self.events.labels(workflow, event).inc(attrs[event])
+
+
+class OpenTelemetryExporter:
+    """Re-emit finished spans through the globally configured OpenTelemetry tracer provider."""
+
+    def __init__(self):
+        from opentelemetry import trace
+
+        self.tracer = trace.get_tracer("career-copilot")
+
+    def export(self, record: dict):
+        start_ns = int(record["ts"] * 1e9)
+        attributes = {k: v for k, v in record["attrs"].items() if isinstance(v, (str, bool, int, float))}
+        attributes.update({"kind": record["kind"], "workflow": record["workflow"] or "", "queue_ms": record["queue_ms"]})
+        span = self.tracer.start_span(record["name"], start_time=start_ns, attributes=attributes)
+        if record["error"]:
+            span.set_attribute("error", record["error"])
+        span.end(end_time=start_ns + int(record["wall_ms"] * 1e6))
+
+
+def build_exporters(spec: str):
+    exporters = []
+    for name in [s.strip().lower() for s in spec.split(",") if s.strip()]:
+        try:
+            if name == "prometheus":
+                exporters.append(PrometheusExporter(int(os.getenv("CAREER_COPILOT_METRICS_PORT", "9464"))))
+            elif name in {"otel", "opentelemetry"}:
+                exporters.append(OpenTelemetryExporter())
+            else:
+                print(f"Unknown metrics exporter: {name}")
+        except ImportError as e:
+            print(f"Metrics exporter '{name}' unavailable ({e}); install its package to enable it.")
+        except Exception as e:
+            print(f"Error starting metrics exporter '{name}': {e}")
+    return exporters
+
+
+def summarize_trace(path: str = DEFAULT_TRACE_FILE, kind: str = "workflow") -> list[dict]:
+    """Aggregate wall time, tokens and cost per workflow from a trace log, slowest first."""
+    groups = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            key = record.get("workflow") or record.get("name")
+            group = groups.setdefault(key, {"workflow": key, "walls": [], "errors": 0, "tokens": 0, "cost_usd": 0.0})
+            attrs = record.get("attrs", {})
+            group["tokens"] += attrs.get("prompt_tokens", 0) + attrs.get("completion_tokens", 0)
+            group["cost_usd"] += attrs.get("cost_usd", 0.0)
+            if record.get("kind") == kind:
+                group["walls"].append(record.get("wall_ms", 0.0))
+                group["errors"] += record.get("status") == "error"
+    rows = []
+    for group in groups.values():
+        walls = sorted(group.pop("walls"))
+        if not walls:
+            continue
+        group.update(
+            runs=len(walls),
+            p50_ms=round(walls[len(walls) // 2], 1),
+            p95_ms=round(walls[min(len(walls) - 1, int(len(walls) * 0.95))], 1),
+            max_ms=round(walls[-1], 1),
+            cost_usd=round(group["cost_usd"], 6),
+        )
+        rows.append(group)
+    return sorted(rows, key=lambda r: r["p95_ms"], reverse=True)
+
+
+tracer = Tracer.from_env()
+
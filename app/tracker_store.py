@@ -0,0 +1,318 @@
+"""Local columnar copy of the job tracker, plus vectorized analytics over it.
+
+The Google Sheet stays the shared tracker, but every value on it is a string. This store
+keeps the same data as typed pandas frames (datetimes, status/source categories) saved as
+Parquet (``pyarrow``), or as pickles when pyarrow is not installed:
+
+* ``applications`` - rows appended through ``update_job_tracker``, unique on
+  (date applied, company, position); a later row for the same application updates its
+  status and records when the employer first responded
+* ``leads``        - Gmail scan results as written to the sheet, unique on the row fingerprint
+* ``removed``      - tombstones of applications deleted through ``remove_applications``, so
+  ``app.sheet_sync`` deletes a sheet row only when its application was removed on purpose
+
+``status_funnel``, ``response_time_by_source``, ``per_week`` and ``query_applications`` are
+single vectorized passes, fast enough for a dashboard over a few hundred thousand rows; the
+dashboard caches them on ``TrackerStore.version()``. ``app.sheet_sync`` keeps the copy and
+the tracker tab in step. Files live in ``.portia/tracker/`` (``CAREER_COPILOT_TRACKER_STORE``
+to move it, ``off`` to disable).
+"""
+import os
+from typing import Callable, Iterable
+
+import pandas as pd
+
+from app.checkpoints import row_fingerprint
+from tools.file_lock import FileLock
+from tools.schemas import LEAD_HEADERS
+
+DEFAULT_TRACKER_STORE = os.path.join(".portia", "tracker")
+
+APPLICATION_COLUMNS = ["date_applied", "company", "position", "status", "source", "contact_person",
+                       "next_action", "application_link", "notes"]
+LEAD_COLUMNS = [h.lower() for h in LEAD_HEADERS]
+
+# Pipeline order; the funnel counts an application at every stage up to its current one
+STATUSES = ["Email Received", "Applied", "Follow-up", "Interview Scheduled", "Interviewed", "Offer", "Rejected", "Other"]
+# Statuses that mean the employer answered
+RESPONSE_STATUSES = ["Interview Scheduled", "Interviewed", "Offer", "Rejected"]
+_TERMINAL = ("Rejected", "Other")
+_STATUS_LOOKUP = {s.lower(): s for s in STATUSES}
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    """Strings in any common format → naive UTC datetimes (NaT when unparseable)."""
+    parsed = pd.to_datetime(values.replace("", None), errors="coerce", utc=True, format="mixed")
+    return parsed.dt.tz_localize(None).astype("datetime64[ns]")
+
+
+def _text(values: pd.Series) -> pd.Series:
+    return values.fillna("").astype(str).str.strip().astype("string")
+
+
+def _status(values: pd.Series) -> pd.Series:
+    canonical = values.fillna("").astype(str).str.strip().str.lower().map(_STATUS_LOOKUP).fillna("Other")
+    return pd.Categorical(canonical, categories=STATUSES)
+
+
+def _key(frame: pd.DataFrame, columns: list[str]) -> pd.Series:
+    parts = [frame[c].astype(str).str.lower().str.split().str.join(" ") for c in columns]
+    return parts[0].str.cat(parts[1:], sep="\x1f")
+
+
+def applications_frame(rows: Iterable[dict | list]) -> pd.DataFrame:
+    """Tracker rows (``update_job_tracker`` dicts or sheet rows in column order) as a typed frame."""
+    raw = pd.DataFrame([r if isinstance(r, dict) else dict(zip(APPLICATION_COLUMNS, r)) for r in rows],
+                       columns=APPLICATION_COLUMNS + ["responded_at"])
+    frame = pd.DataFrame({
+        "date_applied": _dates(raw["date_applied"]),
+        **{c: _text(raw[c]) for c in APPLICATION_COLUMNS if c not in ("date_applied", "status", "source")},
+        "status": _status(raw["status"]),
+        "source": _text(raw["source"]).astype("category"),
+        "responded_at": _dates(raw["responded_at"]),
+    })
+    now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    frame["updated_at"] = pd.Series(now, index=frame.index, dtype="datetime64[ns]")
+    return frame[APPLICATION_COLUMNS + ["responded_at", "updated_at"]]
+
+
+def removed_frame(rows: Iterable[dict | list]) -> pd.DataFrame:
+    """Application keys (date applied, company, position) and when they were removed."""
+    frame = applications_frame(rows)
+    return frame[["date_applied", "company", "position"]].assign(removed_at=frame["updated_at"])
+
+
+def leads_frame(rows: Iterable[list]) -> pd.DataFrame:
+    """Sheet rows in ``LEAD_HEADERS`` order as a typed frame, with their row fingerprints."""
+    rows = [list(r) for r in rows]
+    raw = pd.DataFrame(rows, columns=LEAD_COLUMNS).fillna("")
+    frame = pd.DataFrame({
+        "date": _dates(raw["date"]),
+        "company": _text(raw["company"]),
+        "role": _text(raw["role"]),
+        "source": _text(raw["source"]).astype("category"),
+        "url": _text(raw["url"]),
+        "deadline": _dates(raw["deadline"]),
+        "fingerprint": pd.Series([row_fingerprint(r) for r in rows], dtype="string"),
+    })
+    return frame
+
+
+# ---- analytics ------------------------------------------------------------------
+
+def status_funnel(applications: pd.DataFrame) -> pd.DataFrame:
+    """Applications per status, and how many reached each pipeline stage (share of all)."""
+    counts = applications["status"].value_counts(sort=False).reindex(STATUSES, fill_value=0)
+    pipeline = counts.drop(list(_TERMINAL))
+    reached = pipeline[::-1].cumsum()[::-1].reindex(STATUSES)
+    reached[list(_TERMINAL)] = counts[list(_TERMINAL)]
+    total = max(1, len(applications))
+    return pd.DataFrame({"status": STATUSES, "count": counts.to_numpy(), "reached": reached.to_numpy(dtype=int),
+                         "share": (reached / total).round(3).to_numpy()})
+
+
+def response_time_by_source(applications: pd.DataFrame) -> pd.DataFrame:
+    """Per source: applications, responses, response rate and days from applying to the first response."""
+    frame = pd.DataFrame({
+        "source": applications["source"],
+        "responded": applications["status"].isin(RESPONSE_STATUSES),
+        "days": (applications["responded_at"] - applications["date_applied"]).dt.days,
+    })
+    out = frame.groupby("source", observed=True).agg(
+        applications=("responded", "size"), responses=("responded", "sum"),
+        median_days=("days", "median"), mean_days=("days", "mean"),
+    )
+    out["response_rate"] = (out["responses"] / out["applications"]).round(3)
+    out["mean_days"] = out["mean_days"].round(1)
+    return out.sort_values("applications", ascending=False).reset_index()
+
+
+def per_week(frame: pd.DataFrame, column: str = "date_applied") -> pd.DataFrame:
+    """Rows per calendar week (weeks start on Monday; empty weeks are included as 0)."""
+    dates = frame[column].dropna()
+    if dates.empty:
+        return pd.DataFrame({"week": pd.Series(dtype="datetime64[ns]"), "count": pd.Series(dtype=int)})
+    weekly = pd.Series(1, index=pd.DatetimeIndex(dates)).resample("W-MON", label="left", closed="left").sum()
+    return weekly.rename_axis("week").reset_index(name="count")
+
+
+def query_applications(applications: pd.DataFrame, statuses=(), sources=(), search: str = "",
+                       sort_by: str = "date_applied", descending: bool = True, page: int = 0,
+                       page_size: int = 50) -> tuple[pd.DataFrame, int]:
+    """One page of filtered, sorted applications and the number of matching rows."""
+    mask = pd.Series(True, index=applications.index)
+    if statuses:
+        mask &= applications["status"].isin(statuses)
+    if sources:
+        mask &= applications["source"].isin(sources)
+    if search:
+        needle = search.strip().lower()
+        mask &= (applications["company"].str.lower().str.contains(needle, regex=False)
+                 | applications["position"].str.lower().str.contains(needle, regex=False)).fillna(False)
+    # Sort just the key column, then copy only the rows on the requested page
+    order = applications.loc[mask, sort_by].sort_values(ascending=not descending, kind="stable",
+                                                        na_position="last").index
+    start = max(0, page) * page_size
+    rows = applications.loc[order[start:start + page_size], APPLICATION_COLUMNS + ["responded_at"]]
+    return rows.reset_index(drop=True), len(order)
+
+
+# ---- storage --------------------------------------------------------------------
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class TrackerStore:
+    """Applications and leads as typed frames on disk; reads are cached until the file changes.
+
+    Safe to share between threads and between processes (daemon, API workers, Streamlit): every
+    update re-reads the table and saves it under one file lock.
+    """
+
+    KINDS = {"applications": applications_frame, "leads": leads_frame, "removed": removed_frame}
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv("CAREER_COPILOT_TRACKER_STORE", DEFAULT_TRACKER_STORE)
+        os.makedirs(self.path, exist_ok=True)
+        self.suffix = ".parquet" if _has_pyarrow() else ".pkl"
+        # A copy written as pickles before pyarrow was installed stays in that format
+        if self.suffix == ".parquet" and not os.path.exists(self._file("applications")) \
+                and os.path.exists(os.path.join(self.path, "applications.pkl")):
+            self.suffix = ".pkl"
+        self._cache: dict[str, tuple[tuple, pd.DataFrame]] = {}
+        # Held around every load-modify-save, by threads and by other processes using the same directory
+        self._lock = FileLock(os.path.join(self.path, ".lock"))
+
+    @classmethod
+    def from_env(cls) -> "TrackerStore | None":
+        if os.getenv("CAREER_COPILOT_TRACKER_STORE", "").lower() in ("off", "0", "false"):
+            return None
+        try:
+            return cls()
+        except OSError as e:
+            print(f"⚠️ Local tracker store disabled: {e}")
+            return None
+
+    def _file(self, kind: str) -> str:
+        return os.path.join(self.path, kind + self.suffix)
+
+    def _stamp(self, kind: str) -> tuple:
+        try:
+            st = os.stat(self._file(kind))
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return 0, 0
+
+    def version(self) -> tuple:
+        """Changes whenever either table is written; use it as a cache key."""
+        return tuple(self._stamp(kind) for kind in self.KINDS)
+
+    def load(self, kind: str) -> pd.DataFrame:
+        stamp = self._stamp(kind)
+        cached = self._cache.get(kind)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        if stamp == (0, 0):
+            frame = self.KINDS[kind]([])
+        elif self.suffix == ".parquet":
+            frame = pd.read_parquet(self._file(kind))
+        else:
+            frame = pd.read_pickle(self._file(kind))
+        self._cache[kind] = (stamp, frame)
+        return frame
+
+    def _save(self, kind: str, frame: pd.DataFrame):
+        frame = frame.reset_index(drop=True)
+        tmp = self._file(kind) + ".tmp"
+        if self.suffix == ".parquet":
+            frame.to_parquet(tmp, index=False)
+        else:
+            frame.to_pickle(tmp)
+        os.replace(tmp, self._file(kind))
+        self._cache[kind] = (self._stamp(kind), frame)
+
+    def add_applications(self, rows: Iterable[dict | list]) -> int:
+        """Insert or update applications. Returns the number of new ones.
+
+        An update keeps the original row's first-response time; it is set the first time the
+        status moves to one of ``RESPONSE_STATUSES``.
+        """
+        new = applications_frame(rows)
+        if new.empty:
+            return 0
+        key_columns = ["date_applied", "company", "position"]
+        with self._lock:
+            old = self.load("applications")
+            new_keys = _key(new, key_columns)
+            old_keys = _key(old, key_columns)
+            previous = old.assign(_k=old_keys).drop_duplicates("_k", keep="last").set_index("_k")
+            keys = new_keys.to_numpy()
+            # Unknown applications count as answered, so adding one never invents a response time
+            was_answered = previous["status"].isin(RESPONSE_STATUSES).reindex(keys, fill_value=True).to_numpy()
+            new["responded_at"] = new["responded_at"].fillna(
+                pd.Series(previous["responded_at"].reindex(keys).to_numpy(), index=new.index))
+            # A tracked application just moved to a response status: that is when they answered
+            answered_now = new["status"].isin(RESPONSE_STATUSES) & ~was_answered & new["responded_at"].isna()
+            new.loc[answered_now, "responded_at"] = new.loc[answered_now, "updated_at"]
+            added = int((~new_keys.drop_duplicates().isin(old_keys)).sum())
+            frame = pd.concat([old[~old_keys.isin(new_keys)], new], ignore_index=True)
+            frame["status"] = pd.Categorical(frame["status"], categories=STATUSES)
+            frame["source"] = frame["source"].astype("category")
+            self._save("applications", frame.drop_duplicates(key_columns, keep="last"))
+        return added
+
+    def remove_applications(self, rows: Iterable[dict | list]) -> int:
+        """Delete applications by (date applied, company, position) and record their tombstones. Returns rows removed."""
+        gone = applications_frame(rows)
+        key_columns = ["date_applied", "company", "position"]
+        with self._lock:
+            old = self.load("applications")
+            keep = ~_key(old, key_columns).isin(_key(gone, key_columns))
+            if keep.all():
+                return 0
+            self._save("applications", old[keep])
+            now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+            tombstones = old.loc[~keep, key_columns].assign(removed_at=now)
+            frame = pd.concat([self.load("removed"), tombstones], ignore_index=True)
+            self._save("removed", frame.drop_duplicates(key_columns, keep="last"))
+        return int((~keep).sum())
+
+    def add_leads(self, rows: Iterable[list]) -> int:
+        """Append scan rows not already stored (same fingerprint as the sheet dedupe). Returns rows added."""
+        new = leads_frame(rows)
+        if new.empty:
+            return 0
+        with self._lock:
+            old = self.load("leads")
+            new = new[~new["fingerprint"].isin(old["fingerprint"])].drop_duplicates("fingerprint")
+            if not new.empty:
+                frame = pd.concat([old, new], ignore_index=True)
+                frame["source"] = frame["source"].astype("category")
+                self._save("leads", frame)
+        return len(new)
+
+    def tee_leads(self, append: Callable[[list], int]) -> Callable[[list], int]:
+        """Wrap a sheet ``append(rows)`` so rows that reach the sheet are stored here too."""
+        def append_and_store(rows):
+            written = append(rows)
+            try:
+                self.add_leads(rows)
+            except Exception as e:  # the sheet is the source of truth; never fail a write over the local copy
+                print(f"⚠️ Local tracker store: {e}")
+            return written
+        return append_and_store
+
+    def export(self, kind: str, path: str):
+        """Write one table to ``.parquet`` or ``.csv``."""
+        frame = self.load(kind)
+        if path.lower().endswith(".parquet"):
+            if not _has_pyarrow():
+                raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow (or export to a .csv file)")
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
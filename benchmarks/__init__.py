@@ -0,0 +1 @@
+# Offline benchmark suite (fake LLM / Gmail / Sheets backend)
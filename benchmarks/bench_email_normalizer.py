@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Token reduction from tools/email_normalizer.py on the recorded Gmail bodies.
+
+Every distinct body in the recorded ``emails`` / ``gmail_search_results`` memories is
+compared three ways: raw, cut at ``--max-chars`` (what extraction sent before), and
+normalized with the same cap. Tokens use the same ~4 chars/token estimate as the tracer.
+
+Usage:
+    python -m benchmarks.bench_email_normalizer --max-chars 1500 --repeat 200
+"""
+import argparse
+import json
+import time
+
+from app.tracing import estimate_tokens
+from benchmarks.fakes import AGENT_MEMORY_DIR, load_agent_memory
+from tools.email_normalizer import normalize_body
+
+
+def recorded_bodies(root: str = AGENT_MEMORY_DIR) -> list[str]:
+    """Distinct email bodies from the recorded agent memory under ``root``."""
+    payloads = load_agent_memory(root)
+    seen, bodies = set(), []
+    for value in payloads.get("emails", []) + payloads.get("gmail_search_results", []):
+        try:
+            emails = json.loads(value)
+        except json.JSONDecodeError:
+            continue
+        for email in emails if isinstance(emails, list) else []:
+            body = email.get("body", "") if isinstance(email, dict) else ""
+            if body and body not in seen:
+                seen.add(body)
+                bodies.append(body)
+    return bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Email body normalization: tokens saved per email")
+    parser.add_argument("--max-chars", type=int, default=1500, help="Body cap used by the extraction prompt")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    bodies = recorded_bodies()
+    if not bodies:
+        print("No recorded email bodies under .portia/cache/agent_memory")
+        return
+    raw = capped = normalized = 0
+    print(f"{'raw tok':>8} {'capped tok':>10} {'normalized tok':>14}  subject line")
+    for body in bodies:
+        before, cut, after = (estimate_tokens(body), estimate_tokens(body[:args.max_chars]),
+                              estimate_tokens(normalize_body(body, args.max_chars)))
+        raw, capped, normalized = raw + before, capped + cut, normalized + after
+        print(f"{before:>8} {cut:>10} {after:>14}  {body.strip().splitlines()[0][:50]!r}")
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for body in bodies:
+            normalize_body(body, args.max_chars)
+    us = (time.perf_counter() - t0) * 1e6 / (args.repeat * len(bodies))
+
+    n = len(bodies)
+    print(f"\n{n} emails, average tokens per email: raw {raw / n:.0f}, capped {capped / n:.0f}, "
+          f"normalized {normalized / n:.0f}")
+    print(f"Reduction vs raw: {1 - normalized / raw:.0%}; vs the capped body: {1 - normalized / capped:.0%}; "
+          f"{us:.0f} µs per email")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Repeated small Sheets appends against a local fake endpoint: per-call vs pooled transport.
+
+``per-call`` opens a new transport (and so a new connection) for every write, which is
+what ``build('sheets', 'v4', credentials=creds)`` per call amounted to; ``pooled`` reuses
+one ``PooledHttp``; ``pooled xN`` shares it between N threads. ``--handshake-ms`` charges
+each new connection the TCP+TLS setup a real Google endpoint costs (loopback has none).
+``--fail-every`` answers every Nth request with a 429 to exercise the backoff path.
+
+Usage:
+    python -m benchmarks.bench_google_transport --writes 200 --handshake-ms 30 --threads 4
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeSheetsEndpoint, Latency
+from benchmarks.harness import percentile
+from tools.google_transport import ConnectionPool, PooledHttp
+
+
+def _write(http: PooledHttp, url: str, i: int):
+    body = json.dumps({"values": [[f"2025-08-{i % 28 + 1:02d}", f"Company {i}", "Engineer", "Applied"]]})
+    response, _ = http.request(url, "POST", body=body, headers={"content-type": "application/json"})
+    if response.status != 200:
+        raise RuntimeError(f"write {i} failed: {response.status}")
+
+
+def run(mode: str, endpoint: FakeSheetsEndpoint, writes: int, threads: int, fail_every: int) -> dict:
+    url = f"{endpoint.url}/v4/spreadsheets/bench/values/Applications!A1:append?valueInputOption=USER_ENTERED"
+    endpoint.fail_with = []
+    connections = endpoint.connections
+    shared = PooledHttp(pool=ConnectionPool(max_idle=max(1, threads)), backoff_base=0.01)
+    latencies = []
+
+    def one(i: int):
+        if fail_every and i % fail_every == fail_every - 1:
+            endpoint.fail_with.append((429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}},
+                                       {"Retry-After": "0"}))
+        http = PooledHttp(backoff_base=0.01) if mode == "per-call" else shared
+        t0 = time.perf_counter()
+        _write(http, url, i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if http is not shared:
+            shared.pool.stats["retries"] += http.pool.stats["retries"]
+            http.close()
+
+    started = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(one, range(writes)))
+    else:
+        for i in range(writes):
+            one(i)
+    total = time.perf_counter() - started
+    shared.close()
+    latencies.sort()
+    return {
+        "writes_per_s": round(writes / total, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "connections": endpoint.connections - connections,
+        "retries": shared.pool.stats["retries"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Google API transport benchmark (local fake endpoint)")
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=30.0, help="Setup cost per new connection")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Server time per request")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every Nth request with a 429")
+    args = parser.parse_args()
+
+    modes = [("per-call", 1), ("pooled", 1)] + ([(f"pooled x{args.threads}", args.threads)] if args.threads > 1 else [])
+    print(f"{'mode':<12} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'conns':>6} {'retries':>8}")
+    with FakeSheetsEndpoint(args.handshake_ms, Latency(args.latency_ms)) as endpoint:
+        for name, threads in modes:
+            result = run(name.split()[0], endpoint, args.writes, threads, args.fail_every)
+            print(f"{name:<12} {result['writes_per_s']:>9} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+                  f"{result['connections']:>6} {result['retries']:>8}")
+
+
+if __name__ == "__main__":
+    main()
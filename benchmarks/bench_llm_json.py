@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+r"""Microbenchmarks for tools/llm_json.py on large recorded LLM outputs.
+
+Each recorded payload is inflated (its array repeated ``--scale`` times) and
+wrapped the way LLMs actually answer: bare, fenced, with prose that contains
+braces, and as a Python repr of chunks. The decoder is compared with the
+find('{')/rfind('}') + replace('\\"', '"') approach it replaced.
+
+Usage:
+    python -m benchmarks.bench_llm_json --scale 50 --repeat 20
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.fakes import load_agent_memory
+from tools.llm_json import LLMJSONError, extract_json
+
+
+def legacy_extract(output: str):
+    """The extraction previously inlined in generate_interview_questions."""
+    if output.startswith("```") and output.endswith("```"):
+        output = output.strip("`").strip()
+        if output.startswith("json\n"):
+            output = output[5:]
+    start = output.find("{")
+    end = output.rfind("}") + 1
+    if start == -1 or end == 0:
+        raise ValueError("no JSON")
+    candidate = output[start:end]
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return json.loads(candidate.replace('\\"', '"'))
+
+
+def build_cases(scale: int) -> dict[str, str]:
+    payloads = load_agent_memory()
+    cases = {}
+    for name in ("interview_questions", "emails", "gmail_search_results"):
+        for value in payloads.get(name, []):
+            try:
+                data = extract_json(value)
+            except LLMJSONError:
+                continue
+            items = data["interview_prep"] if isinstance(data, dict) else data
+            big = json.dumps({"interview_prep": items * scale} if isinstance(data, dict) else items * scale)
+            cases[f"{name}/bare"] = big
+            cases[f"{name}/fenced"] = f"```json\n{big}\n```"
+            cases[f"{name}/prose"] = f"Here is the {{requested}} data:\n{big}\nLet me know if you need {{more}}."
+            cases[f"{name}/chunks"] = "Agent returned invalid content: " + repr([big[: len(big) // 2], big[len(big) // 2:]])
+            break
+    return cases
+
+
+def bench(fn, text: str, repeat: int) -> tuple[bool, float, float]:
+    try:
+        fn(text)
+        ok = True
+    except Exception:
+        ok = False
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            fn(text)
+        except Exception:
+            pass
+    ms = (time.perf_counter() - t0) * 1000 / repeat
+    tracemalloc.start()
+    try:
+        fn(text)
+    except Exception:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ok, ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM JSON decoder microbenchmarks")
+    parser.add_argument("--scale", type=int, default=50, help="Repeat each recorded array this many times")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = build_cases(args.scale)
+    print(f"{'case':<34} {'KiB':>8} | {'legacy ok':>9} {'ms':>8} {'peak KiB':>9} | {'decoder ok':>10} {'ms':>8} {'peak KiB':>9}")
+    for name, text in cases.items():
+        legacy = bench(legacy_extract, text, args.repeat)
+        new = bench(extract_json, text, args.repeat)
+        print(f"{name:<34} {len(text) / 1024:>8.0f} | {str(legacy[0]):>9} {legacy[1]:>8.2f} {legacy[2]:>9.0f} | "
+              f"{str(new[0]):>10} {new[1]:>8.2f} {new[2]:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
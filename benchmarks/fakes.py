@@ -0,0 +1,254 @@
+"""Deterministic offline stand-ins for the LLM, Portia and the Gmail/Sheets tools.
+
+Responses are replayed from the recorded ``.portia/cache/agent_memory`` payloads
+so workflows exercise the same parsing code as a live run, with configurable
+injected latency instead of network calls.
+"""
+import glob
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+AGENT_MEMORY_DIR = os.path.join(".portia", "cache", "agent_memory")
+
+JOB_KEYWORDS = re.compile(r"job|application|interview|hiring|position|role|recruit", re.IGNORECASE)
+
+
+def load_agent_memory(root: str = AGENT_MEMORY_DIR) -> dict[str, list[str]]:
+    """Group recorded payload values by memory name, e.g. ``{"emails": [...], "interview_questions": [...]}``."""
+    payloads = {}
+    for path in sorted(glob.glob(os.path.join(root, "*", "$*.json"))):
+        name = os.path.basename(path)[1:-len(".json")]
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f).get("value")
+        except (OSError, json.JSONDecodeError, AttributeError):
+            continue
+        if isinstance(value, str):
+            payloads.setdefault(name, []).append(value)
+    return payloads
+
+
+class Latency:
+    """Seeded latency injector: ``base_ms`` plus uniform jitter."""
+
+    def __init__(self, base_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+
+    def wait(self):
+        delay = self.base_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+
+class FakeOutput:
+    def __init__(self, value):
+        self.value = value
+        self.summary = None
+
+
+class FakePlan:
+    def __init__(self, query: str):
+        self.id = f"plan-{uuid.uuid4()}"
+        self.query = query
+        self.steps = []
+
+
+class FakePlanRun:
+    """Mimics the attributes of a Portia ``PlanRun`` that the orchestrator reads."""
+
+    def __init__(self, plan: FakePlan, value):
+        self.id = f"prun-{uuid.uuid4()}"
+        self.plan_id = plan.id
+        self.state = "COMPLETE"
+        self.final_output = FakeOutput(value)
+
+
+class FakeGmailTool:
+    """Returns recorded mailbox search results."""
+
+    def __init__(self, mailboxes: list[str], latency: Latency):
+        self.mailboxes = mailboxes or ["[]"]
+        self.latency = latency
+        self._calls = 0
+
+    def search(self) -> list[dict]:
+        self.latency.wait()
+        raw = self.mailboxes[self._calls % len(self.mailboxes)]
+        self._calls += 1
+        return json.loads(raw)
+
+
+class FakeSheetsTool:
+    """Accepts appended rows in memory."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.rows = []
+
+    def append(self, rows: list) -> int:
+        self.latency.wait()
+        self.rows.extend(rows)
+        return len(rows)
+
+
+class FakeLLM:
+    """Answers orchestrator prompts with recorded or deterministic completions."""
+
+    def __init__(self, payloads: dict[str, list[str]], latency: Latency):
+        self.latency = latency
+        self.interview = payloads.get("interview_questions", []) or ['{"interview_prep": []}']
+        self._calls = 0
+
+    def extract_leads(self, emails: list[dict]) -> str:
+        self.latency.wait()
+        rows = [
+            {
+                "date": e.get("date", ""),
+                "company": e.get("from", "").split("<")[0].strip(),
+                "role": e.get("subject", ""),
+                "source": "Gmail",
+                "url": "",
+                "deadline": "",
+                "message_id": e.get("id", ""),
+            }
+            for e in emails
+            if JOB_KEYWORDS.search(e.get("subject", ""))
+        ]
+        return json.dumps(rows, ensure_ascii=False)
+
+    def complete(self, prompt: str) -> str:
+        self.latency.wait()
+        self._calls += 1
+        if "interview" in prompt.lower():
+            return self.interview[self._calls % len(self.interview)]
+        if "Suggest" in prompt:
+            return "\n".join(f"{i}. Quantify impact in bullet {i}." for i in range(1, 8))
+        if "row_count_appended" in prompt:
+            return json.dumps({"success": True, "row_count_appended": 1, "message": "Appended 1 row"})
+        return "OK"
+
+
+class FakePortia:
+    """Drop-in for ``Portia`` exposing ``plan``/``run_plan``/``run`` over the fakes above."""
+
+    def __init__(self, payloads: dict[str, list[str]] | None = None, llm_latency: Latency | None = None,
+                 tool_latency: Latency | None = None):
+        payloads = payloads if payloads is not None else load_agent_memory()
+        tool_latency = tool_latency or Latency()
+        self.llm = FakeLLM(payloads, llm_latency or Latency())
+        self.gmail = FakeGmailTool(payloads.get("emails", []), tool_latency)
+        self.sheets = FakeSheetsTool(tool_latency)
+
+    def plan(self, query: str) -> FakePlan:
+        return FakePlan(query)
+
+    def run_plan(self, plan: FakePlan) -> FakePlanRun:
+        query = plan.query
+        if "Scan Gmail" in query:
+            value = self.llm.extract_leads(self.gmail.search())
+        elif "Emails: " in query:
+            # Batched extraction prompt from app.gmail_pipeline
+            value = self.llm.extract_leads(json.loads(query.split("Emails: ", 1)[1]))
+        elif "Google Sheet" in query and "Data to append" in query:
+            count = self.sheets.append([query])
+            value = f"Appended {count} row(s) to the sheet."
+        else:
+            value = self.llm.complete(query)
+        return FakePlanRun(plan, value)
+
+    def run(self, query: str) -> FakePlanRun:
+        return self.run_plan(self.plan(query))
+
+
+class FakeToolRegistry:
+    def get_tools(self):
+        return [
+            {"id": "portia:google:gmail:search_email", "name": "Gmail: Search Email"},
+            {"id": "portia:google:sheets:append_row", "name": "Sheets: Append Row"},
+        ]
+
+
+class FakeSheetsEndpoint:
+    """Local HTTP/1.1 stand-in for ``values.append`` on the Sheets API, with keep-alive.
+
+    ``handshake_ms`` is paid once per new connection (what TCP+TLS setup costs against
+    Google), ``latency`` once per request. ``fail_with`` is a queue of ``(status, body,
+    headers)`` answers served before the normal ones, to inject 429/5xx/quota errors; a
+    ``"drop"`` entry applies the append and then closes the connection without answering,
+    like a reset or read timeout after the server got the request. PUT behaves like POST.
+    """
+
+    def __init__(self, handshake_ms: float = 0.0, latency: Latency | None = None):
+        self.handshake_ms = handshake_ms
+        self.latency = latency or Latency()
+        self.fail_with = []
+        self.connections = 0
+        self.requests = 0
+        self.rows = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def setup(self):
+                super().setup()
+                with endpoint._lock:
+                    endpoint.connections += 1
+                if endpoint.handshake_ms:
+                    time.sleep(endpoint.handshake_ms / 1000)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                endpoint.latency.wait()
+                with endpoint._lock:
+                    endpoint.requests += 1
+                    failure = endpoint.fail_with.pop(0) if endpoint.fail_with else None
+                    if failure is None or failure == "drop":
+                        endpoint.rows.extend(json.loads(body or b"{}").get("values", []))
+                if failure == "drop":
+                    self.close_connection = True
+                    return
+                if failure is not None:
+                    status, payload, headers = failure
+                else:
+                    rows = len(json.loads(body or b"{}").get("values", []))
+                    status, payload, headers = 200, {"updates": {"updatedRows": rows}}, {}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_PUT = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,119 @@
+"""Measure orchestrator workflows: throughput, latency percentiles, allocations and peak memory."""
+import gc
+import json
+import math
+import time
+import tracemalloc
+
+SAMPLE_JD = """
+Senior Python Developer (AI/LLM Focus)
+
+Requirements:
+- 2+ years of Python development experience
+- Knowledge of AI, LLMs, and multi-agent systems
+- Experience with cloud deployment and API development
+"""
+
+SAMPLE_RESUME = """
+Software engineer with 3 years of Python, FastAPI and PyTorch experience.
+Built LLM-powered chat assistants and deployed them on AWS with Docker.
+"""
+
+SAMPLE_PROFILE = {"name": "Bench User", "experience_years": 3, "skills": "Python, PyTorch, AWS"}
+
+SAMPLE_JOB = {
+    "date_applied": "2025-08-24",
+    "company": "Bench Co",
+    "position": "Python Developer",
+    "status": "Applied",
+    "source": "LinkedIn",
+}
+
+WORKFLOWS = {
+    "generate_interview_questions": lambda orch: orch.generate_interview_questions(SAMPLE_JD, SAMPLE_PROFILE),
+    "analyze_resume_and_job": lambda orch: orch.analyze_resume_and_job(SAMPLE_RESUME, SAMPLE_JD, SAMPLE_PROFILE),
+    "gmail_to_sheets": lambda orch: orch.gmail_to_sheets(sheet_id="bench-sheet", sheet_tab="Applications"),
+    "gmail_pipeline": lambda orch: orch.gmail_to_sheets(
+        sheet_id="bench-sheet", sheet_tab="Applications", pages=[orch.portia.gmail.search()]
+    ),
+    "update_job_tracker": lambda orch: orch.update_job_tracker(SAMPLE_JOB, sheet_id="bench-sheet"),
+}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def measure(fn, iterations: int = 50, warmup: int = 3, memory_iterations: int = 5) -> dict:
+    """Time ``fn`` first, then sample allocations in a separate tracemalloc pass so it does not skew latency."""
+    for _ in range(warmup):
+        fn()
+
+    gc.collect()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - started
+    latencies.sort()
+
+    alloc_blocks = alloc_bytes = peak_bytes = 0
+    tracemalloc.start()
+    try:
+        for _ in range(memory_iterations):
+            gc.collect()
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            baseline, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            stats = after.compare_to(before, "filename")
+            alloc_blocks += sum(max(0, s.count_diff) for s in stats)
+            alloc_bytes += sum(max(0, s.size_diff) for s in stats)
+            peak_bytes = max(peak_bytes, peak - baseline)
+    finally:
+        tracemalloc.stop()
+
+    runs = max(1, memory_iterations)
+    return {
+        "iterations": iterations,
+        "throughput_per_s": round(iterations / total, 2) if total else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "alloc_blocks": alloc_blocks // runs,
+        "alloc_kib": round(alloc_bytes / runs / 1024, 1),
+        "peak_kib": round(peak_bytes / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25) -> list[str]:
+    """Return human-readable regressions where p95 latency or peak memory grew past ``tolerance``."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ("p95_ms", "peak_kib"):
+            old, new = previous.get(metric, 0), current.get(metric, 0)
+            if old and new > old * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("workflows", {})
+
+
+def save_baseline(path: str, results: dict, settings: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"settings": settings, "workflows": results}, f, indent=2)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+r"""Profile orchestrator post-processing on a recorded cassette.
+
+Replays a cassette (see ``app/cassette.py``) sequentially, so any inputs work,
+and prints the hottest functions in ``app/`` and ``tools/``.
+
+Usage:
+    python cli.py gmail-to-sheets --demo --record runs.jsonl.gz      # once, live
+    python -m benchmarks.profile_replay runs.jsonl.gz --workflow gmail_to_sheets --iterations 200
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+os.environ.setdefault("CAREER_COPILOT_TRACE_FILE", "off")
+os.environ.setdefault("CAREER_COPILOT_INTERVIEW_CACHE", "off")
+os.environ.setdefault("CAREER_COPILOT_QUESTION_BANK", "off")
+os.environ.setdefault("CAREER_COPILOT_TRACKER_STORE", "off")
+
+from app.cassette import ReplayPortia  # noqa: E402
+from benchmarks.fakes import FakeToolRegistry  # noqa: E402
+from benchmarks.harness import WORKFLOWS  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile a workflow against a recorded cassette")
+    parser.add_argument("cassette")
+    parser.add_argument("--workflow", choices=sorted(WORKFLOWS), default="gmail_to_sheets")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--realtime", action="store_true", help="Sleep for the recorded run durations")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--output", help="Also dump raw pstats to this file")
+    args = parser.parse_args()
+
+    from app.orchestrator import CareerCopilotOrchestrator
+
+    replay = ReplayPortia(args.cassette, realtime=args.realtime, match="sequential")
+    print(f"Replaying {len(replay.entries)} recorded runs from {args.cassette}")
+    orch = CareerCopilotOrchestrator(portia_client=replay, tool_registry=FakeToolRegistry(), cassette="")
+    fn = WORKFLOWS[args.workflow]
+
+    profiler = cProfile.Profile()
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            profiler.enable()
+            for _ in range(args.iterations):
+                fn(orch)
+            profiler.disable()
+        finally:
+            sys.stdout = stdout
+
+    if args.output:
+        profiler.dump_stats(args.output)
+    stats = pstats.Stats(profiler).sort_stats("cumulative")
+    stats.print_stats(r"(app|tools)[\\/]", args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+r"""Offline benchmark suite for the orchestrator workflows.
+
+Runs every workflow against the deterministic fake LLM / Gmail / Sheets backend
+(no API keys or network needed) and reports throughput, p50/p95/p99 latency,
+allocations and peak memory.
+
+Usage:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --llm-latency-ms 50 --tool-latency-ms 20
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json   # exits 1 on regression (CI)
+"""
+import argparse
+import os
+import sys
+
+# The orchestrator builds a Portia config at import time; give it placeholder keys
+# and keep benchmark spans out of the production trace log.
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+os.environ.setdefault("CAREER_COPILOT_TRACE_FILE", "off")
+os.environ.setdefault("CAREER_COPILOT_INTERVIEW_CACHE", "off")
+os.environ.setdefault("CAREER_COPILOT_QUESTION_BANK", "off")
+os.environ.setdefault("CAREER_COPILOT_TRACKER_STORE", "off")
+
+from benchmarks.fakes import AGENT_MEMORY_DIR, FakePortia, FakeToolRegistry, Latency, load_agent_memory  # noqa: E402
+from benchmarks.harness import WORKFLOWS, compare, load_baseline, measure, save_baseline  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Career Copilot offline benchmarks")
+    parser.add_argument("--workflow", action="append", choices=sorted(WORKFLOWS), help="Run only these workflows")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Injected latency per LLM call")
+    parser.add_argument("--tool-latency-ms", type=float, default=0.0, help="Injected latency per Gmail/Sheets call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory-dir", default=AGENT_MEMORY_DIR, help="Recorded agent_memory payloads to replay")
+    parser.add_argument("--save-baseline", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this JSON baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown vs baseline")
+    args = parser.parse_args()
+
+    from app.orchestrator import CareerCopilotOrchestrator
+
+    payloads = load_agent_memory(args.memory_dir)
+    print(f"Replaying {sum(len(v) for v in payloads.values())} recorded payloads from {args.memory_dir}")
+    fake = FakePortia(
+        payloads,
+        llm_latency=Latency(args.llm_latency_ms, args.jitter_ms, seed=args.seed),
+        tool_latency=Latency(args.tool_latency_ms, args.jitter_ms, seed=args.seed + 1),
+    )
+    orch = CareerCopilotOrchestrator(portia_client=fake, tool_registry=FakeToolRegistry())
+
+    results = {}
+    names = args.workflow or list(WORKFLOWS)
+    print(f"\n{'workflow':<30} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'alloc blk':>10} {'alloc KiB':>10} {'peak KiB':>9}")
+    for name in names:
+        fn = WORKFLOWS[name]
+        # Workflows print progress; keep the report readable
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                stats = measure(lambda: fn(orch), iterations=args.iterations, warmup=args.warmup)
+            finally:
+                sys.stdout = stdout
+        results[name] = stats
+        print(f"{name:<30} {stats['throughput_per_s']:>9} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9} "
+              f"{stats['alloc_blocks']:>10} {stats['alloc_kib']:>10} {stats['peak_kib']:>9}")
+
+    settings = {k: getattr(args, k) for k in ("iterations", "llm_latency_ms", "tool_latency_ms", "jitter_ms", "seed")}
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, settings)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+        if regressions:
+            print("\n❌ Performance regressions:")
+            for line in regressions:
+                print(f"  - {line}")
+            raise SystemExit(1)
+        print("\n✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
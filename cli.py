@@ -13,9 +13,85 @@ If omitted, values are read from .env (SHEET_ID, SHEET_TAB).
 This will create a plan in Portia which triggers OAuth flows in the terminal.
 """
 import argparse
-import json
 import os
-from app.orchestrator import CareerCopilotOrchestrator
+# Heavy imports (Portia SDK, pydantic models) happen inside the commands that need them,
+# so thin calls to a running daemon start in milliseconds.
+from app.daemon import DaemonClient, daemon_port
+from app.tracing import DEFAULT_TRACE_FILE
+
+DEFAULT_QUERY = "newer_than:30d"
+
+
+def print_progress(counts: dict):
+    """Redraw one status line with the items that passed each stage so far."""
+    from app.gmail_pipeline import STAGES
+
+    line = " | ".join(f"{name} {counts.get(name, 0)}" for name in STAGES)
+    print(f"\r⏳ {line} | dupes {counts.get('duplicates', 0)}", end="", flush=True)
+
+
+def print_leads(leads: list[dict]):
+    """One line per ranked lead (app/lead_ranking.py), most urgent first."""
+    for lead in leads:
+        if not lead.get("deadline"):
+            due = "no deadline"
+        else:
+            due = f"expired {lead['deadline']}" if lead["expired"] else f"due {lead['deadline']} ({lead['days_left']}d)"
+        print(f"  {lead['priority']:<6} {lead['score']:.2f}  {lead['company'] or '?'} | {lead['role'] or '?'} | {due}")
+
+
+def print_summary(result: dict, demo_mode: bool):
+    """Print a GmailToSheetsResult (as a dict, so daemon responses print the same way)."""
+    print("\n📊 RESULTS SUMMARY")
+    print("==================")
+    
+    stages = result.get("stages") or {}
+    email_scan = result.get("email_scan")
+    if email_scan is not None:
+        if not email_scan.get("error"):
+            print(f"✅ Matched rows: {stages.get('extract', len(email_scan.get('leads') or []))}")
+        else:
+            print(f"📧 Email data extracted but not decodable: {email_scan['error']}")
+    
+    if stages:
+        from app.gmail_pipeline import STAGES
+
+        print("🧮 Stages: " + ", ".join(f"{name}={stages.get(name, 0)}" for name in STAGES))
+    
+    if stages.get("threaded"):
+        print(f"🧵 Threads: {stages.get('threads', 0)} conversation(s) extracted, "
+              f"{stages['threaded']} earlier message(s) merged without an LLM call")
+
+    if result.get("top_leads"):
+        print("🔥 Most urgent leads:")
+        print_leads(result["top_leads"][:5])
+
+    if stages.get("attachments") or stages.get("attachment_errors"):
+        print(f"📎 Attachments: {stages.get('attachments', 0)} parsed, {stages.get('attachment_dupes', 0)} duplicate, "
+              f"{stages.get('attachment_errors', 0)} failed")
+        for item in result.get("attachments") or []:
+            score = f" | ATS {item['ats_score']}" if item.get("ats_score") is not None else ""
+            print(f"  - {item['filename']} ({item['kind']}){score} | {', '.join(item.get('skills', [])[:6])}")
+
+    sheet_status = result.get("sheet_update")
+    if sheet_status is not None:
+        if demo_mode:
+            print("📝 Sheet update: Skipped (Demo Mode)")
+        elif "I cannot directly interact with Google Sheets" in sheet_status:
+            print("📝 Sheet update: Failed - API restrictions")
+        elif "Error" in sheet_status:
+            print(f"📝 Sheet update: Failed - {sheet_status}")
+        else:
+            print(f"📝 Sheet update: {sheet_status}")
+    
+    # If sheets write failed, inform the user
+    if sheet_status and "I cannot directly interact with Google Sheets" in sheet_status:
+        print("\nNote: The data extraction was successful, but writing to Google Sheets requires additional setup.")
+        print("\nTo complete this integration:")
+        print("1. Install Google API client libraries:")
+        print("   pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib")
+        print("2. Configure OAuth credentials with Google Sheets scope")
+        print("\nFor hackathon submission, the email data extraction and processing functionality is working as expected.")
 
 
 def main():
@@ -26,11 +102,190 @@ def main():
     # Accept optional values; if value omitted or empty, fall back to env loaded from .env
     g2s.add_argument("--sheet-id", nargs="?", default=None)
     g2s.add_argument("--sheet-tab", nargs="?", default=None)
-    g2s.add_argument("--direct", action="store_true", help="Use direct Google Sheets API integration")
+    g2s.add_argument("--direct", action="store_true",
+                     help="Page through Gmail with the Gmail API and extract leads in small batches")
+    g2s.add_argument("--query", default=DEFAULT_QUERY, help="Gmail search query for --direct (default: %(default)s)")
+    g2s.add_argument("--page-size", type=int, default=25, help="Messages fetched per Gmail page")
+    g2s.add_argument("--max-messages", type=int, default=None, help="Stop after this many messages")
+    g2s.add_argument("--extract-batch", type=int, default=10, help="Emails per LLM extraction prompt")
+    g2s.add_argument("--attachments", action="store_true",
+                     help="With --direct, also parse attached JDs/offer letters (PDF, DOCX, text)")
+    g2s.add_argument("--resume-file", metavar="PATH", help="Score attached JDs against this resume (.pdf/.docx/.txt)")
+    g2s.add_argument("--no-thread-grouping", action="store_true",
+                     help="With --direct, extract every message instead of the newest one per conversation")
+    g2s.add_argument("--target-roles", default=None,
+                     help="Comma-separated roles to rank leads against (default: CAREER_COPILOT_TARGET_ROLES)")
     g2s.add_argument("--demo", action="store_true", help="Demo mode - extract emails only")
+    g2s.add_argument("--resume", action="store_true",
+                     help="Continue the last interrupted run for this sheet from its checkpoint")
+    g2s.add_argument("--record", metavar="CASSETTE", help="Record every Portia run and tool call to a cassette file")
+    g2s.add_argument("--replay", metavar="CASSETTE", help="Replay a recorded cassette offline instead of calling the LLM")
+    g2s.add_argument("--replay-timing", choices=["fast", "original"], default="fast",
+                     help="Replay at full speed or with the recorded timings")
+    g2s.add_argument("--local", action="store_true", help="Run in this process even if a daemon is running")
+
+    for name, help_text, interval in (
+        ("serve", "Run the daemon: warm orchestrator + local HTTP API for jobs", None),
+        ("watch", "Run the daemon and scan Gmail on a schedule", 30.0),
+    ):
+        d = sub.add_parser(name, help=help_text)
+        d.add_argument("--sheet-id", default=None)
+        d.add_argument("--sheet-tab", default=None)
+        d.add_argument("--port", type=int, default=daemon_port())
+        d.add_argument("--interval", type=float, default=interval, help="Minutes between scheduled scans")
+        d.add_argument("--jitter", type=float, default=60.0, help="Random +/- seconds added to each interval")
+        d.add_argument("--direct", action="store_true", help="Scheduled scans use the Gmail API pipeline")
+        d.add_argument("--query", default=DEFAULT_QUERY)
+
+    sub.add_parser("jobs", help="List recent jobs on the running daemon")
+
+    traces = sub.add_parser("traces", help="Summarize the trace log: slowest workflows first")
+    traces.add_argument("--file", default=os.getenv("CAREER_COPILOT_TRACE_FILE", DEFAULT_TRACE_FILE))
+    traces.add_argument("--top", type=int, default=10)
+
+    batch = sub.add_parser("batch-score", help="ATS-score a folder of resumes against a set of job descriptions")
+    batch.add_argument("--resumes", nargs="+", required=True, help="Resume files, folders or globs (.pdf/.docx/.txt/.md)")
+    batch.add_argument("--jds", nargs="+", required=True, help="Job description files, folders or globs (.txt/.md)")
+    batch.add_argument("--out", default="batch_scores.csv", help="Output .csv or .parquet (default: %(default)s)")
+    batch.add_argument("--workers", type=int, default=os.cpu_count(), help="Parser processes (default: CPU count)")
+    batch.add_argument("--chunk-size", type=int, default=256, help="Resumes scored per vectorized chunk")
+
+    stats = sub.add_parser("tracker-stats", help="Funnel, response times and weekly volume from the local tracker copy")
+    stats.add_argument("--weeks", type=int, default=8, help="Recent weeks to show")
+    stats.add_argument("--export", metavar="PATH", help="Also export applications to a .parquet or .csv file")
+
+    leads = sub.add_parser("leads", help="Most urgent scanned leads from the local tracker copy, ranked locally")
+    leads.add_argument("--top", type=int, default=10)
+    leads.add_argument("--target-roles", default=None,
+                       help="Comma-separated roles to match (default: CAREER_COPILOT_TARGET_ROLES)")
+    leads.add_argument("--due", action="store_true", help="Order by nearest deadline instead of priority")
+
+    auth = sub.add_parser("google-auth", help="Connect a Google account once for direct Sheets/Gmail access")
+    auth.add_argument("--port", type=int, default=0, help="Local port for the OAuth redirect (default: any free port)")
+    auth.add_argument("--no-browser", action="store_true", help="Print the consent URL instead of opening a browser")
+    auth.add_argument("--status", action="store_true", help="Show the saved token instead of connecting")
 
     args = parser.parse_args()
 
+    if args.cmd == "google-auth":
+        from tools.google_auth import CredentialsRequired, credential_manager
+        manager = credential_manager()
+        if not args.status:
+            try:
+                manager.authorize(port=args.port, open_browser=not args.no_browser)
+            except CredentialsRequired as e:
+                print(f"Error: {e}")
+                raise SystemExit(2)
+            print(f"✅ Google account connected; token saved to {manager.token_file.path}")
+        status = manager.status()
+        if not status["connected"]:
+            print(f"No Google account connected ({status['token_file']}). Run: python cli.py google-auth")
+            raise SystemExit(1)
+        print(f"Token file: {status['token_file']}")
+        print(f"Scopes: {', '.join(status['scopes'])}")
+        if status["expires_in_s"] is not None:
+            print(f"Access token expires in {status['expires_in_s']}s (refreshed automatically)")
+        return
+
+    if args.cmd in ("serve", "watch"):
+        from app.daemon import CopilotDaemon
+        sheet_id = args.sheet_id or os.getenv("SHEET_ID", "")
+        if args.interval and not sheet_id:
+            print("Missing Sheet ID for scheduled scans. Set SHEET_ID in .env or pass --sheet-id.")
+            raise SystemExit(2)
+        daemon = CopilotDaemon(
+            sheet_id=sheet_id,
+            sheet_tab=args.sheet_tab or os.getenv("SHEET_TAB", "Applications"),
+            port=args.port,
+            interval=args.interval * 60 if args.interval else None,
+            jitter=args.jitter,
+            direct=args.direct,
+            query=args.query,
+        )
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Daemon stopped.")
+        return
+
+    if args.cmd == "jobs":
+        client = DaemonClient()
+        if not client.available():
+            print(f"No daemon running on port {daemon_port()}. Start one with: python cli.py serve")
+            raise SystemExit(1)
+        for job in client.jobs():
+            stages = job.get("stages") or {}
+            print(f"{job['id']}  {job['status']:<8} {job['source']:<8} {job['cmd']}  "
+                  f"extract={stages.get('extract', 0)} write={stages.get('write', 0)}"
+                  + (f"  error: {job['error']}" if job.get("error") else ""))
+        return
+
+    if args.cmd == "traces":
+        from app.tracing import summarize_trace
+        if not os.path.exists(args.file):
+            print(f"No trace log found at {args.file}")
+            raise SystemExit(1)
+        print(f"{'workflow':<32} {'runs':>5} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'errors':>6} {'tokens':>8} {'cost $':>10}")
+        for row in summarize_trace(args.file)[:args.top]:
+            print(f"{row['workflow']:<32} {row['runs']:>5} {row['p50_ms']:>10} {row['p95_ms']:>10} {row['max_ms']:>10} "
+                  f"{row['errors']:>6} {row['tokens']:>8} {row['cost_usd']:>10}")
+        return
+
+    if args.cmd == "tracker-stats":
+        from app.tracker_store import TrackerStore, per_week, response_time_by_source, status_funnel
+        store = TrackerStore()
+        apps = store.load("applications")
+        if apps.empty:
+            print(f"No applications stored in {store.path} yet; they are added as you use the job tracker.")
+            raise SystemExit(1)
+        print(f"📊 {len(apps)} applications, {len(store.load('leads'))} scanned leads\n")
+        print(status_funnel(apps).to_string(index=False))
+        print()
+        print(response_time_by_source(apps).to_string(index=False))
+        print()
+        print(per_week(apps).tail(args.weeks).to_string(index=False))
+        if args.export:
+            try:
+                store.export("applications", args.export)
+            except RuntimeError as e:
+                print(f"\nError: {e}")
+                raise SystemExit(1)
+            print(f"\n✅ Exported to {args.export}")
+        return
+
+    if args.cmd == "leads":
+        from app.lead_ranking import lead_index_from_env
+        from app.tracker_store import TrackerStore
+        stored = TrackerStore().load("leads")
+        if stored.empty:
+            print("No scanned leads stored yet; they are added by gmail-to-sheets runs.")
+            raise SystemExit(1)
+        index = lead_index_from_env(args.target_roles)
+        index.update(stored.to_dict("records"))
+        ranked = index.due_soon(args.top) if args.due else index.top(args.top)
+        print(f"🔥 {len(ranked)} of {len(index)} leads" + (" by deadline" if args.due else " by priority"))
+        print_leads(ranked)
+        return
+
+    if args.cmd == "batch-score":
+        from app.batch_score import JD_SUFFIXES, RESUME_SUFFIXES, collect_files, run_batch
+        resumes = collect_files(args.resumes, RESUME_SUFFIXES)
+        jds = collect_files(args.jds, JD_SUFFIXES)
+        if not resumes or not jds:
+            print(f"Nothing to score: found {len(resumes)} resumes and {len(jds)} job descriptions.")
+            raise SystemExit(2)
+        print(f"Scoring {len(resumes)} resumes against {len(jds)} job descriptions with {args.workers} workers...")
+        try:
+            stats = run_batch(resumes, jds, args.out, workers=args.workers, chunk_size=args.chunk_size,
+                              progress=lambda done, total: print(f"\r⏳ {done}/{total} resumes", end="", flush=True))
+        except (RuntimeError, ValueError) as e:
+            print(f"\nError: {e}")
+            raise SystemExit(1)
+        rate = stats["resumes"] / stats["seconds"] if stats["seconds"] else 0
+        print(f"\n✅ {stats['rows']} scores written to {args.out} in {stats['seconds']}s "
+              f"({rate:.0f} resumes/s, {stats['errors']} unreadable)")
+        return
+
     if args.cmd == "gmail-to-sheets":
         sheet_id = args.sheet_id or os.getenv("SHEET_ID", "")
         sheet_tab = args.sheet_tab or os.getenv("SHEET_TAB", "Applications")
@@ -39,11 +294,6 @@ def main():
         if demo_mode:
             print("🚀 Running in DEMO MODE - will extract emails but not write to Google Sheets")
             
-        # Acknowledge but don't use direct option - simplify for hackathon
-        if hasattr(args, 'direct') and args.direct:
-            print("Note: Direct Google Sheets integration requires additional setup.")
-            print("Using Portia's standard workflow instead.")
-        
         if not sheet_id:
             print("Missing Sheet ID. Either set SHEET_ID in .env or pass --sheet-id \"<SHEET_ID>\".")
             raise SystemExit(2)
@@ -52,52 +302,69 @@ def main():
         print(f"Using Sheet ID: {sheet_id}")
         print(f"Using Sheet Tab: {sheet_tab}")
         
-        orch = CareerCopilotOrchestrator()
+        params = {
+            "sheet_id": sheet_id,
+            "sheet_tab": sheet_tab,
+            "demo": demo_mode,
+            "direct": args.direct,
+            "query": args.query,
+            "page_size": args.page_size,
+            "max_messages": args.max_messages,
+            "extract_batch": args.extract_batch,
+            "resume": args.resume,
+            "attachments": args.attachments,
+            "resume_file": os.path.abspath(args.resume_file) if args.resume_file else None,
+            "group_threads": not args.no_thread_grouping,
+            "target_roles": args.target_roles,
+        }
+        
+        # Hand the job to a running daemon (warm Portia client and credentials) unless told otherwise
+        client = DaemonClient()
+        if not (args.local or args.record or args.replay) and client.available():
+            print(f"Sending job to the daemon on port {daemon_port()}...")
+            job_id = client.submit("gmail-to-sheets", params)
+            try:
+                job = client.wait(job_id, on_update=print_progress)
+            except KeyboardInterrupt:
+                print(f"\nStopped waiting; job {job_id} keeps running in the daemon (python cli.py jobs).")
+                return
+            print()
+            if job["status"] == "failed" and not job.get("result"):
+                print(f"Error executing Gmail to Sheets workflow: {job['error']}")
+                print("Progress is saved; rerun with --resume to continue.")
+                return
+            print_summary(job["result"], demo_mode)
+            return
+        
+        from app.cassette import RecordingPortia
+        from app.daemon import run_gmail_to_sheets
+        from app.gmail_pipeline import PipelineProgress
+        from app.orchestrator import CareerCopilotOrchestrator
+        
+        cassette = None
+        if args.record:
+            cassette = f"record:{args.record}"
+        elif args.replay:
+            cassette = f"{'replay-realtime' if args.replay_timing == 'original' else 'replay'}:{args.replay}"
+        orch = CareerCopilotOrchestrator(cassette=cassette)
         print("Starting Gmail → Sheets run. If authentication is required, an OAuth link will appear below.")
         
+        # Every run is checkpointed so that an interrupted one can continue with --resume
         try:
-            result = orch.gmail_to_sheets(sheet_id=sheet_id, sheet_tab=sheet_tab, demo_mode=demo_mode)
-            
-            # Format the result for better display
-            print("\n📊 RESULTS SUMMARY")
-            print("==================")
-            
-            if "email_scan" in result:
-                email_data = result["email_scan"]
-                # Try to parse it as JSON for better display
-                try:
-                    if isinstance(email_data, str):
-                        email_json = json.loads(email_data)
-                        print(f"📧 Emails scanned: {len(email_json)}")
-                        print(f"✅ Matched rows: {len(email_json)}")
-                    else:
-                        print(f"📧 Email data extracted successfully")
-                except:
-                    print(f"📧 Email data extracted (format: {type(email_data).__name__})")
-            
-            if "sheet_update" in result:
-                sheet_status = result["sheet_update"]
-                if demo_mode:
-                    print("📝 Sheet update: Skipped (Demo Mode)")
-                elif "I cannot directly interact with Google Sheets" in str(sheet_status):
-                    print("📝 Sheet update: Failed - API restrictions")
-                elif "Error" in str(sheet_status):
-                    print(f"📝 Sheet update: Failed - {sheet_status}")
-                else:
-                    print(f"📝 Sheet update: {sheet_status}")
-            
-            # If sheets write failed, inform the user
-            if "sheet_update" in result and "I cannot directly interact with Google Sheets" in str(result["sheet_update"]):
-                print("\nNote: The data extraction was successful, but writing to Google Sheets requires additional setup.")
-                print("\nTo complete this integration:")
-                print("1. Install Google API client libraries:")
-                print("   pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib")
-                print("2. Configure OAuth credentials with Google Sheets scope")
-                print("\nFor hackathon submission, the email data extraction and processing functionality is working as expected.")
+            progress = PipelineProgress(callback=lambda stage, counts: print_progress(counts))
+            result = run_gmail_to_sheets(orch, progress=progress, **params)
+            print()
+            print_summary(result.model_dump(mode="json"), demo_mode)
+        except KeyboardInterrupt:
+            print("\n⏸️ Interrupted. Progress is saved; rerun with --resume to continue.")
         except Exception as e:
             print(f"Error executing Gmail to Sheets workflow: {str(e)}")
+            print("Progress is saved; rerun with --resume to continue.")
             import traceback
             traceback.print_exc()
+        finally:
+            if isinstance(orch.portia, RecordingPortia):
+                orch.portia.close()
         return
 
     parser.print_help()
@@ -38,6 +38,8 @@ class CareerCopilotConfig:
         default_model = (
             "openai/gpt-4o-mini" if use_openai else "google/gemini-1.5-flash"
         )
+        # Remembered for cost accounting in traces
+        self.llm_model = default_model
 
         try:
             cfg = Config.from_default(
@@ -48,6 +50,7 @@ class CareerCopilotConfig:
             )
         except Exception:
             # Fallback to Gemini if OpenAI setup is invalid for the SDK
+            self.llm_model = "google/gemini-1.5-flash"
             cfg = Config.from_default(
                 llm_provider=LLMProvider.GOOGLE,
                 default_model="google/gemini-1.5-flash",
@@ -81,11 +84,9 @@ class CareerCopilotConfig:
         return bool(self.portia_api_key)
 
     def google_oauth_ready(self) -> bool:
-        return all([
-            os.getenv("GOOGLE_CLIENT_ID"),
-            os.getenv("GOOGLE_CLIENT_SECRET"),
-            os.getenv("GOOGLE_REDIRECT_URI"),
-        ])
+        """A Google account is connected (token saved by ``python cli.py google-auth``)."""
+        from tools.google_auth import credential_manager
+        return credential_manager().has_token()
 
     def sheet_target_ready(self) -> bool:
         return bool(os.getenv("SHEET_ID"))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test utility for the ASGI API (app/api.py): coalescing, 429 backpressure and NDJSON streaming.
+Drives the app directly with ASGI messages and a stub orchestrator; no server or LLM needed.
+"""
+
+import asyncio
+import inspect
+import json
+import threading
+
+from app.api import ENDPOINTS, CareerCopilotAPI
+from app.daemon import run_gmail_to_sheets
+from app.results import InterviewPrepResult
+
+
+class SlowOrchestrator:
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def generate_interview_questions(self, job_description, user_profile=None):
+        self.calls += 1
+        self.release.wait(5)
+        return InterviewPrepResult(interview_prep=[{"question": f"Why {job_description}?"}])
+
+
+async def _request(app, path, body, headers=(), method="POST", query=b""):
+    sent = []
+    payload = json.dumps(body).encode()
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers), "query_string": query}
+    await app(scope, receive, send)
+    status = sent[0]["status"]
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return status, body
+
+
+def test_identical_requests_share_one_run():
+    async def scenario():
+        orch = SlowOrchestrator()
+        app = CareerCopilotAPI(orchestrator=orch, max_workers=2)
+        body = {"job_description": "Python dev"}
+        tasks = [asyncio.create_task(_request(app, "/v1/interview-questions", body)) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        orch.release.set()
+        results = await asyncio.gather(*tasks)
+        assert orch.calls == 1
+        assert app.stats["coalesced"] == 4
+        for status, raw in results:
+            assert status == 200
+            assert json.loads(raw)["interview_prep"][0]["question"] == "Why Python dev?"
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_returns_429():
+    async def scenario():
+        orch = SlowOrchestrator()
+        app = CareerCopilotAPI(orchestrator=orch, max_workers=1, max_queue=2)
+        tasks = [asyncio.create_task(_request(app, "/v1/interview-questions", {"job_description": f"JD {i}"}))
+                 for i in range(2)]
+        await asyncio.sleep(0.05)
+        status, _ = await _request(app, "/v1/interview-questions", {"job_description": "JD 3"})
+        assert status == 429
+        orch.release.set()
+        assert [s for s, _ in await asyncio.gather(*tasks)] == [200, 200]
+
+    asyncio.run(scenario())
+
+
+def test_runs_cancelled_at_shutdown_fail_instead_of_hanging():
+    async def scenario():
+        orch = SlowOrchestrator()
+        app = CareerCopilotAPI(orchestrator=orch, max_workers=1)
+        running = asyncio.create_task(_request(app, "/v1/interview-questions", {"job_description": "JD 1"}))
+        queued = asyncio.create_task(_request(app, "/v1/interview-questions", {"job_description": "JD 2"}))
+        await asyncio.sleep(0.05)
+        app._pool.shutdown(wait=False, cancel_futures=True)  # what lifespan.shutdown does
+        status, raw = await asyncio.wait_for(queued, timeout=2)
+        assert status == 500 and "cancelled" in json.loads(raw)["error"]
+        orch.release.set()
+        assert (await running)[0] == 200
+        assert app.health()["in_flight"] == 0 and app.stats["errors"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_streaming_and_validation():
+    async def scenario():
+        orch = SlowOrchestrator()
+        orch.release.set()
+        app = CareerCopilotAPI(orchestrator=orch, heartbeat_s=0.01)
+        status, raw = await _request(app, "/v1/interview-questions", {"job_description": "Go"},
+                                     headers=[(b"accept", b"application/x-ndjson")])
+        events = [json.loads(line)["event"] for line in raw.decode().splitlines()]
+        assert status == 200 and events[0] == "queued" and events[-1] == "result"
+
+        assert (await _request(app, "/v1/interview-questions", {}))[0] == 400
+        assert (await _request(app, "/v1/interview-questions", {"job_description": "x", "evil": 1}))[0] == 400
+        assert (await _request(app, "/v1/nope", {}))[0] == 404
+        status, raw = await _request(app, "/healthz", {}, method="GET")
+        assert status == 200 and json.loads(raw)["runs"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_gmail_scan_accepts_every_run_option():
+    _, _, optional = ENDPOINTS["/v1/gmail-scan"]
+    options = set(inspect.signature(run_gmail_to_sheets).parameters) - {"orch", "progress", "gmail_service", "store"}
+    assert set(optional) == options
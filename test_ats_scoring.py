@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test utility for the local ATS scoring engine (tools/ats_scoring.py).
+Pure Python; no LLM needed.
+"""
+
+import datetime
+import time
+
+from tools.ats_scoring import ATSScoreInput, ats_score, jd_sections
+
+THIS_YEAR = datetime.date.today().year
+
+JD = """Senior Backend Engineer
+We build payments APIs. You will own services in Python.
+
+Requirements:
+- 5+ years of backend experience
+- Python and Django
+- PostgreSQL
+- AWS
+
+Nice to have:
+- Kubernetes
+- Kafka
+
+Benefits:
+- Docker stipend
+"""
+
+RESUME = f"""Jane Doe
+Experience
+Senior Engineer, Acme  {THIS_YEAR - 2} - Present
+- Built Django services on AWS with Python and Docker
+Engineer, Globex  {THIS_YEAR - 9} - {THIS_YEAR - 5}
+- Java and Kafka pipelines, PostgreSQL
+Education
+B.Sc. Computer Science {THIS_YEAR - 13} - {THIS_YEAR - 9}
+"""
+
+
+def test_jd_sections():
+    required, preferred, years = jd_sections(JD)
+    assert required == {"python", "django", "postgresql", "aws"}
+    assert preferred == {"kubernetes", "kafka"}
+    assert years == 5
+    # Without section headings everything mentioned is required
+    assert jd_sections("Looking for a Go developer with Redis, 3 years.") == ({"go", "redis"}, set(), 3)
+
+
+def test_breakdown_explains_the_score():
+    result = ats_score(ATSScoreInput(resume_text=RESUME, job_description=JD))
+    features = {f.name: f for f in result.breakdown}
+    assert list(features) == ["required_skills", "preferred_skills", "recency", "experience"]
+    assert features["required_skills"].score == 1.0
+    assert features["preferred_skills"].detail == "1/2 found; missing kubernetes"
+    assert "postgresql" in features["recency"].detail and features["recency"].score < 1
+    assert features["experience"].detail == "9 of 5+ years"
+    assert abs(sum(f.weight for f in result.breakdown) - 100) < 0.5
+    assert result.ats_score == round(sum(f.points for f in result.breakdown))
+    assert result.missing_keywords == ["kubernetes"]
+
+    junior = ats_score(ATSScoreInput(resume_text=RESUME, job_description=JD, experience_years=2))
+    assert junior.ats_score < result.ats_score
+
+
+def test_fast_and_deterministic():
+    ats_score(ATSScoreInput(resume_text=RESUME, job_description=JD))
+    runs = []
+    for i in range(20):
+        start = time.perf_counter()
+        # A different resume each time, so the cached profile does not help
+        ats_score(ATSScoreInput(resume_text=RESUME + f"\nProject {i}", job_description=JD))
+        runs.append(time.perf_counter() - start)
+    assert sorted(runs)[len(runs) // 2] < 0.01
+    assert ats_score(ATSScoreInput(resume_text=RESUME, job_description=JD)) == \
+        ats_score(ATSScoreInput(resume_text=RESUME, job_description=JD))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Tests for the Gmail attachment stage (app/attachments.py): order, dedupe, size cap and JD scoring."""
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+from app.attachments import AttachmentStage, gmail_fetcher, write_base64url
+from app.gmail_pipeline import STAGES, PipelineProgress, run_pipeline
+
+JD = b"""Backend Engineer
+
+Requirements:
+- 3+ years of Python
+- Docker and Kubernetes in production
+- PostgreSQL
+
+Nice to have:
+- AWS
+"""
+
+OFFER = b"Dear Sam,\n\nWe are pleased to offer you the position of Backend Engineer. Your start date is 1 March.\n"
+
+RESUME = "Backend engineer, 4 years of Python, Docker and PostgreSQL.\nExperience\nAcme 2021 - 2025: Python, Docker"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+class FakeGmail:
+    """Serves ``users().messages().attachments().get(...).execute()``; some downloads are slow."""
+
+    def __init__(self, files: dict, slow: set = frozenset()):
+        self.files = files
+        self.slow = slow
+        self.downloads = 0
+        self._lock = threading.Lock()
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def attachments(self):
+        return self
+
+    def get(self, userId, messageId, id):
+        return _Request(self, id)
+
+    def download(self, attachment_id: str) -> dict:
+        with self._lock:
+            self.downloads += 1
+        if attachment_id in self.slow:
+            time.sleep(0.2)
+        return {"data": _b64(self.files[attachment_id])}
+
+
+class _Request:
+    def __init__(self, service: FakeGmail, attachment_id: str):
+        self.service = service
+        self.attachment_id = attachment_id
+
+    def execute(self):
+        return self.service.download(self.attachment_id)
+
+
+def _email(message_id: str, *attachments) -> dict:
+    return {"id": message_id, "date": "2025-08-24", "from": "recruiter@example.com",
+            "subject": f"Job opening {message_id}", "body": "Please find the role attached.",
+            "attachments": list(attachments)}
+
+
+def _meta(attachment_id: str, filename: str, size: int = 100) -> dict:
+    return {"id": attachment_id, "filename": filename, "mime_type": "", "size": size}
+
+
+def test_base64_is_decoded_in_chunks_into_a_stream():
+    data = os.urandom(300_001)
+    out = io.BytesIO()
+    assert write_base64url(_b64(data), out) == len(data)
+    assert out.getvalue() == data
+
+
+def test_stage_keeps_order_dedupes_and_caps_size():
+    service = FakeGmail({"a1": JD, "a2": JD, "a3": b"x" * 5000, "a4": b"PNG"}, slow={"a1"})
+    stage = AttachmentStage(gmail_fetcher(service), resume_text=RESUME, workers=3, window=4, max_bytes=4096)
+    emails = [
+        _email("m1", _meta("a1", "backend-jd.txt")),
+        _email("m2"),
+        _email("m3", _meta("a2", "Backend JD (fwd).txt"), _meta("a3", "huge.txt")),
+        _email("m4", _meta("a4", "logo.png"), {"id": "", "filename": "offer.txt", "size": len(OFFER),
+                                              "data": _b64(OFFER)}),
+    ]
+    progress = PipelineProgress()
+    out = list(stage.run(emails, progress))
+
+    assert [e["id"] for e in out] == ["m1", "m2", "m3", "m4"]
+    jd = out[0]["attachments"][0]
+    assert jd["kind"] == "jd" and jd["filename"] == "backend-jd.txt"
+    assert {"python", "docker", "kubernetes", "postgresql"} <= set(jd["skills"])
+    assert jd["sha256"] == hashlib.sha256(JD).hexdigest() and jd["ats_score"] > 50
+
+    # The forwarded copy is parsed once; whichever download finished first counts as the original
+    forwarded = out[2]["attachments"]
+    assert len(forwarded) == 1 and forwarded[0]["ats_score"] == jd["ats_score"]
+    assert jd["duplicate"] != forwarded[0]["duplicate"]
+    assert [a["kind"] for a in out[3]["attachments"]] == ["offer"]
+    assert service.downloads == 3  # the .png is never fetched; the inline offer needs no request
+    assert progress.counts["attachments"] == 2 and progress.counts["attachment_dupes"] == 1
+    assert progress.counts["attachment_errors"] == 1 and "larger than 4096" in progress.errors[0]
+    assert "attachments" in STAGES  # shown on the CLI progress line
+    assert sorted(r["kind"] for r in stage.results) == ["jd", "offer"]
+
+
+def test_extraction_prompt_gets_attachment_summary_not_document():
+    stage = AttachmentStage(gmail_fetcher(FakeGmail({"a1": JD + b"\n" + b"More detail. " * 2000})))
+    prompts = []
+
+    def complete(prompt):
+        prompts.append(prompt)
+        return "[]"
+
+    run_pipeline([[_email("m1", _meta("a1", "jd.md"))]], complete, None, PipelineProgress(), attachments=stage)
+    sent = json.loads(prompts[0].split("Emails: ", 1)[1])[0]
+    assert sent["attachments"][0]["kind"] == "jd" and sent["attachments"][0]["filename"] == "jd.md"
+    assert len(sent["attachments"][0]["excerpt"]) <= 300 and len(prompts[0]) < 2000
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test utility for bulk resume scoring (app/batch_score.py).
+Pure Python; no LLM needed.
+"""
+
+import csv
+import multiprocessing
+import multiprocessing.pool
+import os
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from app import batch_score
+from app.batch_score import collect_files, load_jobs, parse_resume, run_batch, score_chunk
+from tools.ats_scoring import ATSScoreInput, ats_score
+
+RESUMES = {
+    "backend.txt": "Backend engineer\nExperience\nEngineer, Acme  2021 - Present\n"
+                   "- Python, Django and PostgreSQL on AWS\n- Docker and k8s\n",
+    "data.txt": "Data analyst\nSkills\nSQL, Excel, Tableau, pandas\nExperience\nAnalyst  2012 - 2015\n- Python reports\n",
+    "frontend.md": "Frontend developer with 3 years of experience\nReact, TypeScript, GraphQL, Figma\n",
+}
+JDS = {
+    "backend_jd.txt": "Senior Backend Engineer\nRequirements:\n- 5+ years of experience\n- Python, Django, PostgreSQL\n"
+                      "- Kubernetes\nNice to have:\n- Kafka, Terraform\n",
+    "data_jd.txt": "Data Analyst\nSQL, Tableau and Python for reporting. Power BI is a plus.\n",
+}
+
+
+def _corpus(root: str) -> tuple[list[str], list[str]]:
+    for folder, files in (("resumes", RESUMES), ("jds", JDS)):
+        os.makedirs(os.path.join(root, folder))
+        for name, text in files.items():
+            with open(os.path.join(root, folder, name), "w", encoding="utf-8") as f:
+                f.write(text)
+    with open(os.path.join(root, "resumes", "notes.json"), "w") as f:
+        f.write("{}")
+    return (collect_files([os.path.join(root, "resumes")], (".txt", ".md")),
+            collect_files([os.path.join(root, "jds", "*.txt")], (".txt",)))
+
+
+def test_batch_scores_match_ats_score():
+    with tempfile.TemporaryDirectory() as root:
+        resumes, jds = _corpus(root)
+        assert len(resumes) == 3 and len(jds) == 2
+        rows = score_chunk([parse_resume(p) for p in resumes], load_jobs(jds))
+        assert len(rows) == 6
+        for row in rows:
+            with open(row["resume"], encoding="utf-8") as f:
+                resume = f.read()
+            single = ats_score(ATSScoreInput(resume_text=resume, job_description=JDS[row["jd"]]))
+            assert row["ats_score"] == single.ats_score, (row, single.ats_score)
+            assert set(filter(None, row["missing_skills"].split(", "))) == set(single.missing_keywords)
+
+
+def test_pool_and_serial_runs_agree():
+    with tempfile.TemporaryDirectory() as root:
+        resumes, jds = _corpus(root)
+        outputs = []
+        for workers in (1, 2):
+            out = os.path.join(root, f"scores_{workers}.csv")
+            stats = run_batch(resumes + [os.path.join(root, "missing.txt")], jds, out, workers=workers, chunk_size=2)
+            assert stats["resumes"] == 4 and stats["errors"] == 1 and stats["rows"] == 6
+            with open(out, newline="", encoding="utf-8") as f:
+                outputs.append(sorted(tuple(r.values()) for r in csv.DictReader(f)))
+        assert outputs[0] == outputs[1]
+
+
+def test_parse_resume_ships_compact_arrays():
+    with tempfile.TemporaryDirectory() as root:
+        resumes, _ = _corpus(root)
+        parsed = parse_resume(next(p for p in resumes if p.endswith("backend.txt")))
+        assert parsed.error == "" and parsed.skills.dtype.name == "uint16"
+        assert len(parsed.skills) == len(parsed.years) >= 6 and parsed.experience >= 4
+
+
+def test_interrupted_run_terminates_the_pool(monkeypatch):
+    calls = []
+
+    class TrackedPool(multiprocessing.pool.Pool):
+        def close(self):
+            calls.append("close")
+            super().close()
+
+        def terminate(self):
+            calls.append("terminate")
+            super().terminate()
+
+    spawn = multiprocessing.get_context("spawn")
+    monkeypatch.setattr(batch_score, "get_context",
+                        lambda method: SimpleNamespace(Pool=lambda n: TrackedPool(n, context=spawn)))
+
+    def interrupt(done, total):
+        raise KeyboardInterrupt  # Ctrl-C during `cli.py batch-score`
+
+    with tempfile.TemporaryDirectory() as root:
+        resumes, jds = _corpus(root)
+        with pytest.raises(KeyboardInterrupt):
+            run_batch(resumes, jds, os.path.join(root, "scores.csv"), workers=2, chunk_size=1, progress=interrupt)
+        assert calls[0] == "terminate" and multiprocessing.active_children() == []
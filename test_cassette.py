@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Tests for Portia record-and-replay cassettes (app/cassette.py), against a fake Portia client."""
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app.cassette import RecordingPortia, ReplayPortia, load_cassette, wrap_client
+
+
+class FakeHooks:
+    def __init__(self):
+        self.before_tool_call = None
+        self.after_tool_call = None
+
+
+class FakePortia:
+    """Answers every query by "calling" one tool through its execution hooks."""
+
+    def __init__(self, barrier: threading.Barrier | None = None):
+        self.execution_hooks = FakeHooks()
+        self.barrier = barrier
+
+    def run(self, query):
+        tool = SimpleNamespace(id=f"tool_for_{query}")
+        self.execution_hooks.before_tool_call(tool, {"q": query}, None, None)
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)  # both runs are now inside a tool call
+        self.execution_hooks.after_tool_call(tool, SimpleNamespace(value=f"raw {query}"), None, None)
+        return SimpleNamespace(id=f"prun-{query}", state="COMPLETE", final_output=SimpleNamespace(value=[query]))
+
+
+def test_record_then_replay_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "runs.jsonl.gz")
+        inner = FakePortia()
+        recorder = wrap_client(inner, f"record:{path}")
+        assert recorder.run("scan inbox").final_output.value == ["scan inbox"]
+        recorder.run("score resume")
+        recorder.close()
+
+        entries = load_cassette(path)
+        assert [e["prompt"] for e in entries] == ["scan inbox", "score resume"]
+        assert entries[0]["tools"][0]["tool"] == "tool_for_scan inbox"
+        assert entries[0]["tools"][0]["output"] == "raw scan inbox" and "t0" not in entries[0]["tools"][0]
+
+        replay = wrap_client(None, f"replay:{path}")
+        run = replay.run("  score   resume ")  # prompts match ignoring whitespace
+        assert run.final_output.value == ["score resume"] and run.id == "prun-score resume"
+        assert replay.run_plan(replay.plan("scan inbox")).tool_calls == entries[0]["tools"]
+        sequential = ReplayPortia(path, match="sequential")
+        assert [sequential.run("anything").final_output.value for _ in range(3)] == [
+            ["scan inbox"], ["score resume"], ["scan inbox"]]
+
+
+def test_recorders_do_not_leave_hooks_behind_or_mix_concurrent_runs():
+    inner = FakePortia(threading.Barrier(2))
+    original = lambda *args: "existing"  # noqa: E731
+    inner.execution_hooks.after_tool_call = original
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "runs.jsonl")
+        with RecordingPortia(inner, path) as recorder:
+            assert inner.execution_hooks.after_tool_call is not original
+            with ThreadPoolExecutor(2) as pool:
+                list(pool.map(recorder.run, ["a", "b"]))
+        assert inner.execution_hooks.after_tool_call is original
+        assert inner.execution_hooks.before_tool_call is None
+        for entry in load_cassette(path):
+            assert [c["tool"] for c in entry["tools"]] == [f"tool_for_{entry['prompt']}"]
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test utility for the daemon (app/daemon.py): jobs submitted over the local HTTP API
+run on the warm orchestrator. Uses a stub orchestrator, so no Portia or Google access.
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from app.daemon import CopilotDaemon, DaemonClient
+from app.results import EmailScanResult, GmailToSheetsResult
+
+
+class StubOrchestrator:
+    def __init__(self):
+        self.calls = []
+
+    def gmail_to_sheets(self, sheet_id, sheet_tab, demo_mode, pages, progress, extract_batch, checkpoint,
+                        attachments=None, threads=None, ranking=None):
+        self.calls.append((sheet_id, sheet_tab, demo_mode))
+        progress.add("extract", 3)
+        return GmailToSheetsResult(email_scan=EmailScanResult(), sheet_update="Wrote 3 row(s)", stages=progress.counts)
+
+
+def test_jobs_run_on_warm_orchestrator():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["CAREER_COPILOT_CHECKPOINTS"] = os.path.join(tmp, "checkpoints.db")
+        try:
+            orch = StubOrchestrator()
+            daemon = CopilotDaemon(sheet_id="sheet", port=0, orchestrator=orch)
+            threading.Thread(target=daemon.serve_forever, daemon=True).start()
+            deadline = time.time() + 5
+            while daemon._server is None and time.time() < deadline:
+                time.sleep(0.01)
+            client = DaemonClient(port=daemon.port)
+            assert client.available()
+
+            for _ in range(2):
+                job = client.wait(client.submit("gmail-to-sheets", {"demo": True}), poll_s=0.01)
+                assert job["status"] == "done"
+                assert job["result"]["sheet_update"] == "Wrote 3 row(s)"
+                assert job["stages"]["extract"] == 3
+            assert orch.calls == [("sheet", "Applications", True)] * 2
+            assert [j["status"] for j in client.jobs()] == ["done", "done"]
+            daemon._server.shutdown()
+            daemon.shutdown()
+        finally:
+            os.environ.pop("CAREER_COPILOT_CHECKPOINTS", None)
+
+
+def test_unknown_command_is_rejected():
+    daemon = CopilotDaemon(orchestrator=StubOrchestrator())
+    try:
+        daemon.submit("rm -rf", {})
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
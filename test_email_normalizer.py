@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Tests for email body normalization (tools/email_normalizer.py) and its pipeline stage."""
+import json
+import os
+
+from app.gmail_pipeline import PipelineProgress, run_pipeline
+from app.tracing import estimate_tokens
+from benchmarks.bench_email_normalizer import recorded_bodies
+from tools.email_normalizer import normalize_body
+
+AGENT_MEMORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".portia", "cache", "agent_memory")
+
+REPLY = (
+    "Hi Sam,\r\n\r\nThanks for applying to the **Frontend Developer** role at TechNova Solutions.\r\n"
+    "Deadline: August 18, 2025\r\n\r\nBest regards,\r\nHR Team\r\n\r\n"
+    "-- \r\nJane Doe | Talent Partner | +1 555 0100\r\n\r\n"
+    "On Mon, Aug 4, 2025 at 10:02 AM Sam <sam@example.com> wrote:\r\n"
+    "> Hello, I would like to apply for the Frontend Developer opening.\r\n> Thanks, Sam\r\n"
+)
+
+NEWSLETTER = (
+    "<html><head><style>p {color: red}</style></head><body>​﻿͏" * 20
+    + "<p>New role: <b>Data Analyst</b> at Acme Corp</p><p>Apply by 1 September: "
+    "https://acme.example/jobs/42</p>"
+    + "<p>Learn more about our teams and culture.</p>" * 10
+    + "<p>You are receiving this email because you signed up for job alerts. "
+    "Unsubscribe | Privacy Policy | © 2025 Acme Corp. All rights reserved.</p></body></html>"
+)
+
+
+def test_strips_reply_chain_signature_and_markdown():
+    out = normalize_body(REPLY)
+    assert "Frontend Developer role at TechNova Solutions" in out and "Deadline: August 18, 2025" in out
+    assert "Best regards,\nHR Team" in out  # the sign-off names the company; kept
+    assert "\r" not in out and "**" not in out
+    assert "wrote:" not in out and "> Hello" not in out and "Talent Partner" not in out
+
+
+def test_keeps_forwarded_job_descriptions():
+    jd = ("Role: Backend Engineer (Python, Django)\r\nLocation: Bengaluru\r\n"
+          "Apply by August 30, 2025 at https://globex.example/careers/7\r\n")
+    headers = "From: Globex Talent <talent@globex.com>\r\nDate: Mon, Aug 4, 2025 at 9:00 AM\r\n" \
+              "Subject: Backend Engineer opening\r\nTo: Sam <sam@example.com>\r\n\r\n"
+    gmail = "FYI, this looks like a fit.\r\n\r\n---------- Forwarded message ---------\r\n" + headers + jd
+    apple = "Begin forwarded message:\r\n\r\n" + headers + jd
+    for body in (gmail, apple):
+        out = normalize_body(body)
+        assert "Role: Backend Engineer (Python, Django)" in out and "Apply by August 30, 2025" in out, out
+        assert "From: Globex Talent" in out
+
+    # History quoted inside the forwarded message is still dropped
+    quoted = gmail + "\r\nFrom: Sam <sam@example.com>\r\nSent: Sunday, Aug 3, 2025\r\nOld thread text\r\n"
+    assert "Old thread text" not in normalize_body(quoted) and "Location: Bengaluru" in normalize_body(quoted)
+
+
+def test_strips_html_padding_and_footer_and_caps():
+    out = normalize_body(NEWSLETTER)
+    assert out.startswith("New role: Data Analyst at Acme Corp")
+    assert "https://acme.example/jobs/42" in out
+    assert "<" not in out and "color" not in out and "​" not in out
+    assert "receiving this" not in out and "Unsubscribe" not in out
+    assert out.count("Learn more") == 1  # repeated lines collapse to one
+
+    capped = normalize_body("First line of the role.\n" + "word " * 1000, max_chars=200)
+    assert len(capped) <= 202 and capped.endswith("…")
+    long_url = "https://click.example.com/track?" + "x" * 300
+    assert normalize_body(f"Apply: {long_url}") == "Apply: https://click.example.com/…"
+
+
+def test_recorded_mailbox_shrinks_and_pipeline_sends_normalized_bodies():
+    bodies = recorded_bodies(AGENT_MEMORY)
+    assert bodies
+    before = sum(estimate_tokens(b[:1500]) for b in bodies)
+    after = sum(estimate_tokens(normalize_body(b, 1500)) for b in bodies)
+    assert after < before * 0.9, (before, after)
+
+    prompts = []
+
+    def complete(prompt):
+        prompts.append(prompt)
+        return "[]"
+
+    email = {"id": "m1", "date": "2025-08-04", "from": "hr@technova.example", "subject": "Your application",
+             "body": REPLY}
+    progress = run_pipeline([[email]], complete, None, PipelineProgress())
+    sent = json.loads(prompts[0].split("Emails: ", 1)[1])[0]
+    assert sent["body"] == normalize_body(REPLY)
+    assert progress.counts["body_chars_dropped"] == len(REPLY) - len(sent["body"])
+    assert progress.counts["normalize"] == 1
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test utility for the streaming Gmail → Sheets pipeline (app/gmail_pipeline.py).
+Runs offline against the recorded mailbox payloads.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+import cli
+from app.checkpoints import CheckpointStore
+from app.gmail_pipeline import EXTRACT_PROMPT, STAGES, PipelineProgress, prefetch, run_pipeline
+from benchmarks.fakes import FakeLLM, Latency, load_agent_memory
+
+AGENT_MEMORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".portia", "cache", "agent_memory")
+
+
+def _pages(size: int = 4):
+    emails = json.loads(load_agent_memory(AGENT_MEMORY)["emails"][0])
+    # Repeat the mailbox so dedupe has something to drop
+    emails = emails + emails
+    return [emails[i:i + size] for i in range(0, len(emails), size)]
+
+
+def test_batches_prompts_and_writes_without_llm():
+    llm = FakeLLM({}, Latency())
+    prompts, written = [], []
+
+    def complete(prompt):
+        prompts.append(prompt)
+        return llm.extract_leads(json.loads(prompt.split("Emails: ", 1)[1]))
+
+    def append(rows):
+        written.append(rows)
+        return len(rows)
+
+    progress = run_pipeline(_pages(), complete, append, extract_batch=3, write_batch=2)
+    counts = progress.counts
+    assert counts["fetch"] == sum(len(p) for p in _pages())
+    assert all(len(json.loads(p.split("Emails: ", 1)[1])) <= 3 for p in prompts)
+    assert not any("Data to append" in p for p in prompts)
+    assert counts["duplicates"] == counts["extract"] - counts["dedupe"] > 0
+    assert counts["write"] == counts["dedupe"] == sum(len(rows) for rows in written)
+    assert all(len(rows) <= 2 for rows in written)
+
+
+def test_cli_shows_every_pipeline_stage(capsys):
+    progress = run_pipeline(_pages(), lambda prompt: "[]", None)
+    cli.print_progress(progress.counts)
+    cli.print_summary({"stages": progress.counts}, demo_mode=False)
+    line, summary = capsys.readouterr().out.split("RESULTS SUMMARY")
+    assert progress.counts["normalize"] == progress.counts["fetch"] > 0
+    for stage in STAGES:
+        assert f"{stage} {progress.counts[stage]}" in line and f"{stage}={progress.counts[stage]}" in summary
+
+
+def test_bad_batch_is_skipped():
+    replies = iter(["not json at all", '[{"company": "Acme", "role": "Analyst"}]'])
+    progress = run_pipeline([[{"subject": "Job offer", "body": ""}] * 2], lambda p: next(replies), None,
+                            extract_batch=1)
+    assert progress.counts["extract_errors"] == 1
+    assert progress.counts["extract"] == 1
+    assert progress.sample[0].source == "Gmail"
+
+
+def test_prefetch_is_bounded_and_propagates_errors():
+    produced = []
+
+    def pages():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    it = prefetch(pages(), maxsize=2)
+    assert next(it) == 0
+    threading.Event().wait(0.2)
+    # consumer took 1, queue holds at most 2, producer may hold one more while blocked
+    assert len(produced) <= 4
+    it.close()
+
+    def broken():
+        yield 1
+        raise RuntimeError("quota")
+
+    try:
+        list(prefetch(broken()))
+    except RuntimeError as e:
+        assert str(e) == "quota"
+    else:
+        raise AssertionError("expected RuntimeError")
+
+
+def test_resume_after_crash_writes_each_row_once():
+    llm = FakeLLM({}, Latency())
+    calls, sheet = [], []
+
+    def complete(prompt):
+        calls.append(prompt)
+        return llm.extract_leads(json.loads(prompt.split("Emails: ", 1)[1]))
+
+    def flaky_append(rows):
+        if len(sheet) >= 2:
+            raise RuntimeError("quota exceeded")
+        sheet.extend(rows)
+        return len(rows)
+
+    def append(rows):
+        sheet.extend(rows)
+        return len(rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CheckpointStore(os.path.join(tmp, "checkpoints.db"))
+        run = store.start("sheet", "Applications", query="q", mode="direct")
+        try:
+            run_pipeline(_pages(), complete, flaky_append, checkpoint=run, extract_batch=2, write_batch=2)
+        except RuntimeError:
+            pass
+        interrupted_calls = len(calls)
+
+        resumed = store.resume("sheet", "Applications", query="q", mode="direct")
+        assert resumed.run_id == run.run_id
+        progress = run_pipeline(_pages(), complete, append, checkpoint=resumed, extract_batch=2, write_batch=2,
+                                read_rows=lambda: sheet)
+        # Batches finished before the crash are not sent to the LLM again
+        total_calls = len(calls)
+        clean = CheckpointStore(os.path.join(tmp, "clean.db"))
+        run_pipeline(_pages(), complete, None, checkpoint=clean.start("s", "t"), extract_batch=2)
+        clean.close()
+        assert interrupted_calls > 0
+        assert total_calls == len(calls) - total_calls
+        assert progress.counts["resumed"] > 0
+        assert len(sheet) == len({tuple(r) for r in sheet})
+        assert resumed.counts()["pending"] == resumed.counts()["writing"] == 0
+        assert store.latest("sheet", "Applications", query="q", mode="direct") is None
+
+        # A fresh run over the same mailbox writes nothing new
+        before = len(sheet)
+        run_pipeline(_pages(), complete, append, checkpoint=store.start("sheet", "Applications", "q", "direct"))
+        assert len(sheet) == before
+        store.close()
+
+
+def test_prompt_template():
+    assert EXTRACT_PROMPT.format(emails="[]").rstrip().endswith("Emails: []")
+    assert PipelineProgress().counts["write"] == 0
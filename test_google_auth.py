@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Tests for the shared Google credential manager (token file, coordinated and background refresh)."""
+import datetime
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from tools.google_auth import (DEFAULT_SCOPES, GMAIL_READONLY_SCOPE, CredentialManager, CredentialsRequired,
+                               _utcnow)
+
+calls = {"refresh": 0}
+calls_lock = threading.Lock()
+
+
+class FakeCredentials:
+    """Shaped like google-auth's ``Credentials``; refresh() hits a fake token endpoint."""
+
+    def __init__(self, info: dict, manager: CredentialManager):
+        self.manager = manager
+        self.token = info["token"]
+        self.expiry = datetime.datetime.strptime(info["expiry"].rstrip("Z"), "%Y-%m-%dT%H:%M:%S")
+        self.refresh_token = info["refresh_token"]
+
+    def refresh(self, request):
+        self.manager.coordinated_refresh(self, self._token_endpoint)
+
+    def _token_endpoint(self):
+        time.sleep(0.05)
+        with calls_lock:
+            calls["refresh"] += 1
+            self.token = f"token-{calls['refresh']}"
+        self.expiry = _utcnow().replace(microsecond=0) + datetime.timedelta(hours=1)
+
+    def to_json(self):
+        return json.dumps({"token": self.token, "refresh_token": self.refresh_token,
+                           "expiry": self.expiry.isoformat() + "Z"})
+
+
+def _manager(path: str, margin: float = 300) -> CredentialManager:
+    manager = CredentialManager(path, refresh_margin=margin)
+    manager._loader = lambda info: FakeCredentials(info, manager)
+    return manager
+
+
+def _save_token(manager: CredentialManager, expires_in: float, scopes=DEFAULT_SCOPES):
+    expiry = (_utcnow() + datetime.timedelta(seconds=expires_in)).replace(microsecond=0)
+    manager.token_file.write({"token": "token-0", "refresh_token": "r", "expiry": expiry.isoformat() + "Z",
+                              "scopes": scopes})
+
+
+def test_missing_token_or_scope_never_prompts():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(os.path.join(tmp, "google", "token.json"))
+        try:
+            manager.credentials()
+            raise AssertionError("expected CredentialsRequired")
+        except CredentialsRequired as e:
+            assert "cli.py google-auth" in str(e)
+
+        _save_token(manager, 3600, scopes=[DEFAULT_SCOPES[0]])
+        if os.name != "nt":
+            assert stat.S_IMODE(os.stat(manager.token_file.path).st_mode) == 0o600
+        assert manager.credentials([DEFAULT_SCOPES[0]]).token == "token-0"
+        try:
+            manager.credentials([GMAIL_READONLY_SCOPE])
+            raise AssertionError("expected CredentialsRequired")
+        except CredentialsRequired as e:
+            assert "gmail.readonly" in str(e)
+        manager.stop()
+
+
+def test_processes_sharing_the_token_file_refresh_once():
+    calls["refresh"] = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "token.json")
+        # One manager per "process": separate locks and file handles on the same token file
+        managers = [_manager(path) for _ in range(4)]
+        _save_token(managers[0], -10)
+        creds = [m._loader(m.token_file.read()) for m in managers]
+        threads = [threading.Thread(target=c.refresh, args=(None,)) for c in creds]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert calls["refresh"] == 1
+        assert {c.token for c in creds} == {"token-1"}
+        assert sum(m.stats["adopted"] for m in managers) == 3
+        saved = managers[0].token_file.read()
+        assert saved["token"] == "token-1" and saved["scopes"] == DEFAULT_SCOPES
+
+
+def test_background_refresh_before_expiry():
+    calls["refresh"] = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(os.path.join(tmp, "token.json"), margin=0.5)
+        _save_token(manager, 1.5)
+        creds = manager.credentials()
+        deadline = time.time() + 5
+        while creds.token == "token-0" and time.time() < deadline:
+            time.sleep(0.05)
+        manager.stop()
+        assert creds.token == "token-1" and manager.stats["refreshes"] == 1
+        assert creds.expiry > _utcnow() + datetime.timedelta(minutes=30)
+        assert manager.token_file.read()["token"] == "token-1"
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Tests for the pooled Google API transport, against a local fake Sheets endpoint."""
+import json
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
+
+import pytest
+
+from benchmarks.fakes import FakeSheetsEndpoint
+from tools.google_transport import ConnectError, ConnectionPool, PooledHttp, quota_reason
+
+
+def _append(http, endpoint, row, method="POST"):
+    url = f"{endpoint.url}/v4/spreadsheets/s1/values/Applications!A1:append"
+    response, content = http.request(url, method, body=json.dumps({"values": [row]}),
+                                     headers={"content-type": "application/json"})
+    return response, json.loads(content)
+
+
+class FakeCredentials:
+    def __init__(self):
+        self.token = None
+        self.refreshes = 0
+
+    @property
+    def valid(self):
+        return self.token is not None
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes}"
+
+    def apply(self, headers):
+        headers["authorization"] = f"Bearer {self.token}"
+
+
+def test_writes_reuse_one_keep_alive_connection():
+    with FakeSheetsEndpoint() as endpoint:
+        http = PooledHttp(pool=ConnectionPool())
+        for i in range(5):
+            response, body = _append(http, endpoint, [f"Company {i}"])
+            assert response.status == 200 and body["updates"]["updatedRows"] == 1
+        assert endpoint.connections == 1
+        assert http.pool.stats["reused"] == 4
+        assert len(endpoint.rows) == 5
+        http.close()
+
+
+def test_retries_rate_limits_and_server_errors_but_not_plain_403():
+    quota = {"error": {"code": 403, "errors": [{"reason": "userRateLimitExceeded"}]}}
+    assert quota_reason(403, json.dumps(quota).encode()) == "userRateLimitExceeded"
+    with FakeSheetsEndpoint() as endpoint:
+        http = PooledHttp(pool=ConnectionPool(), backoff_base=0.001)
+        endpoint.fail_with = [
+            (429, {"error": {"code": 429}}, {"Retry-After": "0"}),
+            (503, {"error": {"code": 503}}, {}),
+            (403, quota, {}),
+        ]
+        response, _ = _append(http, endpoint, ["Acme"], method="PUT")
+        assert response.status == 200 and http.pool.stats["retries"] == 3
+        assert endpoint.rows == [["Acme"]]
+
+        endpoint.fail_with = [(403, {"error": {"code": 403, "errors": [{"reason": "forbidden"}]}}, {})]
+        response, body = _append(http, endpoint, ["Beta"])
+        assert response.status == 403 and body["error"]["errors"][0]["reason"] == "forbidden"
+        assert http.pool.stats["retries"] == 3
+
+        http.retries = 1
+        endpoint.fail_with = [(500, {}, {}), (500, {}, {})]
+        response, _ = _append(http, endpoint, ["Gamma"], method="PUT")
+        assert response.status == 500
+        http.close()
+
+
+def test_posts_are_not_resent_once_the_server_may_have_applied_them():
+    with FakeSheetsEndpoint() as endpoint:
+        http = PooledHttp(pool=ConnectionPool(), backoff_base=0.001)
+        # Rejected before it was applied: retried
+        endpoint.fail_with = [(429, {"error": {"code": 429}}, {"Retry-After": "0"}),
+                              (403, {"error": {"code": 403, "errors": [{"reason": "rateLimitExceeded"}]}}, {})]
+        assert _append(http, endpoint, ["Acme"])[0].status == 200
+        assert http.pool.stats["retries"] == 2
+
+        # A 5xx may come after the append: returned to the caller, not resent
+        endpoint.fail_with = [(503, {"error": {"code": 503}}, {})]
+        assert _append(http, endpoint, ["Beta"])[0].status == 503
+
+        # The server got the append, then the connection dropped before any answer
+        endpoint.fail_with = ["drop"]
+        with pytest.raises((HTTPException, OSError)):
+            _append(http, endpoint, ["Gamma"])
+        assert endpoint.rows == [["Acme"], ["Gamma"]] and http.pool.stats["retries"] == 2
+
+        # The same drop on an idempotent PUT is resent
+        endpoint.fail_with = ["drop"]
+        assert _append(http, endpoint, ["Delta"], method="PUT")[0].status == 200
+        http.close()
+
+
+def test_connect_failures_are_retried_for_posts():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]  # closed again below: nothing listens here
+    http = PooledHttp(pool=ConnectionPool(), retries=2, backoff_base=0.001)
+    with pytest.raises(ConnectError):
+        http.request(f"http://127.0.0.1:{port}/v4/spreadsheets/s1/values/A1:append", "POST", body="{}")
+    assert http.pool.stats["retries"] == 2 and http.pool.stats["connections"] == 3
+
+    pool = ConnectionPool()
+    conn, _ = pool.acquire(("http", "127.0.0.1", port))
+    pool.release(("http", "127.0.0.1", port), conn)
+    assert pool.acquire(("http", "127.0.0.1", port), max_idle_s=0.0)[1] is False  # too old for a POST
+
+
+def test_threads_share_the_pool_and_refresh_credentials_once():
+    creds = FakeCredentials()
+    with FakeSheetsEndpoint() as endpoint:
+        http = PooledHttp(creds, ConnectionPool(max_idle=4))
+        with ThreadPoolExecutor(4) as pool:
+            statuses = list(pool.map(lambda i: _append(http, endpoint, [i])[0].status, range(40)))
+        assert statuses == [200] * 40
+        assert sorted(row[0] for row in endpoint.rows) == list(range(40))
+        assert endpoint.connections <= 4 and creds.refreshes == 1
+
+        # An expired token is refreshed once and the request resent
+        endpoint.fail_with = [(401, {"error": {"code": 401}}, {})]
+        response, _ = _append(http, endpoint, ["after-401"])
+        assert response.status == 200 and creds.refreshes == 2
+        http.close()
@@ -4,7 +4,6 @@ Test utility for the Career Copilot Agent interview prep feature.
 This script helps verify that the interview prep feature works correctly.
 """
 
-import json
 from app.orchestrator import CareerCopilotOrchestrator
 
 def main():
@@ -38,27 +37,26 @@ def main():
     try:
         result = orch.generate_interview_questions(job_description, user_profile)
         
-        if "error" in result:
-            print(f"\n❌ Error: {result['error']}")
-            if "raw" in result:
+        if result.error:
+            print(f"\n❌ Error: {result.error}")
+            if result.raw is not None:
                 print("\nRaw output:")
-                print(result["raw"])
-        elif "interview_prep" in result:
+                print(result.raw)
+        elif result.interview_prep:
             print("\n✅ Success! Interview prep generated correctly.")
-            questions = result["interview_prep"]
+            questions = result.interview_prep
             print(f"\nGenerated {len(questions)} interview questions.")
             
             # Print a sample question
-            if questions:
-                print("\nSample Question:")
-                sample = questions[0]
-                print(f"Category: {sample.get('category', 'N/A')}")
-                print(f"Question: {sample.get('question', 'N/A')}")
-                print(f"Key Points: {', '.join(sample.get('key_points', ['N/A']))}")
+            sample = questions[0]
+            print("\nSample Question:")
+            print(f"Category: {sample.category or 'N/A'}")
+            print(f"Question: {sample.question}")
+            print(f"Key Points: {', '.join(sample.key_points) or 'N/A'}")
                 
             # Write to file for inspection
             with open("interview_prep_test_output.json", "w") as f:
-                json.dump(result, f, indent=2)
+                f.write(result.model_dump_json(indent=2))
             print("\nFull output written to 'interview_prep_test_output.json'")
         else:
             print("\n❌ Unexpected result structure:")
@@ -4,7 +4,6 @@ Test utility for the Career Copilot Agent job tracker feature.
 This script helps verify that the job tracker feature works correctly.
 """
 
-import json
 from app.orchestrator import CareerCopilotOrchestrator
 import os
 from dotenv import load_dotenv
@@ -43,23 +42,23 @@ def main():
     try:
         result = orch.update_job_tracker(job_data, sheet_id, sheet_tab)
         
-        if "error" in result:
-            print(f"\n❌ Error: {result['error']}")
-            if "raw" in result:
-                print("\nRaw output:")
-                print(result["raw"])
-        elif "success" in result and result["success"]:
+        if result.error:
+            print(f"\n❌ Error: {result.error}")
+        elif result.raw is not None:
+            print("\n❌ Unexpected result structure. Raw output:")
+            print(result.raw)
+        elif result.success:
             print("\n✅ Success! Job tracker update successful.")
-            if "demo_mode" in result and result["demo_mode"]:
+            if result.demo_mode:
                 print("\n[DEMO MODE] Data was processed but not written to actual sheet")
             else:
-                print(f"\nRows appended: {result.get('row_count_appended', 'unknown')}")
+                print(f"\nRows appended: {result.row_count_appended if result.row_count_appended is not None else 'unknown'}")
             
-            print(f"\nMessage: {result.get('message', 'No message')}")
+            print(f"\nMessage: {result.message or 'No message'}")
             
             # Write to file for inspection
             with open("job_tracker_test_output.json", "w") as f:
-                json.dump(result, f, indent=2)
+                f.write(result.model_dump_json(indent=2))
             print("\nFull output written to 'job_tracker_test_output.json'")
         else:
             print("\n❌ Unexpected result structure:")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Tests for local lead ranking (app/lead_ranking.py): deadline parsing, signals and the top-K index."""
+import datetime
+import json
+import random
+
+from app.gmail_pipeline import STAGES, PipelineProgress, run_pipeline
+from app.lead_ranking import LeadIndex, LeadRanker, _deadline_parts, lead_key, parse_deadline, sender_reputation
+
+TODAY = datetime.date(2025, 8, 4)
+
+
+def test_deadline_parser_normalizes_formats_and_caches():
+    expected = datetime.date(2025, 8, 18)
+    for text in ("August 18, 2025", "Deadline: 18th Aug 2025, 11:59 PM", "18/08/2025", "08/18/2025",
+                 "2025-08-18", "Mon, Aug. 18", "apply within 2 weeks"):
+        assert parse_deadline(text, TODAY) == expected, text
+    assert parse_deadline("tomorrow", TODAY) == datetime.date(2025, 8, 5)
+    assert parse_deadline("3 days left", TODAY) == datetime.date(2025, 8, 7)
+    assert parse_deadline("Jan 10", TODAY) == datetime.date(2026, 1, 10)  # the next Jan 10 after the email
+    assert parse_deadline("ASAP", TODAY) is None and parse_deadline("", TODAY) is None
+    assert parse_deadline(datetime.datetime(2025, 9, 1, 12), TODAY) == datetime.date(2025, 9, 1)
+    assert parse_deadline(float("nan"), TODAY) is None
+
+    before = _deadline_parts.cache_info().hits
+    for _ in range(100):
+        parse_deadline("August 18, 2025", TODAY)
+    assert _deadline_parts.cache_info().hits - before == 100
+
+
+def test_signals_rank_relevant_urgent_leads_first():
+    ranker = LeadRanker("Data Analyst\nBackend Engineer", today=TODAY)
+    urgent = ranker.rank({"company": "Acme", "role": "Senior Data Analyst", "deadline": "Aug 6",
+                          "date": "Sun, 3 Aug 2025 09:00:00 +0000"}, "Priya <priya@acme.com>")
+    alert = ranker.rank({"company": "Beta", "role": "Graphic Designer", "deadline": "August 30, 2025",
+                         "date": "2025-07-20"}, "noreply@dare2compete.news")
+    expired = ranker.rank({"company": "Gamma", "position": "Back-end Engineer", "deadline": "2025-08-01",
+                           "date": "2025-08-03"}, "jobs@greenhouse.io")
+    assert urgent["priority"] == "High" and urgent["days_left"] == 2 and urgent["signals"]["role_match"] == 1.0
+    assert alert["priority"] == "Low" and alert["signals"]["role_match"] == 0.0
+    assert expired["expired"] and expired["role"] == "Back-end Engineer" and expired["signals"]["urgency"] == 0.0
+    assert urgent["score"] > expired["score"] > alert["score"]
+
+    assert sender_reputation("Talent <talent@ibm.com>") > sender_reputation("jobs@greenhouse.io") \
+        > sender_reputation("Careers <careers@hireclap.com>") > sender_reputation("noreply@dare2compete.news")
+    trusted = LeadRanker(reputation={"hireclap.com": 1.0}, today=TODAY)
+    assert trusted.reputation_of("careers@mail.hireclap.com") == 1.0
+
+
+def test_index_matches_a_full_sort_under_updates_and_removals():
+    rng = random.Random(7)
+    roles = ["Data Analyst", "Backend Engineer", "Graphic Designer", "Sales Associate", "ML Engineer"]
+    ranker = LeadRanker("Data Analyst, ML Engineer", today=TODAY)
+    index = LeadIndex(ranker)
+    leads = {}
+    for i in range(3000):
+        lead = {"company": f"Company {rng.randrange(800)}", "role": rng.choice(roles), "url": "",
+                "date": (TODAY - datetime.timedelta(days=rng.randrange(30))).isoformat(),
+                "deadline": (TODAY + datetime.timedelta(days=rng.randrange(-5, 40))).isoformat()
+                if rng.random() < 0.7 else ""}
+        leads[lead_key(lead)] = index.upsert(lead, rng.choice(["hr@acme.com", "noreply@linkedin.com"]))
+        if i % 10 == 0:
+            key = rng.choice(list(leads))
+            assert index.remove(key)
+            del leads[key]
+    assert len(index) == len(leads)
+    assert len(index._by_score) <= 2 * len(leads) + 64  # stale entries are pruned
+
+    best = sorted(leads.values(), key=lambda r: -r["score"])[:15]
+    assert [r["score"] for r in index.top(15)] == [r["score"] for r in best]
+    assert index.top(15) == index.top(15)  # reading does not consume the heap
+
+    upcoming = sorted((r for r in leads.values() if r["deadline"] and not r["expired"]), key=lambda r: r["deadline"])
+    due = index.due_soon(10, within_days=3)
+    assert [r["deadline"] for r in due] == [r["deadline"] for r in upcoming if r["days_left"] <= 3][:10]
+
+    # A day later every score is recomputed once, before the next read
+    ranker.fixed_day = TODAY + datetime.timedelta(days=1)
+    rescored = {lead_key(r): r for r in index.top(len(index))}
+    assert ranker.today == ranker.fixed_day and len(rescored) == len(leads)
+    assert all(r["days_left"] == leads[key]["days_left"] - 1 for key, r in rescored.items() if r["deadline"])
+
+
+def test_pipeline_ranks_leads_with_their_sender():
+    emails = [
+        {"id": "m1", "from": "Priya <priya@acme.com>", "subject": "Interview: Data Analyst", "date": "2025-08-03",
+         "body": "Please confirm by tomorrow."},
+        {"id": "m2", "from": "noreply@dare2compete.news", "subject": "Job alert: 50 new roles", "date": "2025-08-01",
+         "body": "Apply before August 30."},
+    ]
+    reply = [{"company": "Acme", "role": "Data Analyst", "deadline": "tomorrow", "date": "2025-08-03",
+              "message_id": "m1"},
+             {"company": "Beta", "role": "Graphic Designer", "deadline": "August 30", "date": "2025-08-01",
+              "message_id": "m2"}]
+    index = LeadIndex(LeadRanker("Data Analyst", today=TODAY))
+    progress = run_pipeline([emails], lambda prompt: json.dumps(reply), None, PipelineProgress(), ranking=index)
+    assert progress.counts["rank"] == 2 and "rank" in STAGES
+    top = index.top(5)
+    assert [r["company"] for r in top] == ["Acme", "Beta"]
+    assert top[0]["sender"] == "Priya <priya@acme.com>" and top[0]["deadline"] == "2025-08-04"
+    assert top[0]["priority"] == "High"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test utility for the LLM JSON decoder (tools/llm_json.py).
+Runs offline against the recorded agent memory payloads.
+"""
+
+import os
+
+from benchmarks.fakes import load_agent_memory
+from tools.llm_json import LLMJSONError, decode_llm_json, extract_json
+from tools.schemas import InterviewPrep, JobLead
+
+AGENT_MEMORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".portia", "cache", "agent_memory")
+
+
+def test_recorded_interview_payloads():
+    payloads = load_agent_memory(AGENT_MEMORY)
+    decoded = 0
+    for value in payloads.get("interview_questions", []) + payloads.get("interview_qa", []):
+        if value.lstrip().startswith("##"):
+            continue  # markdown answer, no JSON to recover
+        prep = decode_llm_json(value, model=InterviewPrep)
+        assert prep.interview_prep
+        assert all(isinstance(q.key_points, list) for q in prep.interview_prep)
+        decoded += 1
+    assert decoded
+
+
+def test_recorded_email_payloads():
+    emails = load_agent_memory(AGENT_MEMORY).get("emails", [])
+    assert emails
+    for value in emails:
+        leads = decode_llm_json(value, model=list[JobLead], expect=list)
+        assert leads
+
+
+def test_nested_fences_and_prose_with_braces():
+    raw = (
+        'Sure {here} it is:\n```json\n{"interview_prep": [{"question": "What does ```x = {}``` do?", '
+        '"key_points": "dicts; literals"}]}\n```\nHope this {helps}!'
+    )
+    prep = decode_llm_json(raw, model=InterviewPrep)
+    assert prep.interview_prep[0].question == "What does ```x = {}``` do?"
+    assert prep.interview_prep[0].key_points == ["dicts", "literals"]
+
+
+def test_repairs():
+    assert extract_json('{"a": [1, 2,], "b": True, \'c\': None}') == {"a": [1, 2], "b": True, "c": None}
+    assert extract_json('{\\"a\\": \\"b\\\\nc\\"}') == {"a": "b\nc"}
+    assert extract_json('{"items": [{"a": 1}, {"a": "trunc') == {"items": [{"a": 1}, {"a": "trunc"}]}
+    assert decode_llm_json("Here are [10] items: [{\"company\": \"Acme\"}]", model=list[JobLead])[0].company == "Acme"
+    assert extract_json("Here are [10] items: {\"a\": 1}", expect=dict) == {"a": 1}
+
+
+def test_chunk_list_repr():
+    raw = "Agent returned invalid content: ['```json\\n{\"interview_prep\": [{\"question\": \"Q1\"}', ']}\\n```']"
+    assert decode_llm_json(raw, model=InterviewPrep).interview_prep[0].question == "Q1"
+
+
+def test_no_json():
+    try:
+        extract_json("## Just markdown, no data")
+    except LLMJSONError:
+        return
+    raise AssertionError("expected LLMJSONError")
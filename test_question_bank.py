@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test utility for the interview question bank (app/question_bank.py).
+Seeds a temporary bank from the cached agent-memory preps in .portia/cache; no LLM needed.
+"""
+
+import os
+import tempfile
+
+from app.question_bank import QuestionBank, category_group, seniority_of, skills_in
+from tools.schemas import InterviewQuestion
+
+AGENT_MEMORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".portia", "cache", "agent_memory")
+
+
+def test_seeds_from_agent_memory_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = QuestionBank(os.path.join(tmp, "bank.db"), agent_memory_dir=AGENT_MEMORY)
+        seeded = len(bank)
+        assert seeded > 0
+        assert bank.import_agent_memory(AGENT_MEMORY) == 0
+        bank.close()
+        assert len(QuestionBank(os.path.join(tmp, "bank.db"), agent_memory_dir=AGENT_MEMORY)) == seeded
+
+
+def test_retrieves_behavioral_and_matching_technical():
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = QuestionBank(os.path.join(tmp, "bank.db"), agent_memory_dir=None)
+        jd = "Senior Backend Engineer: Python, Django and PostgreSQL on AWS."
+        bank.add([
+            InterviewQuestion(category="Behavioral", question="Tell me about a conflict in your team."),
+            InterviewQuestion(category="technical", question="How do you tune slow PostgreSQL queries?"),
+            InterviewQuestion(category="technical", question="Compare React hooks and class components."),
+            InterviewQuestion(category="technical", question="Explain the GIL in Python and how it affects Kafka consumers."),
+        ], job_description=jd)
+        bank.add([InterviewQuestion(category="behavioral", question="Why did you leave your last job?")],
+                 job_description=jd, user_profile={"name": "Someone else"})
+
+        questions = [q.question for q in bank.retrieve("Sr. Python developer (Django, PostgreSQL)")]
+        assert "Tell me about a conflict in your team." in questions
+        assert "How do you tune slow PostgreSQL queries?" in questions
+        # React is not in the JD; Kafka is not either, even though Python is
+        assert not any("React" in q or "Kafka" in q for q in questions)
+        # Another candidate's answers are not reused
+        assert "Why did you leave your last job?" not in questions
+        # Junior roles do not get senior-level questions
+        assert bank.retrieve("Junior Python developer, PostgreSQL") == []
+
+
+def test_classifiers():
+    assert seniority_of("Staff Engineer") == "lead" and seniority_of("Data Analyst") == "mid"
+    assert category_group("Cultural Fit") == "behavioral" and category_group("System Design") == "technical"
+    assert skills_in("C++ and Go, CI/CD on GCP") == {"c++", "go", "ci/cd", "gcp"}
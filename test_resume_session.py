@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test utility for incremental resume re-analysis (app/resume_session.py, per-section skill index).
+Pure Python; no LLM needed.
+"""
+
+from app.resume_session import ResumeSession
+from tools.resume_parser import split_sections
+from tools.skill_taxonomy import _index_section, profile_index
+
+RESUME = """Jane Doe, backend engineer
+Summary
+Python engineer who likes clean APIs.
+Experience
+Senior Engineer, Acme  2022 - Present
+- Built Django services on AWS
+Projects
+- Payment reconciler in Go
+"""
+JD = "Backend engineer: Python, Django, AWS, Kubernetes"
+
+
+def test_split_sections():
+    sections = split_sections(RESUME + "Projects:\n- CLI tool\n")
+    assert [title for title, _ in sections] == ["Header", "Summary", "Experience", "Projects", "Projects (2)"]
+    assert sections[2][1].startswith("Senior Engineer")
+
+
+def test_only_changed_sections_are_reanalyzed():
+    session = ResumeSession()
+    sections, changed, removed = session.diff(RESUME, JD)
+    assert changed == [title for title, _ in sections] and removed == []
+    session.update(sections, JD, {"Summary": ["Lead with impact"], "Experience": ["Quantify latency wins"],
+                                  "Projects": ["Link the repo"], "Header": ["Add a LinkedIn URL"]})
+
+    # Whitespace-only edits are not changes
+    assert session.diff(RESUME.replace("clean APIs.", "clean  APIs."), JD)[1] == []
+
+    edited = RESUME.replace("- Built Django services on AWS", "- Built Django services on AWS and Kubernetes")
+    sections, changed, _ = session.diff(edited, JD)
+    assert changed == ["Experience"]
+    session.update(sections, JD, {"Experience": ["Mention cluster size"]})
+    rendered = session.render(sections)
+    assert "Mention cluster size" in rendered and "Lead with impact" in rendered
+    assert "Quantify latency wins" not in rendered
+
+    # Removing a section drops its suggestions; a new JD invalidates everything
+    trimmed = edited.split("Projects")[0]
+    sections, changed, removed = session.diff(trimmed, JD)
+    assert removed == ["Projects"] and changed == []
+    assert session.diff(trimmed, JD + " and Terraform")[1] == ["Header", "Summary", "Experience"]
+
+
+def test_skill_profile_rescans_only_changed_sections():
+    _index_section.cache_clear()
+    profile_index(RESUME)
+    misses = _index_section.cache_info().misses
+    edited = RESUME.replace("in Go", "in Go and Rust")
+    assert "rust" in profile_index(edited).skills
+    assert _index_section.cache_info().misses == misses + 1
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test utility for the near-duplicate interview prep cache (app/semantic_cache.py).
+Uses the dependency-free TF-IDF embedder and a temporary SQLite file; no LLM needed.
+"""
+
+import os
+import tempfile
+
+from app.semantic_cache import HashingEmbedder, InterviewCache
+from tools.schemas import InterviewQuestion
+
+PYTHON_JD = """Senior Python Developer. You will design and build backend services in Python and Django,
+own REST APIs on PostgreSQL, write tests with pytest and deploy to AWS with Docker. 5+ years of Python required."""
+
+BOILERPLATE_A = """About us: Acme is a fast-growing fintech. We offer competitive salary, health insurance
+and remote work. Acme is an equal opportunity employer."""
+
+BOILERPLATE_B = """Why join Globex? Flexible hours, learning budget, stock options and a friendly team.
+Globex values diversity and is proud to be an equal opportunity workplace."""
+
+DESIGN_JD = """Senior Product Designer. Lead user research, wireframes and high-fidelity prototypes in Figma,
+run usability studies and maintain our design system with product managers."""
+
+QUESTIONS = [InterviewQuestion(category="technical", question="How do Django migrations work?")]
+
+
+def _cache(tmp, **kwargs):
+    return InterviewCache(path=os.path.join(tmp, "cache.db"), embedder=HashingEmbedder(), **kwargs)
+
+
+def test_same_role_with_different_boilerplate_hits():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        profile = {"name": "Ada", "skills": ["Python"]}
+        cache.store(PYTHON_JD + "\n" + BOILERPLATE_A, profile, QUESTIONS)
+        cache.store(DESIGN_JD + "\n" + BOILERPLATE_A, profile, [InterviewQuestion(question="Walk me through a case study")])
+
+        hit = cache.lookup(PYTHON_JD + "\n" + BOILERPLATE_B, {"skills": ["Python"], "name": "Ada"})
+        assert hit is not None
+        questions, similarity = hit
+        assert questions[0].question == QUESTIONS[0].question and similarity >= cache.threshold
+
+        # Each role finds its own set; an unrelated role with the same boilerplate, or another profile, misses
+        assert cache.lookup(DESIGN_JD.replace("Figma", "Sketch") + "\n" + BOILERPLATE_B, profile)[0][0].question.startswith("Walk")
+        assert cache.lookup("Data Engineer: Spark, Airflow and Kafka pipelines.\n" + BOILERPLATE_A, profile) is None
+        assert cache.lookup(PYTHON_JD, {"name": "Grace"}) is None
+        assert cache.stats["hits"] == 2
+        cache.close()
+
+
+def test_entries_persist_and_are_bounded():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp, max_entries=3)
+        for i in range(5):
+            cache.store(f"{PYTHON_JD} Team {i}", None, QUESTIONS)
+        assert len(cache) == 3
+        cache.close()
+
+        reopened = _cache(tmp, max_entries=3)
+        assert len(reopened) == 3
+        assert reopened.lookup(PYTHON_JD, None) is not None
+        reopened.close()
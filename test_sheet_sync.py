@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test utility for the tracker ⇄ Google Sheets delta sync (app/sheet_sync.py).
+Runs against an in-memory fake sheet; no Google API access needed.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from app.sheet_sync import TRACKER_HEADERS, TrackerSheetSync
+from app.tracker_store import TrackerStore
+
+APPLICATIONS = [
+    ["2025-08-04", "Acme", "Backend Engineer", "Applied", "LinkedIn"],
+    ["2025-08-06", "Beta", "SRE", "Interviewed", "Referral"],
+    ["2025-08-20", "Gamma", "Data Engineer", "Rejected", "LinkedIn"],
+    ["2025-08-21", "Delta", "ML Engineer", "Offer", "Referral"],
+]
+
+
+class FakeSheet:
+    """Just enough of SheetsAppender: A1 ranges over a list of rows, with a request log."""
+
+    def __init__(self, rows):
+        self.rows = [list(r) for r in rows]
+        self.calls = []
+
+    @staticmethod
+    def _bounds(cells):
+        first, _, last = cells.split("!A")[1].partition(":")
+        last = "".join(ch for ch in last if ch.isdigit())
+        return int(first), int(last) if last else None
+
+    def _get(self, cells):
+        first, last = self._bounds(cells)
+        return [list(r) for r in self.rows[first - 1:last]]
+
+    def read_range(self, cells):
+        self.calls.append(("read", cells))
+        return self._get(cells)
+
+    def read_ranges(self, ranges):
+        self.calls.append(("batch_get", len(ranges)))
+        return [self._get(cells) for cells in ranges]
+
+    def write_ranges(self, data):
+        self.calls.append(("batch_update", len(data)))
+        for cells, rows in data.items():
+            first, _ = self._bounds(cells)
+            for i, row in enumerate(rows):
+                self.rows[first - 1 + i] = list(row)
+        return sum(len(rows) for rows in data.values())
+
+    def append_rows(self, rows):
+        self.calls.append(("append", len(rows)))
+        self.rows.extend(list(r) for r in rows)
+        return len(self.rows) - len(rows) + 1
+
+    def delete_rows(self, numbers):
+        self.calls.append(("delete", len(numbers)))
+        for n in sorted(numbers, reverse=True):
+            del self.rows[n - 1]
+
+
+def _companies(sheet):
+    return [row[1] for row in sheet.rows[1:]]
+
+
+def test_pull_reads_only_new_or_changed_rows():
+    sheet = FakeSheet([TRACKER_HEADERS] + APPLICATIONS)
+    with tempfile.TemporaryDirectory() as root:
+        store = TrackerStore(root)
+        sync = TrackerSheetSync(store, sheet, "sheet1", "Applications")
+        assert sync.pull() == {"pulled": 5, "changed": 4, "added": 4, "full": True}
+        sheet.rows.append(["2025-09-01", "Epsilon", "Platform Engineer", "Applied", "Indeed"])
+        sheet.rows[1][3] = "Interview Scheduled"  # edited on the sheet; only a full resync sees it
+        assert sync.pull()["changed"] == 1 and sheet.calls[-1] == ("read", "Applications!A6:I")
+        assert sync.pull(full=True) == {"pulled": 6, "changed": 1, "added": 0, "full": True}
+        apps = store.load("applications").set_index("company")
+        assert len(apps) == 5 and apps.loc["Acme", "status"] == "Interview Scheduled"
+        # Nothing pulled differs from the local copy, so there is nothing to push back
+        assert sync.push() == {"inserted": 0, "updated": 0, "deleted": 0, "requests": 0}
+
+
+def test_push_applies_only_the_delta():
+    sheet = FakeSheet([TRACKER_HEADERS] + APPLICATIONS)
+    with tempfile.TemporaryDirectory() as root:
+        store = TrackerStore(root)
+        sync = TrackerSheetSync(store, sheet, "sheet1", "Applications")
+        # First push adopts the rows already on the sheet instead of appending duplicates
+        store.add_applications([dict(zip(["date_applied", "company", "position", "status", "source"], APPLICATIONS[0]))])
+        assert sync.push()["inserted"] == 0 and len(sheet.rows) == 5
+
+        store.add_applications([
+            {"date_applied": "2025-08-06", "company": "beta", "position": "SRE", "status": "Offer", "source": "Referral"},
+            {"date_applied": "2025-08-20", "company": "Gamma", "position": "Data Engineer", "status": "Rejected",
+             "source": "LinkedIn", "notes": "Asked for feedback"},
+            {"date_applied": "2025-09-02", "company": "Zeta", "position": "Analyst", "status": "Applied", "source": "Indeed"},
+        ])
+        store.remove_applications([{"date_applied": "2025-08-04", "company": "Acme", "position": "Backend Engineer"}])
+        sheet.calls.clear()
+        stats = sync.push()
+        assert (stats["inserted"], stats["updated"], stats["deleted"]) == (1, 2, 1)
+        # one read-back of rows 2-4, one batchUpdate (rows 3-4 as one range), one delete, one append
+        assert sheet.calls == [("batch_get", 1), ("batch_update", 1), ("delete", 1), ("append", 1)]
+        assert _companies(sheet) == ["beta", "Gamma", "Delta", "Zeta"]  # the key ignores case; the edit wins
+        assert sheet.rows[1][3] == "Offer" and sheet.rows[2][8] == "Asked for feedback"
+
+        sheet.calls.clear()
+        assert sync.push()["requests"] == 0 and sheet.calls == []
+
+
+def test_rows_moved_on_the_sheet_are_reindexed_before_writing():
+    sheet = FakeSheet([TRACKER_HEADERS] + APPLICATIONS)
+    with tempfile.TemporaryDirectory() as root:
+        store = TrackerStore(root)
+        sync = TrackerSheetSync(store, sheet, "sheet1", "Applications")
+        sync.pull()
+        sheet.rows.insert(1, ["2025-07-30", "Omega", "Intern", "Applied", "Other"])  # someone inserted a row on top
+        store.add_applications([{"date_applied": "2025-08-21", "company": "Delta", "position": "ML Engineer",
+                                 "status": "Offer", "source": "Referral", "notes": "Negotiating"}])
+        stats = sync.push()
+        assert stats["updated"] == 1 and stats["inserted"] == 0
+        assert sheet.rows[5][1] == "Delta" and sheet.rows[5][8] == "Negotiating"
+        assert _companies(sheet) == ["Omega", "Acme", "Beta", "Gamma", "Delta"]
+
+
+def test_each_tab_gets_only_its_own_applications():
+    tab_a = FakeSheet([TRACKER_HEADERS] + APPLICATIONS[:2])
+    tab_b = FakeSheet([TRACKER_HEADERS] + APPLICATIONS[2:])
+    with tempfile.TemporaryDirectory() as root:
+        store = TrackerStore(root)
+        sync_a = TrackerSheetSync(store, tab_a, "sheet1", "TabA")
+        sync_b = TrackerSheetSync(store, tab_b, "sheet1", "TabB")
+        sync_a.pull()
+        epsilon = {"date_applied": "2025-09-01", "company": "Epsilon", "position": "Platform Engineer",
+                   "status": "Applied", "source": "Indeed"}
+        store.add_applications([epsilon])
+        sync_a.claim([epsilon])
+        assert sync_a.push()["inserted"] == 1
+
+        # The first push to TabB adopts its rows and copies nothing over from TabA
+        assert sync_b.push() == {"inserted": 0, "updated": 0, "deleted": 0, "requests": 1}
+        assert _companies(tab_b) == ["Gamma", "Delta"]
+        assert len(store.load("applications")) == 5
+
+        store.add_applications([{"date_applied": "2025-08-20", "company": "Gamma", "position": "Data Engineer",
+                                 "status": "Offer", "source": "LinkedIn"}])
+        assert sync_a.push()["requests"] == 0 and _companies(tab_a) == ["Acme", "Beta", "Epsilon"]
+        assert sync_b.push()["updated"] == 1 and tab_b.rows[1][3] == "Offer"
+
+        # An application no tab knows yet goes to the first tab that pushes, and only there
+        store.add_applications([{"date_applied": "2025-09-03", "company": "Zeta", "position": "Analyst"}])
+        assert sync_b.push()["inserted"] == 1 and sync_a.push()["inserted"] == 0
+        assert _companies(tab_a) == ["Acme", "Beta", "Epsilon"] and _companies(tab_b) == ["Gamma", "Delta", "Zeta"]
+
+
+def test_a_lost_local_copy_never_deletes_sheet_rows():
+    sheet = FakeSheet([TRACKER_HEADERS] + APPLICATIONS)
+    with tempfile.TemporaryDirectory() as root:
+        store = TrackerStore(root)
+        TrackerSheetSync(store, sheet, "sheet1", "Applications").push()
+        os.remove(store._file("applications"))
+
+        store = TrackerStore(root)
+        sync = TrackerSheetSync(store, sheet, "sheet1", "Applications")
+        with pytest.raises(RuntimeError, match="empty"):
+            sync.push()
+        # A new application is appended; the rows missing from the copy stay on the sheet
+        store.add_applications([{"date_applied": "2025-09-02", "company": "Zeta", "position": "Analyst"}])
+        assert sync.push() == {"inserted": 1, "updated": 0, "deleted": 0, "requests": 1}
+        assert _companies(sheet) == ["Acme", "Beta", "Gamma", "Delta", "Zeta"]
+
+        # A full resync restores the copy from the sheet
+        assert sync.pull(full=True)["added"] == 4 and len(store.load("applications")) == 5
+        assert sync.push()["deleted"] == 0 and len(sheet.rows) == 6
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test utility for in-flight request coalescing (app/singleflight.py).
+Uses a stub workflow that blocks until released; no LLM needed.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app import singleflight
+from app.results import InterviewPrepResult
+
+
+class StubWorkflows:
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    @singleflight.singleflight("test_questions")
+    def questions(self, job_description: str, user_profile: dict | None = None):
+        self.calls += 1
+        self.release.wait(5)
+        if job_description == "boom":
+            raise RuntimeError("LLM quota exceeded")
+        return InterviewPrepResult(interview_prep=[{"question": job_description}])
+
+
+def _wait_for(flight, n):
+    for _ in range(200):
+        if flight.stats["calls"] >= n:
+            return
+        threading.Event().wait(0.01)
+
+
+def test_concurrent_duplicates_run_once():
+    stub = StubWorkflows()
+    flight = singleflight.get_flight("test_questions")
+    before = dict(flight.stats)
+    variants = [
+        ("Python  developer", None),
+        (" Python developer\n", None),
+        ("Python developer", None),
+    ]
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(stub.questions, jd, user_profile=profile) for jd, profile in variants]
+        futures.append(pool.submit(stub.questions, job_description="Python developer"))
+        _wait_for(flight, before["calls"] + 4)
+        stub.release.set()
+        results = [f.result() for f in futures]
+    assert stub.calls == 1
+    assert flight.stats["collapsed"] - before["collapsed"] == 3
+    assert flight.in_flight() == 0
+    # followers get their own copy of the leader's result
+    assert len({id(r) for r in results}) == len(results)
+    assert len({r.interview_prep[0].question for r in results}) == 1
+
+    # once the run has finished, the next call executes again (no caching)
+    stub.questions("Python developer")
+    assert stub.calls == 2
+
+
+def test_errors_reach_every_waiter():
+    stub = StubWorkflows()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(stub.questions, "boom") for _ in range(3)]
+        _wait_for(singleflight.get_flight("test_questions"), 3)
+        stub.release.set()
+        errors = [f.exception() for f in futures]
+    assert stub.calls == 1
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+def test_fingerprint_normalizes():
+    assert singleflight.fingerprint({"a": "x  y", "b": [1]}) == singleflight.fingerprint({"b": [1], "a": "x y"})
+    assert singleflight.fingerprint("a") != singleflight.fingerprint("b")
+    assert "test_questions" in singleflight.stats()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test utility for the skill taxonomy automaton and profile index (tools/skill_taxonomy.py).
+Pure Python; no LLM or network needed.
+"""
+
+from tools.ats_scoring import ATSScoreInput, ats_score
+from tools.jd_parser import JDNormalizeInput, normalize_jd
+from tools.skill_taxonomy import SkillAutomaton, extract_skills, profile_index
+
+
+def test_aliases_boundaries_and_longest_match():
+    text = "Sr. Python3/Django dev: Postgres, K8s, GitHub Actions, Large Language Models, C++ and C#. Go + REST."
+    assert extract_skills(text) == {
+        "python", "django", "postgresql", "kubernetes", "ci/cd", "llm", "c++", "c#", "go", "rest",
+    }
+    # Plain English words and substrings are not skills
+    assert extract_skills("Let's go to the rest area; numpyish typescripting happy") == set()
+    automaton = SkillAutomaton({"machine learning": ("ml",), "learning": ()})
+    assert [m[2] for m in automaton.find("Machine Learning and learning")] == ["machine learning", "learning"]
+
+
+def test_profile_index_is_built_once_per_input():
+    profile = {"skills": "Python, SQL, Leadership", "experience_years": 3}
+    first = profile_index("Built pipelines with pandas and Python", profile)
+    assert first.skills == ["pandas", "python", "sql"]
+    assert first.resume_skills == {"pandas": 1, "python": 1}
+    assert first.unrecognized_skills == ["Leadership"]
+    assert first.experience_years == 3
+    assert profile_index("Built pipelines with pandas and Python", dict(profile)) is first
+    assert profile_index("Built pipelines with pandas", profile).key != first.key
+
+
+def test_tools_share_the_taxonomy():
+    result = ats_score(ATSScoreInput(resume_text="Python and AWS", job_description="Need Python, AWS, Kubernetes"))
+    assert result.matched_keywords == ["aws", "python"] and result.missing_keywords == ["kubernetes"]
+    assert result.breakdown[0].name == "required_skills" and result.breakdown[0].score == 0.667
+    assert normalize_jd(JDNormalizeInput(text="Go   and  Docker")).skills == ["docker", "go"]
+
+
+def test_generic_words_in_a_jd_are_not_skills():
+    jd = ("Data Analyst at Acme. Must have Python and SQL. Send your CV and GitHub profile to Sarah Jenkins; "
+          "you will ship containers of reports every week.")
+    assert extract_skills(jd) == {"python", "sql"}
+    result = ats_score(ATSScoreInput(resume_text="Analyst with Python and SQL", job_description=jd))
+    assert result.missing_keywords == [] and result.matched_keywords == ["python", "sql"]
+    assert extract_skills("Computer vision with PyTorch; Jenkins and GitHub Actions pipelines") == {
+        "computer vision", "pytorch", "ci/cd"}
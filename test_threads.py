@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Tests for the thread grouping stage (app/threads.py): keys, merging and one extraction per conversation."""
+import json
+import os
+import tempfile
+
+from app.checkpoints import CheckpointStore
+from app.gmail_pipeline import STAGES, PipelineProgress, run_pipeline
+from app.threads import ThreadGrouper, normalize_subject, sender_domain
+
+
+def _email(message_id: str, subject: str, sender: str, date: str, thread_id: str = "", body: str = "") -> dict:
+    return {"id": message_id, "thread_id": thread_id, "subject": subject, "from": sender, "date": date,
+            "body": body or f"Message {message_id} about the application."}
+
+
+CONVERSATION = [
+    # Gmail lists newest first
+    _email("m3", "Re: Interview for Data Analyst", "Priya <priya@acme.com>", "Wed, 6 Aug 2025 09:00:00 +0000",
+           "t1", "Your interview is confirmed for Friday 10am."),
+    _email("m9", "Weekly digest: 20 new jobs", "Alerts <jobs@alerts.example.org>", "Tue, 5 Aug 2025 12:00:00 +0000",
+           "t9"),
+    _email("m2", "Interview for Data Analyst", "Acme Careers <careers@mail.acme.com>",
+           "Tue, 5 Aug 2025 08:00:00 +0000", "t1", "Can you share your availability this week?"),
+    # No thread id (forwarded from another client); joins on subject + registrable domain
+    _email("m1", "FW: [External] Interview for Data Analyst", "Acme HR <hr@acme.com>",
+           "Mon, 4 Aug 2025 08:00:00 +0000", body="Thanks for applying to the Data Analyst role."),
+]
+
+
+def _extracting(prompts: list):
+    def complete(prompt):
+        emails = json.loads(prompt.split("Emails: ", 1)[1])
+        prompts.append(emails)
+        return json.dumps([{"company": "Acme", "role": "Data Analyst", "message_id": e["id"]} for e in emails])
+
+    return complete
+
+
+def test_subject_and_domain_keys():
+    assert normalize_subject("RE: Fwd: [External] Interview  – Acme!") == "interview acme"
+    assert normalize_subject("Re[2]: Offer") == "offer"
+    assert sender_domain("Acme <jobs@mail.acme.co.uk>") == "acme.co.uk"
+    assert sender_domain("careers@notifications.acme.com") == "acme.com"
+    assert sender_domain("not an address") == ""
+
+
+def test_conversation_is_extracted_once_from_its_newest_message():
+    prompts = []
+    progress = run_pipeline([CONVERSATION[:2], CONVERSATION[2:]], _extracting(prompts), None, PipelineProgress(),
+                            threads=ThreadGrouper())
+    sent = [e for batch in prompts for e in batch]
+    assert [e["id"] for e in sent] == ["m3", "m9"]
+    assert len(prompts) == 1  # three messages of the conversation, one prompt entry
+    thread = sent[0]["thread"]
+    assert thread["messages"] == 3
+    assert [n["subject"] for n in thread["earlier"]] == [CONVERSATION[2]["subject"], CONVERSATION[3]["subject"]]
+    assert "availability" in thread["earlier"][0]["excerpt"]
+    assert "thread" not in sent[1]
+    assert progress.counts["threads"] == 2 and progress.counts["threaded"] == 2
+    assert {"threads", "threaded"} <= set(STAGES)  # shown on the CLI progress line
+    assert progress.counts["extract"] == 2
+
+
+def test_job_board_digests_and_separate_threads_are_not_merged():
+    digests = [_email(f"d{i}", "Jobs you may be interested in", "LinkedIn Job Alerts <jobalerts-noreply@linkedin.com>",
+                      f"{i + 1} Aug 2025 07:00:00 +0000", f"td{i}", f"Lead {i}: Data Analyst at Company {i}")
+               for i in range(5)]
+    threadless = [{**d, "id": f"n{i}", "thread_id": ""} for i, d in enumerate(digests)]
+    # Same subject from one company, but Gmail put them in two threads (two openings)
+    openings = [_email("o1", "Application received", "careers@globex.com", "4 Aug 2025 08:00:00 +0000", "tg1"),
+                _email("o2", "Application received", "careers@globex.com", "5 Aug 2025 08:00:00 +0000", "tg2")]
+    prompts = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CheckpointStore(os.path.join(tmp, "checkpoints.db"))
+        run = store.start("sheet", "Applications", query="q", mode="direct")
+        progress = run_pipeline([digests + threadless + openings], _extracting(prompts), None, PipelineProgress(),
+                                checkpoint=run, threads=ThreadGrouper())
+        sent = [e["id"] for batch in prompts for e in batch]
+        assert sorted(sent) == sorted(e["id"] for e in digests + threadless + openings)
+        assert progress.counts["threaded"] == 0 and progress.counts["threads"] == 12
+        assert not any("thread" in e for batch in prompts for e in batch)
+        store.close()
+
+
+def test_later_windows_only_reextract_newer_messages_and_checkpoint_merged_ones():
+    grouper = ThreadGrouper(window=2)
+    late_reply = _email("m4", "Re: Interview for Data Analyst", "priya@acme.com", "Thu, 7 Aug 2025 15:00:00 +0000",
+                        "t1", "Great news: we would like to make you an offer.")
+    pages = [CONVERSATION, [late_reply]]
+    prompts = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CheckpointStore(os.path.join(tmp, "checkpoints.db"))
+        run = store.start("sheet", "Applications", query="q", mode="direct")
+        progress = run_pipeline(pages, _extracting(prompts), None, PipelineProgress(), checkpoint=run,
+                                extract_batch=1, threads=grouper)
+        # window 1: m3 (newest of t1) and m9; window 2: m2/m1 are older than m3, merged; window 3: m4 is newer
+        assert [e["id"] for batch in prompts for e in batch] == ["m3", "m9", "m4"]
+        assert prompts[-1][0]["thread"]["messages"] == 4
+        assert progress.counts["threaded"] == 2
+        assert all(run.has_message(i) for i in ("m1", "m2", "m3", "m4", "m9"))
+        assert len(grouper.groups) == 2
+        store.close()
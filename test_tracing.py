@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Tests for run tracing (app/tracing.py): span nesting, error marking, usage and trace summaries."""
+import json
+import os
+import tempfile
+import time
+
+from app import tracing
+from app.results import GmailToSheetsResult
+from app.tracing import Tracer, summarize_trace
+from benchmarks.fakes import FakeSheetsEndpoint
+from tools import google_transport
+from tools.google_transport import ConnectionPool, PooledHttp
+
+
+def _records(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_spans_nest_and_exceptions_mark_them_failed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traces", "trace.jsonl")
+        tracer = Tracer(path=path)
+        try:
+            with tracer.span("workflow", kind="workflow", workflow="scan") as outer:
+                with tracer.span("portia.run", kind="llm") as inner:
+                    tracer.count("retries")
+                    tracer.count("retries")
+                assert tracer.current() is outer
+                with tracer.span("tool:gmail", kind="tool"):
+                    raise RuntimeError("quota exceeded")
+        except RuntimeError:
+            pass
+        assert tracer.current() is None
+
+        run, tool, workflow = _records(path)  # written as each span finishes
+        assert workflow["parent_id"] is None and workflow["span_id"] == outer.span_id
+        assert run["parent_id"] == tool["parent_id"] == outer.span_id
+        assert run["trace_id"] == tool["trace_id"] == workflow["trace_id"] == inner.trace_id
+        assert run["workflow"] == tool["workflow"] == "scan"  # inherited from the parent
+        assert run["status"] == "ok" and run["attrs"]["retries"] == 2
+        assert tool["status"] == workflow["status"] == "error" and tool["error"] == "quota exceeded"
+        assert workflow["wall_ms"] >= run["wall_ms"]
+
+
+def test_traced_marks_results_that_carry_an_error():
+    tracer = Tracer(path=None)
+    finished = []
+    tracer.finish = lambda span: finished.append(span)
+
+    @tracer.traced("gmail_to_sheets")
+    def scan(fail: str = ""):
+        return GmailToSheetsResult(success=not fail, error=fail or None)
+
+    @tracer.traced()
+    def analyze():
+        return {"error": "empty resume"}
+
+    assert scan().success and not scan("no credentials").success
+    analyze()
+    ok, failed, legacy = finished
+    assert ok.status == "ok" and ok.workflow == "gmail_to_sheets"
+    assert failed.status == "error" and failed.error == "no credentials"
+    assert legacy.name == legacy.workflow == "analyze" and legacy.error == "empty resume"
+
+
+def test_record_usage_prefers_reported_tokens_and_prices_known_models():
+    tracer = Tracer(path=None)
+    with tracer.span("portia.run", kind="llm") as span:
+        tracer.record_usage(span, "p" * 400, "c" * 40, model="openai/gpt-4o-mini",
+                            usage={"input_tokens": 1_000_000, "output_tokens": 500_000})
+    assert span.attrs["prompt_tokens"] == 1_000_000 and not span.attrs["tokens_estimated"]
+    assert span.attrs["cost_usd"] == 0.45  # 0.15 + 0.5 * 0.60
+
+    with tracer.span("portia.run", kind="llm") as span:
+        tracer.record_usage(span, {"query": "x" * 399}, ["y" * 40], model="unknown/model")
+    assert span.attrs["tokens_estimated"] and span.attrs["prompt_tokens"] == 101
+    assert span.attrs["completion_tokens"] == 10 and span.attrs["cost_usd"] == 0.0
+
+
+def test_summarize_trace_groups_workflows_slowest_first():
+    lines = [
+        {"workflow": "scan", "kind": "workflow", "wall_ms": 100.0, "status": "ok", "attrs": {}},
+        {"workflow": "scan", "kind": "workflow", "wall_ms": 300.0, "status": "error", "attrs": {}},
+        {"workflow": "scan", "kind": "llm", "wall_ms": 250.0, "status": "ok",
+         "attrs": {"prompt_tokens": 900, "completion_tokens": 100, "cost_usd": 0.0002}},
+        {"workflow": "prep", "kind": "workflow", "wall_ms": 50.0, "status": "ok", "attrs": {}},
+        {"name": "tool:sheets", "kind": "tool", "wall_ms": 20.0, "status": "ok", "attrs": {}},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(line) + "\n" for line in lines)
+            f.write("{not json\n")
+        rows = summarize_trace(path)
+    assert [r["workflow"] for r in rows] == ["scan", "prep"]  # spans without a workflow span are left out
+    scan = rows[0]
+    assert scan["runs"] == 2 and scan["errors"] == 1 and scan["max_ms"] == 300.0
+    assert scan["tokens"] == 1000 and scan["cost_usd"] == 0.0002
+
+
+def test_exporters_start_only_when_asked_and_once():
+    built = []
+    original = tracing.build_exporters
+    tracing.build_exporters = lambda spec: built.append(spec) or ["exporter"]
+    try:
+        tracer = Tracer.from_env()
+        assert tracer.exporters == [] and built == []  # importing or creating a tracer starts nothing
+        assert tracer.start_exporters("prometheus") == ["exporter"]
+        assert tracer.start_exporters("prometheus") == ["exporter"]
+        assert built == ["prometheus"]
+    finally:
+        tracing.build_exporters = original
+
+
+def test_queue_time_and_transport_retries_land_on_the_workflow_span():
+    finished = []
+    tracing.tracer.instrument_transport(google_transport)  # as app.orchestrator does
+    tracing.tracer.instrument_transport(google_transport)
+    tracing.tracer.finish = finished.append  # shadows the method on this instance only
+    try:
+        with tracing.tracer.queued(time.time() - 2):
+            with tracing.tracer.span("gmail_to_sheets", kind="workflow", workflow="gmail_to_sheets"):
+                with tracing.tracer.span("portia.run", kind="llm"):
+                    pass
+                with FakeSheetsEndpoint() as endpoint:
+                    http = PooledHttp(pool=ConnectionPool(), backoff_base=0.001)
+                    endpoint.fail_with = [(503, {"error": {"code": 503}}, {})]
+                    response, _ = http.request(f"{endpoint.url}/v4/spreadsheets/s1/values/A1:append", "PUT",
+                                               body=json.dumps({"values": [["Acme"]]}))
+                    http.close()
+        with tracing.tracer.span("later", kind="workflow"):
+            pass
+    finally:
+        del tracing.tracer.finish
+    run, workflow, later = finished
+    assert response.status == 200
+    assert workflow.queue_ms >= 2000 and run.queue_ms == 0.0 and later.queue_ms == 0.0
+    assert workflow.attrs["retries"] == 1 and "retries" not in run.attrs
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test utility for the local tracker copy and its analytics (app/tracker_store.py).
+Pure Python; no Google Sheets access needed.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from app.tracker_store import (
+    STATUSES,
+    TrackerStore,
+    applications_frame,
+    per_week,
+    query_applications,
+    response_time_by_source,
+    status_funnel,
+)
+
+APPLICATIONS = [
+    {"date_applied": "2025-08-04", "company": "Acme", "position": "Backend Engineer", "status": "Applied", "source": "LinkedIn"},
+    {"date_applied": "2025-08-06", "company": "Beta", "position": "SRE", "status": "Interviewed", "source": "Referral",
+     "responded_at": "2025-08-09"},
+    {"date_applied": "2025-08-20", "company": "Gamma", "position": "Data Engineer", "status": "Rejected", "source": "LinkedIn",
+     "responded_at": "2025-08-30"},
+    {"date_applied": "2025-08-21", "company": "Delta", "position": "ML Engineer", "status": "offer", "source": "Referral",
+     "responded_at": "2025-08-25"},
+]
+
+
+def test_typed_columns_and_analytics():
+    apps = applications_frame(APPLICATIONS)
+    assert str(apps["date_applied"].dtype) == "datetime64[ns]" and apps["status"].dtype == "category"
+    assert list(apps["status"]) == ["Applied", "Interviewed", "Rejected", "Offer"]
+
+    funnel = status_funnel(apps).set_index("status")
+    assert funnel.loc["Applied", "reached"] == 3 and funnel.loc["Interviewed", "reached"] == 2
+    assert funnel.loc["Offer", "reached"] == 1 and funnel.loc["Rejected", "count"] == 1
+
+    by_source = response_time_by_source(apps).set_index("source")
+    assert by_source.loc["Referral", "response_rate"] == 1.0 and by_source.loc["Referral", "median_days"] == 3.5
+    assert by_source.loc["LinkedIn", "responses"] == 1 and by_source.loc["LinkedIn", "mean_days"] == 10.0
+
+    weekly = per_week(apps)
+    assert list(weekly["count"]) == [2, 0, 2] and weekly["week"].iloc[0] == pd.Timestamp("2025-08-04")
+
+
+def test_store_upserts_applications_and_dedupes_leads():
+    with tempfile.TemporaryDirectory() as root:
+        store = TrackerStore(os.path.join(root, "tracker"))
+        assert store.add_applications(APPLICATIONS[:1]) == 1
+        version = store.version()
+        # Same application, new status: updated in place and the first response is stamped
+        assert store.add_applications([{**APPLICATIONS[0], "company": "acme ", "status": "Interview Scheduled"}]) == 0
+        assert store.version() != version
+        apps = TrackerStore(store.path).load("applications")
+        assert len(apps) == 1 and apps["status"].iloc[0] == "Interview Scheduled"
+        assert pd.notna(apps["responded_at"].iloc[0])
+
+        row = ["2025-08-01", "Acme", "Backend Engineer", "Gmail", "https://acme.example/jobs/1", ""]
+        written = []
+        append = store.tee_leads(lambda rows: written.extend(rows) or len(rows))
+        assert append([row, ["Mon, 4 Aug 2025 10:00:00 +0000", "Beta", "SRE", "Gmail", "", "2025-09-01"]]) == 2
+        assert store.add_leads([[" 2025-08-01", "ACME", "Backend  Engineer", "gmail", "https://acme.example/jobs/1", ""]]) == 0
+        leads = store.load("leads")
+        assert len(written) == 2 and len(leads) == 2
+        assert leads["deadline"].notna().sum() == 1 and leads["date"].dt.day.tolist() == [1, 4]
+
+
+def test_query_filters_sorts_and_pages():
+    apps = applications_frame(APPLICATIONS * 30)
+    rows, total = query_applications(apps, sources=("LinkedIn",), page=1, page_size=25)
+    assert total == 60 and len(rows) == 25 and set(rows["source"]) == {"LinkedIn"}
+    assert rows["date_applied"].is_monotonic_decreasing
+    rows, total = query_applications(apps, statuses=("Offer", "Interviewed"), search="ENGINEER", descending=False)
+    assert total == 30 and set(rows["company"]) == {"Delta"}
+    assert query_applications(apps, search="nobody")[1] == 0
+
+
+def test_analytics_on_a_large_frame():
+    n = 200_000
+    rng = np.random.default_rng(7)
+    applied = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), "D")
+    apps = pd.DataFrame({
+        "date_applied": applied,
+        "status": pd.Categorical(rng.choice(STATUSES, n), categories=STATUSES),
+        "source": pd.Categorical(rng.choice(["LinkedIn", "Indeed", "Referral"], n)),
+        "responded_at": applied + pd.to_timedelta(rng.integers(1, 15, n), "D"),
+    })
+    assert status_funnel(apps)["reached"].iloc[0] == (apps["status"] != "Rejected").sum() - (apps["status"] == "Other").sum()
+    assert response_time_by_source(apps)["applications"].sum() == n
+    assert per_week(apps)["count"].sum() == n
+
+
+def _add_one_at_a_time(root: str, company: str, count: int):
+    store = TrackerStore(root)
+    for i in range(count):
+        store.add_applications([{"date_applied": "2025-08-01", "company": company, "position": f"Role {i}"}])
+
+
+def test_concurrent_processes_do_not_lose_updates():
+    with tempfile.TemporaryDirectory() as root:
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=_add_one_at_a_time, args=(root, company, 15)) for company in ("Acme", "Beta")]
+        for worker in workers:
+            worker.start()
+        _add_one_at_a_time(root, "Gamma", 15)
+        for worker in workers:
+            worker.join(60)
+            assert worker.exitcode == 0
+        apps = TrackerStore(root).load("applications")
+        assert apps["company"].value_counts().to_dict() == {"Acme": 15, "Beta": 15, "Gamma": 15}
@@ -1,26 +1,160 @@
-"""Minimal ATS scoring placeholder tool.
+"""Local, explainable ATS scoring (no LLM call).
 
-Portia can wrap Python callables as tools. This function is a simple stub
-that returns a naive match score so imports don't fail.
+Portia can wrap Python callables as tools; ``ats_score`` is also what the resume
+optimizer shows directly, so it has to be fast (a few milliseconds) and deterministic.
+The score is a weighted sum of features, each reported in ``breakdown``:
+
+* ``required_skills``  - share of the skills from the JD's required/qualifications part found in the resume
+* ``preferred_skills`` - same for "preferred" / "nice to have" skills
+* ``recency``          - how recently the matched skills appear in dated resume entries
+* ``experience``       - candidate years vs the years the JD asks for
+
+Features the JD gives no signal for (no preferred section, no years) are left out and
+the remaining weights are rescaled. Skills come from the shared taxonomy; the resume
+side is the cached skill profile, not a re-scan.
 """
+import datetime
+import re
+
 from pydantic import BaseModel, Field
 
+from tools.skill_taxonomy import extract_skills, profile_index
+
+WEIGHTS = {"required_skills": 50.0, "preferred_skills": 15.0, "recency": 15.0, "experience": 20.0}
+# (max age in years, factor) for matched skills; undated = listed but not tied to a dated role
+RECENCY_BANDS = ((1, 1.0), (3, 0.8), (6, 0.5))
+RECENCY_OLD, RECENCY_UNDATED = 0.3, 0.6
+
+# Short heading lines that open a JD section
+_HEADING = re.compile(r"^\s*[#*\-•]*\s*(?P<title>[A-Za-z' /&-]{3,60}?)\s*:?\s*$")
+_REQUIRED = re.compile(r"require|must|qualification|what you.{0,6} need|what we.{0,6} looking for|you have|"
+                       r"who you are|skills", re.IGNORECASE)
+_PREFERRED = re.compile(r"prefer|nice|bonus|plus|desir|good to have|ideal", re.IGNORECASE)
+_OTHER = re.compile(r"about|benefit|perk|offer|salary|compensation|why join|equal opportunity", re.IGNORECASE)
+_PREFERRED_INLINE = re.compile(r"\b(preferred|nice[- ]to[- ]have|is a plus|a bonus|desirable|ideally)\b", re.IGNORECASE)
+_YEARS_REQUIRED = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?(?:years|yrs)\b", re.IGNORECASE)
+
+
 class ATSScoreInput(BaseModel):
     resume_text: str = Field(..., description="Resume text to analyze")
     job_description: str = Field(..., description="Job description to match against")
+    experience_years: int | None = Field(None, description="Candidate's years of experience, if known")
+
+
+class ATSFeature(BaseModel):
+    name: str = Field(..., description="Feature name")
+    score: float = Field(..., description="Feature score from 0 to 1")
+    weight: float = Field(..., description="Share of the total score, in points")
+    points: float = Field(..., description="Points this feature contributed")
+    detail: str = Field("", description="Why the feature scored this way")
+
 
 class ATSScoreOutput(BaseModel):
     ats_score: int = Field(..., description="ATS match score (0-100)")
     matched_keywords: list[str] = Field(default_factory=list, description="Keywords matched in resume")
     missing_keywords: list[str] = Field(default_factory=list, description="Keywords missing from resume")
+    breakdown: list[ATSFeature] = Field(default_factory=list, description="Per-feature score breakdown")
+
+
+def jd_sections(job_description: str) -> tuple[set[str], set[str], int | None]:
+    """Required skills, preferred skills and required years of experience from a JD.
+
+    Skills under a requirements heading are required, under a preferred heading (or on a line
+    that says "preferred"/"a plus") preferred. Skills elsewhere (summary, responsibilities)
+    count as required only when the JD has no requirements section at all.
+    """
+    required, preferred, elsewhere = set(), set(), set()
+    years, section, has_required = None, None, False
+    for line in job_description.splitlines():
+        heading = _HEADING.match(line)
+        if heading and len(line.split()) <= 6 and (line.rstrip().endswith(":") or not extract_skills(line)):
+            title = heading.group("title")
+            # "Preferred qualifications" is preferred, even though it also says "qualifications"
+            kind = ("preferred" if _PREFERRED.search(title) else "required" if _REQUIRED.search(title)
+                    else "other" if _OTHER.search(title) else "body" if line.rstrip().endswith(":") else None)
+            if kind is not None:
+                section = kind
+                has_required |= kind == "required"
+                continue
+        if section == "other":
+            continue
+        skills = extract_skills(line)
+        if section == "preferred" or _PREFERRED_INLINE.search(line):
+            preferred |= skills
+        else:
+            (required if section == "required" else elsewhere).update(skills)
+            match = _YEARS_REQUIRED.search(line)
+            if match and years is None:
+                years = int(match.group(1))
+    if not has_required:
+        required |= elsewhere
+    return required, preferred - required, years
+
+
+def _recency(year: int | None, this_year: int) -> float:
+    if year is None:
+        return RECENCY_UNDATED
+    age = this_year - year
+    return next((factor for max_age, factor in RECENCY_BANDS if age <= max_age), RECENCY_OLD)
+
+
+def _feature(name: str, score: float, detail: str) -> ATSFeature:
+    return ATSFeature(name=name, score=round(score, 3), weight=WEIGHTS.get(name, 50.0), points=0.0, detail=detail)
+
+
+def _keyword_overlap(resume: str, jd: str) -> tuple[ATSFeature, list[str], list[str]]:
+    """Fallback when the JD names no known skills: plain word overlap."""
+    words = {w for w in jd.split() if len(w) > 3}
+    matched = sorted(w for w in words if w in resume)
+    missing = sorted(words - set(matched))
+    return _feature("keywords", len(matched) / max(1, len(words)), f"{len(matched)}/{len(words)} JD words found"), \
+        matched, missing
+
 
 def ats_score(input: ATSScoreInput) -> ATSScoreOutput:
     resume = input.resume_text.lower()
     jd = input.job_description.lower()
     if not resume or not jd:
         return ATSScoreOutput(ats_score=0, matched_keywords=[], missing_keywords=[])
-    words = {w for w in jd.split() if len(w) > 3}
-    matched = sorted([w for w in words if w in resume])
-    missing = sorted(list(words - set(matched)))
-    score = int(100 * (len(matched) / max(1, len(words))))
-    return ATSScoreOutput(ats_score=score, matched_keywords=matched, missing_keywords=missing)
+
+    required, preferred, years_needed = jd_sections(input.job_description)
+    profile = profile_index(input.resume_text)
+    have = set(profile.skills)
+    features = []
+    if required or preferred:
+        matched = sorted((required | preferred) & have)
+        missing = sorted((required | preferred) - have)
+        for name, wanted in (("required_skills", required), ("preferred_skills", preferred)):
+            if wanted:
+                hits = wanted & have
+                detail = f"{len(hits)}/{len(wanted)} found"
+                if wanted - hits:
+                    detail += "; missing " + ", ".join(sorted(wanted - hits))
+                features.append(_feature(name, len(hits) / len(wanted), detail))
+        this_year = datetime.date.today().year
+        factors = {skill: _recency(profile.skill_years.get(skill), this_year) for skill in matched}
+        stale = sorted(skill for skill, factor in factors.items() if factor < 0.6)
+        features.append(_feature(
+            "recency", sum(factors.values()) / len(factors) if factors else 0.0,
+            ("no matched skills" if not factors else
+             f"{sum(f >= 0.8 for f in factors.values())}/{len(factors)} matched skills used in the last 3 years"
+             + (f"; dated: {', '.join(stale)}" if stale else "")),
+        ))
+    else:
+        feature, matched, missing = _keyword_overlap(resume, jd)
+        features.append(feature)
+
+    if years_needed:
+        years = input.experience_years if input.experience_years is not None else profile.experience_years
+        if years is None:
+            features.append(_feature("experience", 0.5, f"JD asks for {years_needed}+ years; resume does not say"))
+        else:
+            features.append(_feature("experience", min(1.0, years / years_needed),
+                                     f"{years} of {years_needed}+ years"))
+
+    total_weight = sum(f.weight for f in features)
+    for f in features:
+        f.weight = round(100 * f.weight / total_weight, 1)
+        f.points = round(f.weight * f.score, 1)
+    score = round(sum(f.weight * f.score for f in features))
+    return ATSScoreOutput(ats_score=score, matched_keywords=matched, missing_keywords=missing, breakdown=features)
@@ -0,0 +1,132 @@
+"""Shrink an email body to its informative content before it goes into a prompt.
+
+Recorded bodies (``.portia/cache/agent_memory/*/$emails.json``) carry a lot the LLM does
+not need: ``\\r\\n`` line ends, invisible preheader padding (``\\u2007 \\ufeff \\u034f``
+repeated hundreds of times), markdown asterisks, HTML leftovers, quoted reply chains,
+``-- `` signatures, numbered tracking-link lists and unsubscribe footers.
+``normalize_body`` removes them with precompiled patterns, in one pass per step, and caps
+the result at a line or sentence boundary. Run it once per body: a footer cut is relative
+to the body's length, so a second pass may trim further.
+
+Kept on purpose: sign-offs ("Best regards, HR Team, TechNova Solutions" names the company),
+forwarded messages (often the JD itself) and short URLs (the lead's application link).
+Tracking URLs longer than ``MAX_URL_CHARS`` are cut to their origin.
+"""
+import html
+import re
+
+MAX_URL_CHARS = 100
+# A footer marker only ends the body this far in; some mails open with "You are receiving this..."
+FOOTER_MIN_FRACTION = 0.3
+
+# Invisible padding and odd spaces used by newsletter templates
+_INVISIBLE = re.compile("[\u200b-\u200f\u2060\ufeff\u034f\xad\u180e]+")
+_ODD_SPACE = re.compile("[\xa0\u2007\u2009\u200a\u202f\u3000]")
+
+_HTML_HINT = re.compile(r"<(?:html|body|div|p|br|table|td|span|a|style|head|title)\b|</\w+>", re.IGNORECASE)
+_HTML_DROP = re.compile(r"<(style|script|head)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+_HTML_BREAK = re.compile(r"<(?:br|/p|/div|/tr|/li|/h\d)\b[^>]*>", re.IGNORECASE)
+_HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>|\w+/title>")
+_MARKDOWN = re.compile(r"(?<!\w)(\*{1,2}|_{2})(?=\S)(.+?)(?<=\S)\1(?!\w)")
+
+# Start of quoted history in a reply: everything from here on is dropped
+_QUOTE_START = re.compile(
+    r"^(?:On\s.{4,200}?\bwrote:\s*$"
+    r"|-{2,}\s*Original Message\s*-{2,}"
+    r"|From:\s.+\n(?:Sent|Date):\s"
+    r"|_{10,}\s*$"
+    r"|Le\s.{4,200}?a écrit\s*:\s*$"
+    r"|Am\s.{4,200}?schrieb.{0,80}:\s*$)",
+    re.MULTILINE,
+)
+# A From:/Date: block right after one of these introduces a forwarded message, not quoted history
+_FORWARD_MARKER = re.compile(r"(?:-{2,}\s*Forwarded message\s*-{2,}|Begin forwarded message:)\s*\Z", re.IGNORECASE)
+_QUOTED_LINE = re.compile(r"^[ \t]*>.*(?:\n|$)", re.MULTILINE)
+_SIGNATURE = re.compile(r"^-- ?$|^Sent from my \w+|^Get Outlook for \w+", re.MULTILINE)
+_FOOTER = re.compile(
+    r"(?:if you(?:'|’)?d like to |if you would like to |click here to |to )?unsubscribe|"
+    r"you are receiving this (?:e-?mail|message)|you(?:'|’)re receiving this|you have received this|"
+    r"if you (?:do not|don't|no longer) wish to receive|manage your (?:job )?alerts|email settings|"
+    r"(?:please )?do not reply to this (?:e-?mail|message)|refrain from sending|"
+    r"view (?:this email )?in (?:your )?browser|all rights reserved|©\s*\d{4}|"
+    r"this (?:e-?mail|message) (?:and any attachments )?(?:is|are|may be) confidential|privacy policy",
+    re.IGNORECASE,
+)
+_LINK_LIST_LINE = re.compile(r"^[ \t]*\d{1,3}\.[ \t]+(?:https?://|mailto:)\S*[ \t]*$\n?", re.MULTILINE)
+_LINK_REF = re.compile(r"[ \t]*\[\d{1,3}\]")
+_URL = re.compile(r"https?://[^\s<>()\"']+")
+_SPACES = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _strip_html(text: str) -> str:
+    text = _HTML_DROP.sub(" ", text)
+    text = _HTML_BREAK.sub("\n", text)
+    return html.unescape(_HTML_TAG.sub(" ", text))
+
+
+def _short_url(match: re.Match) -> str:
+    url = match.group(0)
+    if len(url) <= MAX_URL_CHARS:
+        return url
+    scheme, _, rest = url.partition("://")
+    return f"{scheme}://{rest.split('/', 1)[0]}/…"
+
+
+def _cap(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    # Prefer ending on a line or sentence boundary when one is close to the limit
+    boundary = max(cut.rfind("\n"), cut.rfind(". "))
+    return (cut[:boundary + 1] if boundary >= max_chars * 0.8 else cut).rstrip() + " …"
+
+
+def _quote_start(text: str) -> int:
+    """Where quoted history starts in ``text``, or -1; forwarded headers do not count."""
+    for match in _QUOTE_START.finditer(text):
+        start = match.start()
+        if not _FORWARD_MARKER.search(text, max(0, start - 100), start):
+            return start
+    return -1
+
+
+def normalize_body(text: str, max_chars: int | None = 1500) -> str:
+    """The informative part of an email body, at most ``max_chars`` long (``None`` = no cap)."""
+    if not text:
+        return ""
+    text = _ODD_SPACE.sub(" ", _INVISIBLE.sub("", text)).replace("\r\n", "\n").replace("\r", "\n")
+    if _HTML_HINT.search(text):
+        text = _strip_html(text)
+
+    quote = _quote_start(text)
+    if quote > 0:
+        text = text[:quote]
+    text = _QUOTED_LINE.sub("", text)
+    signature = _SIGNATURE.search(text)
+    if signature and signature.start() > 0:
+        text = text[:signature.start()]
+
+    text = _LINK_LIST_LINE.sub("", text)
+    text = _LINK_REF.sub("", text)
+    text = _URL.sub(_short_url, text)
+    text = _MARKDOWN.sub(r"\2", text)
+
+    lines, previous = [], None
+    for line in _SPACES.sub(" ", text).split("\n"):
+        line = line.strip()
+        if line and line == previous:
+            continue
+        lines.append(line)
+        previous = line
+    text = _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+    floor = int(len(text) * FOOTER_MIN_FRACTION)
+    # A footer starting past the cap cannot change the result, so only that window is searched
+    footer = _FOOTER.search(text, floor, max_chars + 100 if max_chars else len(text))
+    if footer:
+        # Cut at the start of the marker's sentence or line when it is close, else at the marker
+        near = max(floor, footer.start() - 80)
+        start = max(text.rfind("\n", near, footer.start()), text.rfind(". ", near, footer.start()) + 1)
+        text = text[:start if start > near else footer.start()].rstrip()
+    return _cap(text, max_chars) if max_chars else text
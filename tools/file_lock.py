@@ -0,0 +1,65 @@
+"""An exclusive lock on a file, shared by threads and by processes (daemon, API workers, Streamlit, CLI).
+
+Used for the Google token file (``tools.google_auth``) and the local tracker copy
+(``app.tracker_store``), so read-modify-write cycles on them never interleave.
+"""
+import os
+import threading
+
+
+class FileLock:
+    """Exclusive across threads of this process and across processes (re-entrant per thread)."""
+
+    def __init__(self, path: str, mode: int = 0o600):
+        self.path = path
+        self.mode = mode
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            if self._depth == 0:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, self.mode)
+                _lock_fd(self._fd)
+            self._depth += 1
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                _unlock_fd(self._fd)
+                os.close(self._fd)
+                self._fd = None
+        finally:
+            self._thread_lock.release()
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd: int):
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # gives up after ~10 s; keep waiting
+                return
+            except OSError:
+                continue
+
+    def _unlock_fd(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
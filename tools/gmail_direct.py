@@ -0,0 +1,108 @@
+"""Direct Gmail API access: page through matching messages without an LLM in the loop."""
+import base64
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from tools.google_auth import GMAIL_READONLY_SCOPE
+from tools.google_sheets_direct import get_google_sheets_credentials
+from tools.google_transport import get_service
+
+SCOPES = [GMAIL_READONLY_SCOPE]
+
+DEFAULT_QUERY = "newer_than:30d"
+
+
+def get_gmail_service():
+    """Build a Gmail API client from the same OAuth client used for Sheets."""
+    creds = get_google_sheets_credentials(scopes=SCOPES)
+    if not creds:
+        raise RuntimeError("Google account not connected; run `python cli.py google-auth` once")
+    return get_service('gmail', 'v1', creds)
+
+
+def _decode_part(data: str) -> str:
+    return base64.urlsafe_b64decode(data.encode("ascii") + b"===").decode("utf-8", errors="replace")
+
+
+def _plain_text(payload: Dict[str, Any]) -> str:
+    """Return the first text/plain part of a message payload (depth first)."""
+    if payload.get("mimeType") == "text/plain" and payload.get("body", {}).get("data"):
+        return _decode_part(payload["body"]["data"])
+    for part in payload.get("parts", []) or []:
+        text = _plain_text(part)
+        if text:
+            return text
+    return ""
+
+
+def _attachments(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Metadata of the attached files in a payload; the bytes are fetched later, only if wanted."""
+    found = []
+    if payload.get("filename"):
+        body = payload.get("body", {})
+        meta = {"filename": payload["filename"], "mime_type": payload.get("mimeType", ""),
+                "size": body.get("size", 0), "id": body.get("attachmentId", "")}
+        if not meta["id"] and body.get("data"):
+            meta["data"] = body["data"]  # small attachments come inline
+        if meta["id"] or meta.get("data"):
+            found.append(meta)
+    for part in payload.get("parts", []) or []:
+        found.extend(_attachments(part))
+    return found
+
+
+def message_to_email(message: Dict[str, Any], max_body_chars: int = 4000) -> Dict[str, Any]:
+    """Flatten a Gmail API message into the shape the agent memory uses (from/to/subject/date/body/id).
+
+    ``attachments`` lists attached files (filename, mime type, size, attachment id) without their bytes.
+    """
+    payload = message.get("payload", {})
+    headers = {h["name"].lower(): h["value"] for h in payload.get("headers", [])}
+    body = _plain_text(payload) or message.get("snippet", "")
+    return {
+        "from": headers.get("from", ""),
+        "to": headers.get("to", ""),
+        "subject": headers.get("subject", ""),
+        "date": headers.get("date", ""),
+        "body": body[:max_body_chars],
+        "id": message.get("id", ""),
+        "thread_id": message.get("threadId", ""),
+        "attachments": _attachments(payload),
+    }
+
+
+def iter_message_pages(
+    service,
+    query: str = DEFAULT_QUERY,
+    page_size: int = 25,
+    max_messages: Optional[int] = None,
+    max_body_chars: int = 4000,
+    page_token: Optional[str] = None,
+    skip: Optional[Callable[[str], bool]] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield one page of flattened emails at a time; only the current page is held in memory.
+
+    ``skip(message_id)`` lets a resumed run avoid downloading messages it already processed.
+    """
+    fetched = 0
+    while True:
+        listing = service.users().messages().list(
+            userId="me", q=query, maxResults=page_size, pageToken=page_token
+        ).execute()
+        refs = listing.get("messages", [])
+        if skip is not None:
+            refs = [ref for ref in refs if not skip(ref["id"])]
+        if max_messages is not None:
+            refs = refs[:max(0, max_messages - fetched)]
+        page = [
+            message_to_email(
+                service.users().messages().get(userId="me", id=ref["id"], format="full").execute(),
+                max_body_chars,
+            )
+            for ref in refs
+        ]
+        fetched += len(page)
+        if page:
+            yield page
+        page_token = listing.get("nextPageToken")
+        if not page_token or (max_messages is not None and fetched >= max_messages):
+            return
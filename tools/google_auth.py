@@ -0,0 +1,259 @@
+"""Google OAuth credentials shared by every Sheets/Gmail client, across threads and processes.
+
+* The browser consent flow runs once, from ``python cli.py google-auth``. It listens on a
+  random loopback port, not Streamlit's 8501, and asks for every scope the app uses. The
+  token is saved to ``CAREER_COPILOT_GOOGLE_TOKEN`` (default ``.portia/google/token.json``),
+  readable by the owner only.
+* After that ``get_credentials`` never opens a browser. It loads the saved token, or raises
+  ``CredentialsRequired`` saying how to connect.
+* Every refresh holds the token file's lock. The file is re-read first, so a token that
+  another process (daemon, Streamlit, CLI) refreshed a moment ago is adopted instead of
+  refreshed again.
+* A background thread refreshes the access token ``REFRESH_MARGIN`` seconds before it
+  expires, so API calls do not wait on the token endpoint.
+"""
+import datetime
+import json
+import os
+import threading
+
+from tools.file_lock import FileLock
+
+SHEETS_SCOPE = "https://www.googleapis.com/auth/spreadsheets"
+GMAIL_READONLY_SCOPE = "https://www.googleapis.com/auth/gmail.readonly"
+DEFAULT_SCOPES = [SHEETS_SCOPE, GMAIL_READONLY_SCOPE]
+DEFAULT_TOKEN_FILE = os.path.join(".portia", "google", "token.json")
+REFRESH_MARGIN = 300  # seconds before expiry
+_EXPIRY_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+class CredentialsRequired(RuntimeError):
+    """No usable saved token; the one-time interactive setup has to run first."""
+
+
+def _utcnow() -> datetime.datetime:
+    # google-auth keeps expiry as naive UTC
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def parse_expiry(value: str | None) -> datetime.datetime | None:
+    if not value:
+        return None
+    return datetime.datetime.strptime(value.rstrip("Z").split(".")[0], _EXPIRY_FORMAT)
+
+
+class TokenFile:
+    """The saved authorized-user token, guarded by a thread lock plus an OS file lock."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file_lock = FileLock(path + ".lock")
+
+    def lock(self) -> FileLock:
+        """Exclusive across threads of this process and across processes (re-entrant per thread)."""
+        return self._file_lock
+
+    def read(self) -> dict | None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable Google token file {self.path}: {e}")
+            return None
+
+    def write(self, info: dict):
+        """Atomic replace; the file is created owner-only (0600) since it holds a refresh token."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        os.replace(tmp, self.path)
+
+
+class CredentialManager:
+    """Owns the one credentials object per process and keeps it fresh.
+
+    ``loader(info)`` turns saved token JSON into a credentials object; by default a
+    google-auth ``Credentials`` whose ``refresh()`` goes through ``coordinated_refresh``.
+    """
+
+    def __init__(self, token_path: str = DEFAULT_TOKEN_FILE, scopes: list[str] | None = None,
+                 refresh_margin: float = REFRESH_MARGIN, loader=None):
+        self.token_file = TokenFile(token_path)
+        self.scopes = list(scopes or DEFAULT_SCOPES)
+        self.refresh_margin = refresh_margin
+        self._loader = loader or self._google_credentials
+        self._credentials = None
+        self._granted = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._refresher = None
+        self.stats = {"refreshes": 0, "adopted": 0, "background_errors": 0}
+
+    @classmethod
+    def from_env(cls) -> "CredentialManager":
+        return cls(os.environ.get("CAREER_COPILOT_GOOGLE_TOKEN", DEFAULT_TOKEN_FILE))
+
+    # ---- loading ---------------------------------------------------------------
+    def _google_credentials(self, info: dict):
+        from google.oauth2.credentials import Credentials
+
+        manager = self
+
+        class ManagedCredentials(Credentials):
+            def refresh(self, request):
+                manager.coordinated_refresh(self, lambda: Credentials.refresh(self, request))
+
+        return ManagedCredentials.from_authorized_user_info(info, info.get("scopes"))
+
+    def has_token(self) -> bool:
+        return os.path.exists(self.token_file.path)
+
+    def credentials(self, scopes: list[str] | None = None):
+        """The shared credentials; raises ``CredentialsRequired`` instead of prompting."""
+        with self._lock:
+            if self._credentials is None:
+                with self.token_file.lock():
+                    info = self.token_file.read()
+                if not info or not info.get("refresh_token"):
+                    raise CredentialsRequired(
+                        "Google account not connected: run `python cli.py google-auth` once "
+                        "(needs GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET)."
+                    )
+                self._credentials = self._loader(info)
+                self._granted = set(info.get("scopes") or [])
+                self.start_refresher()
+            missing = set(scopes or []) - self._granted
+            if missing:
+                raise CredentialsRequired(
+                    f"The saved Google token lacks {', '.join(sorted(missing))}: re-run `python cli.py google-auth`."
+                )
+            return self._credentials
+
+    # ---- refreshing ------------------------------------------------------------
+    def _expiring(self, expiry: datetime.datetime | None, margin: float) -> bool:
+        return expiry is None or expiry - _utcnow() <= datetime.timedelta(seconds=margin)
+
+    def coordinated_refresh(self, creds, refresh):
+        """Refresh ``creds`` via ``refresh()``, unless the token file already has a newer token.
+
+        Runs under the token file lock, so processes sharing the file refresh once between them.
+        """
+        with self.token_file.lock():
+            info = self.token_file.read() or {}
+            expiry = parse_expiry(info.get("expiry"))
+            if info.get("token") and info["token"] != creds.token and not self._expiring(expiry, 60):
+                creds.token = info["token"]
+                creds.expiry = expiry
+                self.stats["adopted"] += 1
+                return
+            refresh()
+            self.stats["refreshes"] += 1
+            saved = json.loads(creds.to_json())
+            # to_json omits scopes it was not given; keep what the consent granted
+            saved.setdefault("scopes", info.get("scopes"))
+            self.token_file.write(saved)
+
+    def refresh_now(self):
+        """Refresh the shared credentials on the pooled transport (what the background thread does)."""
+        from tools.google_transport import auth_request
+
+        creds = self._credentials
+        if creds is not None:
+            creds.refresh(auth_request())
+
+    def start_refresher(self):
+        if self._refresher is None or not self._refresher.is_alive():
+            self._wake.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, name="google-token-refresher", daemon=True)
+            self._refresher.start()
+
+    def stop(self):
+        self._wake.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=5)
+
+    def _refresh_loop(self):
+        retry_in = None
+        while not self._wake.is_set():
+            creds = self._credentials
+            if retry_in is not None:
+                wait = retry_in
+            elif creds is None or creds.expiry is None:
+                wait = self.refresh_margin
+            else:
+                wait = (creds.expiry - _utcnow()).total_seconds() - self.refresh_margin
+            if wait > 0 and self._wake.wait(wait):
+                return
+            if creds is None or not self._expiring(creds.expiry, self.refresh_margin):
+                retry_in = None
+                continue
+            try:
+                self.refresh_now()
+                retry_in = None
+            except Exception as e:
+                self.stats["background_errors"] += 1
+                retry_in = min(300.0, (retry_in or 15.0) * 2)
+                print(f"⚠️ Background Google token refresh failed (retrying in {retry_in:.0f}s): {e}")
+
+    # ---- first setup -----------------------------------------------------------
+    def authorize(self, port: int = 0, open_browser: bool = True):
+        """One-time consent flow on a loopback port (0 = any free port). Saves and returns the token."""
+        client_id = os.environ.get("GOOGLE_CLIENT_ID")
+        client_secret = os.environ.get("GOOGLE_CLIENT_SECRET")
+        if not (client_id and client_secret):
+            raise CredentialsRequired("Set GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET (an OAuth desktop client) first.")
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        flow = InstalledAppFlow.from_client_config(
+            {
+                "installed": {
+                    "client_id": client_id,
+                    "client_secret": client_secret,
+                    "redirect_uris": ["http://localhost"],
+                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+                    "token_uri": "https://oauth2.googleapis.com/token",
+                }
+            },
+            self.scopes,
+        )
+        # prompt=consent so Google returns a refresh token even if the app was approved before
+        creds = flow.run_local_server(port=port, open_browser=open_browser, access_type="offline", prompt="consent")
+        info = json.loads(creds.to_json())
+        info.setdefault("scopes", self.scopes)
+        with self.token_file.lock():
+            self.token_file.write(info)
+        with self._lock:
+            self._credentials = None
+        return self.credentials()
+
+    def status(self) -> dict:
+        info = self.token_file.read() or {}
+        expiry = parse_expiry(info.get("expiry"))
+        return {
+            "token_file": self.token_file.path,
+            "connected": bool(info.get("refresh_token")),
+            "scopes": info.get("scopes") or [],
+            "expires_in_s": round((expiry - _utcnow()).total_seconds()) if expiry else None,
+            **self.stats,
+        }
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def credential_manager() -> CredentialManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = CredentialManager.from_env()
+        return _manager
+
+
+def get_credentials(scopes: list[str] | None = None):
+    """Shared, auto-refreshing Google credentials; raises ``CredentialsRequired`` if not set up."""
+    return credential_manager().credentials(scopes)
@@ -1,16 +1,13 @@
 """Direct Google Sheets integration as a fallback option."""
-import os
-import json
 from typing import List, Any, Dict, Optional
 from pydantic import BaseModel, Field
-import pandas as pd
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from tools.google_auth import SHEETS_SCOPE, CredentialsRequired, get_credentials
+from tools.google_transport import get_service
+from tools.llm_json import decode_llm_json
+from tools.schemas import LEAD_HEADERS, JobLead
 
-# If modifying these scopes, delete the file token.json.
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+SCOPES = [SHEETS_SCOPE]
 
 class SheetWriteInput(BaseModel):
     sheet_id: str = Field(..., description="The ID of the Google Sheet")
@@ -24,32 +21,26 @@ class SheetWriteOutput(BaseModel):
     rows_written: int = Field(..., description="Number of rows written")
     message: str = Field(..., description="Status message")
 
-def get_google_sheets_credentials():
-    """Get Google Sheets credentials from OAuth flow or cached token."""
-    creds = None
-    
-    # Check for environment variable based OAuth
-    client_id = os.environ.get("GOOGLE_CLIENT_ID")
-    client_secret = os.environ.get("GOOGLE_CLIENT_SECRET")
-    redirect_uri = os.environ.get("GOOGLE_REDIRECT_URI", "http://localhost:8501")
-    
-    if client_id and client_secret:
-        # Use OAuth flow
-        flow = InstalledAppFlow.from_client_config(
-            {
-                "installed": {
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "redirect_uris": [redirect_uri],
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token"
-                }
-            },
-            SCOPES
-        )
-        creds = flow.run_local_server(port=8501)
-    
-    return creds
+def get_google_sheets_credentials(scopes: Optional[List[str]] = None):
+    """The saved, auto-refreshing Google credentials (Sheets scope by default), or None.
+
+    Never starts the browser consent flow; that is a one-time ``python cli.py google-auth``.
+    """
+    try:
+        return get_credentials(scopes or SCOPES)
+    except CredentialsRequired as e:
+        print(f"⚠️ {e}")
+        return None
+
+def ensure_tab(service, sheet_id: str, tab_name: str) -> bool:
+    """Create the tab if it is missing. Returns True when it was created."""
+    sheet_metadata = service.spreadsheets().get(spreadsheetId=sheet_id).execute()
+    for sheet in sheet_metadata.get('sheets', []):
+        if sheet.get('properties', {}).get('title') == tab_name:
+            return False
+    request = {'addSheet': {'properties': {'title': tab_name}}}
+    service.spreadsheets().batchUpdate(spreadsheetId=sheet_id, body={'requests': [request]}).execute()
+    return True
 
 def write_to_sheets(input_data: SheetWriteInput) -> SheetWriteOutput:
     """Write data directly to Google Sheets using the Sheets API."""
@@ -60,39 +51,15 @@ def write_to_sheets(input_data: SheetWriteInput) -> SheetWriteOutput:
             return SheetWriteOutput(
                 success=False,
                 rows_written=0,
-                message="Failed to get Google Sheets credentials"
+                message="Google account not connected; run `python cli.py google-auth` once"
             )
         
-        # Build the Sheets API service
-        service = build('sheets', 'v4', credentials=creds)
+        # Shared Sheets client on the pooled, retrying transport
+        service = get_service('sheets', 'v4', creds)
         
         # First check if the sheet exists
         try:
-            sheet_metadata = service.spreadsheets().get(
-                spreadsheetId=input_data.sheet_id
-            ).execute()
-            
-            # Check if the tab exists
-            sheet_exists = False
-            for sheet in sheet_metadata.get('sheets', []):
-                if sheet.get('properties', {}).get('title') == input_data.tab_name:
-                    sheet_exists = True
-                    break
-            
-            if not sheet_exists:
-                # Create the sheet tab
-                request = {
-                    'addSheet': {
-                        'properties': {
-                            'title': input_data.tab_name
-                        }
-                    }
-                }
-                service.spreadsheets().batchUpdate(
-                    spreadsheetId=input_data.sheet_id,
-                    body={'requests': [request]}
-                ).execute()
-        
+            ensure_tab(service, input_data.sheet_id, input_data.tab_name)
         except HttpError as error:
             if error.resp.status == 404:
                 return SheetWriteOutput(
@@ -132,29 +99,11 @@ def write_to_sheets(input_data: SheetWriteInput) -> SheetWriteOutput:
 def direct_gmail_to_sheets(email_data_json: str, sheet_id: str, sheet_tab: str) -> Dict[str, Any]:
     """Parse email data JSON and write directly to Google Sheets."""
     try:
-        # Parse the JSON data
-        if email_data_json.startswith("```json"):
-            # Extract the JSON content from code blocks
-            start_idx = email_data_json.find("[")
-            end_idx = email_data_json.rfind("]") + 1
-            if start_idx > 0 and end_idx > 0:
-                email_data_json = email_data_json[start_idx:end_idx]
-        
-        email_data = json.loads(email_data_json)
+        # Parse the JSON data (fences, surrounding prose and escaping are handled by the decoder)
+        leads = decode_llm_json(email_data_json, model=list[JobLead], expect=list)
         
         # Convert to rows for sheets
-        headers = ["Date", "Company", "Role", "Source", "URL", "Deadline"]
-        rows = [headers]  # Start with headers
-        
-        for item in email_data:
-            rows.append([
-                item.get("date", ""),
-                item.get("company", ""),
-                item.get("role", ""),
-                item.get("source", ""),
-                item.get("url", ""),
-                item.get("deadline", "")
-            ])
+        rows = [LEAD_HEADERS] + [lead.as_row() for lead in leads]
         
         # Write to Google Sheets
         result = write_to_sheets(SheetWriteInput(
@@ -175,3 +124,118 @@ def direct_gmail_to_sheets(email_data_json: str, sheet_id: str, sheet_tab: str)
             "success": False,
             "error": str(e)
         }
+
+
+class SheetsAppender:
+    """Appends row batches to one tab through the Sheets API, without the LLM.
+
+    Credentials and the API client are created once per run; the tab and its header
+    row are ensured on the first append, so each later batch costs a single request.
+    """
+
+    def __init__(self, sheet_id: str, tab_name: str, headers: Optional[List[str]] = None, service=None):
+        self.sheet_id = sheet_id
+        self.tab_name = tab_name
+        self.headers = headers
+        self._service = service
+        self._ready = False
+        self._sheet_gid = None
+
+    def _connect(self):
+        if self._service is None:
+            creds = get_google_sheets_credentials()
+            if not creds:
+                raise RuntimeError("Google account not connected; run `python cli.py google-auth` once")
+            self._service = get_service('sheets', 'v4', creds)
+        created = ensure_tab(self._service, self.sheet_id, self.tab_name)
+        if self.headers:
+            first = self._service.spreadsheets().values().get(
+                spreadsheetId=self.sheet_id, range=f"{self.tab_name}!A1:A1"
+            ).execute() if not created else {}
+            if not first.get('values'):
+                self._append([self.headers])
+        self._ready = True
+
+    def _append(self, rows: List[List[Any]]) -> int:
+        result = self._service.spreadsheets().values().append(
+            spreadsheetId=self.sheet_id,
+            range=f"{self.tab_name}!A1",
+            valueInputOption="USER_ENTERED",
+            insertDataOption="INSERT_ROWS",
+            body={"values": rows}
+        ).execute()
+        return result.get('updates', {}).get('updatedRows', 0)
+
+    def read_range(self, cells: str) -> List[List[Any]]:
+        """Values of an A1 range such as ``Applications!A120:I`` (empty trailing cells are omitted)."""
+        if not self._ready:
+            self._connect()
+        result = self._service.spreadsheets().values().get(
+            spreadsheetId=self.sheet_id, range=cells
+        ).execute()
+        return result.get('values', [])
+
+    def read_ranges(self, ranges: List[str]) -> List[List[List[Any]]]:
+        """Values of several A1 ranges in one request, in the order given."""
+        if not self._ready:
+            self._connect()
+        result = self._service.spreadsheets().values().batchGet(
+            spreadsheetId=self.sheet_id, ranges=ranges
+        ).execute()
+        return [r.get('values', []) for r in result.get('valueRanges', [])]
+
+    def write_ranges(self, data: Dict[str, List[List[Any]]]) -> int:
+        """Overwrite several A1 ranges in one ``values.batchUpdate`` request. Returns rows updated."""
+        if not self._ready:
+            self._connect()
+        result = self._service.spreadsheets().values().batchUpdate(
+            spreadsheetId=self.sheet_id,
+            body={"valueInputOption": "USER_ENTERED",
+                  "data": [{"range": cells, "values": rows} for cells, rows in data.items()]}
+        ).execute()
+        return result.get('totalUpdatedRows', 0)
+
+    def append_rows(self, rows: List[List[Any]]) -> int:
+        """Append rows and return the sheet row number the first one landed on."""
+        if not self._ready:
+            self._connect()
+        result = self._service.spreadsheets().values().append(
+            spreadsheetId=self.sheet_id,
+            range=f"{self.tab_name}!A1",
+            valueInputOption="USER_ENTERED",
+            insertDataOption="INSERT_ROWS",
+            body={"values": rows}
+        ).execute()
+        updated = result.get('updates', {}).get('updatedRange', '')  # e.g. "Applications!A12:I14"
+        return int(''.join(ch for ch in updated.rsplit('!', 1)[-1].split(':')[0] if ch.isdigit()))
+
+    def delete_rows(self, rows: List[int]):
+        """Delete sheet rows (1-based) in one ``batchUpdate``; bottom-up so the numbers stay valid."""
+        if not self._ready:
+            self._connect()
+        if self._sheet_gid is None:
+            meta = self._service.spreadsheets().get(
+                spreadsheetId=self.sheet_id, fields="sheets.properties"
+            ).execute()
+            self._sheet_gid = next(s['properties']['sheetId'] for s in meta.get('sheets', [])
+                                   if s['properties'].get('title') == self.tab_name)
+        spans = []
+        for row in sorted(set(rows), reverse=True):
+            if spans and spans[-1][0] == row:
+                spans[-1][0] = row - 1
+            else:
+                spans.append([row - 1, row])
+        requests = [{'deleteDimension': {'range': {'sheetId': self._sheet_gid, 'dimension': 'ROWS',
+                                                   'startIndex': start, 'endIndex': end}}} for start, end in spans]
+        self._service.spreadsheets().batchUpdate(spreadsheetId=self.sheet_id, body={'requests': requests}).execute()
+
+    def read_rows(self) -> List[List[Any]]:
+        """All rows currently on the tab (used to confirm writes interrupted mid-batch)."""
+        return self.read_range(f"{self.tab_name}!A:F")
+
+    def append(self, rows: List[List[Any]]) -> int:
+        if not rows:
+            return 0
+        if not self._ready:
+            self._connect()
+        return self._append(rows)
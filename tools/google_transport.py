@@ -0,0 +1,370 @@
+"""Shared HTTP transport for the Google API clients (Sheets, Gmail).
+
+``build('sheets', 'v4', credentials=creds)`` on every call means a new discovery client,
+a new TLS connection and no retries. ``get_service`` instead returns one cached client per
+API built on:
+
+* ``PooledHttp`` - an httplib2-compatible ``request()`` over a thread-safe pool of
+  keep-alive ``http.client`` connections, so concurrent threads can share one client;
+* the discovery documents bundled with ``google-api-python-client`` (``static_discovery``),
+  with an in-memory + on-disk cache for older client versions that fetch them;
+* jittered exponential backoff on 429/5xx and on quota 403s (``rateLimitExceeded``,
+  ``userRateLimitExceeded``). ``Retry-After`` is honoured, and a quota hit pauses every
+  thread calling that host, not just the one that hit it.
+
+Only idempotent methods (GET, PUT, DELETE ...) are retried on 5xx, on timeouts and resets
+after the request went out, and resent on a stale kept-alive connection. A POST such as
+``values:append`` may already have been applied in those cases, so it is retried only
+when the server rejected it (429, quota) or the connection could not be opened, and it
+only reuses a connection that was idle for at most ``POST_MAX_IDLE_S``.
+
+``CAREER_COPILOT_GOOGLE_RETRIES`` sets the retry budget per request (default 5, ``0`` disables retries).
+Every retry is also reported to the callbacks registered with ``on_retry`` (``app.tracing``
+counts them on the active span).
+"""
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+DEFAULT_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Idle connections older than this are not used for non-idempotent requests (they cannot be resent)
+POST_MAX_IDLE_S = 30.0
+QUOTA_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "quotaExceeded", "RATE_LIMIT_EXCEEDED"}
+DISCOVERY_DIR = os.path.join(".portia", "discovery")
+
+# Errors that mean a kept-alive connection went stale; an idempotent request is resent on a fresh one.
+_STALE = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError,
+          BrokenPipeError, ConnectionAbortedError)
+
+
+class ConnectError(OSError):
+    """The connection could not be opened, so the request was never sent."""
+
+
+class HttpResponse(dict):
+    """httplib2-style response: a dict of lower-case headers plus ``status`` and ``reason``."""
+
+    def __init__(self, status: int, reason: str, headers):
+        super().__init__((name.lower(), value) for name, value in headers)
+        self.status = status
+        self.reason = reason
+        self["status"] = str(status)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port), handed out one thread at a time."""
+
+    def __init__(self, max_idle: int = 10, timeout: float = 60.0):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "connections": 0, "reused": 0, "retries": 0, "throttled_s": 0.0}
+
+    def acquire(self, key: tuple, max_idle_s: float | None = None) -> tuple[http.client.HTTPConnection, bool]:
+        """A connection for ``key`` and whether it was reused (False = freshly opened).
+
+        With ``max_idle_s``, a connection idle for longer is closed and a new one opened.
+        """
+        stale = None
+        with self._lock:
+            idle = self._idle[key]
+            if idle:
+                conn, released_at = idle.pop()
+                if max_idle_s is None or time.monotonic() - released_at <= max_idle_s:
+                    self.stats["reused"] += 1
+                    return conn, True
+                stale = conn
+            self.stats["connections"] += 1
+        if stale is not None:
+            stale.close()
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=self.timeout), False
+
+    def release(self, key: tuple, conn: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(deque)
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+
+def _decode(body: bytes, response: HttpResponse) -> bytes:
+    # httplib2 hands decompressed content to googleapiclient; do the same
+    encoding = response.get("content-encoding", "")
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "deflate":
+        body = zlib.decompress(body)
+    else:
+        return body
+    response["-content-encoding"] = response.pop("content-encoding")
+    return body
+
+
+def quota_reason(status: int, content: bytes) -> str | None:
+    """The quota/rate-limit reason of a Google API error body, if it is one."""
+    if status not in (403, 429) or not content:
+        return None
+    try:
+        error = json.loads(content).get("error", {})
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(error, dict):
+        return None
+    reasons = [item.get("reason") for item in error.get("errors", []) if isinstance(item, dict)]
+    reasons += [item.get("reason") for item in error.get("details", []) if isinstance(item, dict)]
+    reasons.append(error.get("status"))
+    return next((reason for reason in reasons if reason in QUOTA_REASONS or reason == "RESOURCE_EXHAUSTED"), None)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 32.0, retry_after: str | None = None) -> float:
+    """Full-jitter exponential backoff; a numeric ``Retry-After`` header wins when present."""
+    if retry_after:
+        try:
+            return min(cap, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class PooledHttp:
+    """Drop-in for ``httplib2.Http`` as used by googleapiclient, safe to share across threads.
+
+    ``credentials`` (google-auth) are refreshed under a lock when expired and on a 401.
+    """
+
+    def __init__(self, credentials=None, pool: ConnectionPool | None = None, retries: int | None = None,
+                 backoff_base: float = 0.5, backoff_cap: float = 32.0):
+        self.credentials = credentials
+        self.pool = pool or ConnectionPool()
+        self.retries = DEFAULT_RETRIES if retries is None else retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = self.pool.timeout
+        self._refresh_lock = threading.Lock()
+        self._not_before = {}  # host -> monotonic time before which nobody calls it (quota cooldown)
+
+    @classmethod
+    def from_env(cls, credentials=None, pool: ConnectionPool | None = None) -> "PooledHttp":
+        return cls(credentials, pool, retries=int(os.environ.get("CAREER_COPILOT_GOOGLE_RETRIES", DEFAULT_RETRIES)))
+
+    # ---- auth ------------------------------------------------------------------
+    def _refresh(self, stale_token=None):
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.credentials.valid and self.credentials.token != stale_token:
+                return
+            self.credentials.refresh(AuthRequest(self.pool))
+
+    def _authorize(self, headers: dict):
+        if self.credentials is None:
+            return
+        if not self.credentials.valid:
+            self._refresh(self.credentials.token)
+        self.credentials.apply(headers)
+
+    # ---- wire ------------------------------------------------------------------
+    def _send(self, url: str, method: str, body, headers: dict, idempotent: bool = True) -> tuple[HttpResponse, bytes]:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.pool.stats["requests"] += 1
+        while True:
+            conn, reused = self.pool.acquire(key, None if idempotent else POST_MAX_IDLE_S)
+            if conn.sock is None:
+                try:
+                    conn.connect()
+                except OSError as e:
+                    conn.close()
+                    raise ConnectError(f"Could not connect to {parts.hostname}: {e}") from e
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                raw = conn.getresponse()
+                content = raw.read()
+            except _STALE:
+                conn.close()
+                if reused and idempotent:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            response = HttpResponse(raw.status, raw.reason, raw.getheaders())
+            if raw.will_close:
+                conn.close()
+            else:
+                self.pool.release(key, conn)
+            return response, _decode(content, response)
+
+    def _wait_for(self, host: str):
+        delay = self._not_before.get(host, 0.0) - time.monotonic()
+        if delay > 0:
+            self.pool.stats["throttled_s"] += delay
+            time.sleep(delay)
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        host = urlsplit(uri).hostname
+        headers = dict(headers or {})
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else {429}
+        refreshed = False
+        attempt = 0
+        while True:
+            self._wait_for(host)
+            self._authorize(headers)
+            try:
+                response, content = self._send(uri, method, body, headers, idempotent)
+            except (OSError, http.client.HTTPException) as e:
+                # After the request went out, only an idempotent one can safely be sent again
+                if attempt >= self.retries or not (idempotent or isinstance(e, ConnectError)):
+                    raise
+                response, content = None, b""
+            if response is not None and response.status == 401 and self.credentials is not None and not refreshed:
+                refreshed = True
+                self._refresh(self.credentials.token)
+                continue
+            quota = quota_reason(response.status, content) if response is not None else None
+            if response is not None and response.status not in retry_statuses and not quota:
+                return response, content
+            if attempt >= self.retries:
+                return response, content
+
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap,
+                                  response.get("retry-after") if response is not None else None)
+            if quota or (response is not None and response.status == 429):
+                # Quota is per project/user, not per thread: hold every caller of this host
+                self._not_before[host] = max(self._not_before.get(host, 0.0), time.monotonic() + delay)
+            else:
+                time.sleep(delay)
+            self.pool.stats["retries"] += 1
+            for callback in _retry_callbacks:
+                callback()
+            attempt += 1
+
+    def close(self):
+        self.pool.close()
+
+
+class _AuthResponse:
+    def __init__(self, response: HttpResponse, data: bytes):
+        self.status = response.status
+        self.headers = response
+        self.data = data
+
+
+class AuthRequest:
+    """``google.auth.transport.Request`` over the same pool, used for token refreshes."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.http = PooledHttp(pool=pool, retries=2)
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        try:
+            response, data = self.http.request(url, method, body=body, headers=headers)
+        except (OSError, http.client.HTTPException) as e:
+            from google.auth import exceptions
+
+            raise exceptions.TransportError(e) from e
+        return _AuthResponse(response, data)
+
+
+class DiscoveryCache:
+    """``googleapiclient.discovery_cache.base.Cache`` kept in memory and under ``.portia/discovery/``.
+
+    Only used by client versions without bundled (static) discovery documents.
+    """
+
+    def __init__(self, directory: str = DISCOVERY_DIR):
+        self.directory = directory
+        self._docs = {}
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        if url not in self._docs:
+            try:
+                with open(self._path(url), encoding="utf-8") as f:
+                    self._docs[url] = f.read()
+            except OSError:
+                return None
+        return self._docs[url]
+
+    def set(self, url, content):
+        self._docs[url] = content
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(url) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp, self._path(url))
+        except OSError:
+            pass
+
+
+_pool = ConnectionPool()
+_services = {}
+_services_lock = threading.Lock()
+_discovery_cache = DiscoveryCache()
+_retry_callbacks = []
+
+
+def get_service(api: str, version: str, credentials):
+    """The shared API client for (api, version) on the pooled transport.
+
+    The client is built once; later calls with other credentials (e.g. a re-authorized
+    user) only swap the credentials on its transport.
+    """
+    with _services_lock:
+        entry = _services.get((api, version))
+        if entry is None:
+            from googleapiclient.discovery import build
+
+            http = PooledHttp.from_env(credentials, _pool)
+            try:
+                service = build(api, version, http=http, static_discovery=True)
+            except TypeError:  # google-api-python-client < 2.0 has no bundled documents
+                service = build(api, version, http=http, cache=_discovery_cache)
+            entry = _services[(api, version)] = (http, service)
+        http, service = entry
+        http.credentials = credentials
+        return service
+
+
+def auth_request() -> AuthRequest:
+    """A token-endpoint request on the shared pool, for refreshing credentials."""
+    return AuthRequest(_pool)
+
+
+def on_retry(callback):
+    """Call ``callback()`` on the retrying thread every time a request is retried."""
+    _retry_callbacks.append(callback)
+
+
+def stats() -> dict:
+    """Counters of the shared pool: requests, connections opened, reuses, retries, seconds throttled."""
+    return dict(_pool.stats, throttled_s=round(_pool.stats["throttled_s"], 3))
@@ -1,13 +1,16 @@
 """Minimal JD normalization placeholder tool."""
 from pydantic import BaseModel, Field
 
+from tools.skill_taxonomy import extract_skills
+
 class JDNormalizeInput(BaseModel):
     text: str = Field(..., description="Raw job description text")
 
 class JDNormalizeOutput(BaseModel):
     normalized: str = Field(..., description="Normalized job description")
     length: int = Field(..., description="Length of normalized text")
+    skills: list[str] = Field(default_factory=list, description="Canonical skills mentioned in the JD")
 
 def normalize_jd(input: JDNormalizeInput) -> JDNormalizeOutput:
     norm = " ".join(input.text.split())
-    return JDNormalizeOutput(normalized=norm, length=len(norm))
+    return JDNormalizeOutput(normalized=norm, length=len(norm), skills=sorted(extract_skills(norm)))
@@ -0,0 +1,328 @@
+"""Decode JSON out of raw LLM output.
+
+LLM answers arrive wrapped in code fences, surrounded by prose, double-escaped,
+as a Python repr of a list of chunks, or cut off mid-object. ``decode_llm_json``
+handles all of these with one bracket-aware scan plus a small repair ladder, and
+optionally validates the result into a pydantic model (or msgspec Struct).
+"""
+import ast
+import json
+import re
+from functools import lru_cache
+
+try:
+    import orjson
+
+    def _loads(text: str):
+        return orjson.loads(text)
+except ImportError:  # pragma: no cover - optional speedup
+    try:
+        import msgspec
+
+        _msgspec_decoder = msgspec.json.Decoder()
+
+        def _loads(text: str):
+            try:
+                return _msgspec_decoder.decode(text)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+    except ImportError:
+        _loads = json.loads
+
+try:
+    import msgspec as _msgspec
+except ImportError:  # pragma: no cover - optional
+    _msgspec = None
+
+# Characters that matter structurally; everything else is skipped by the regex engine
+_STRUCTURAL = re.compile(r'["\\{}\[\]]')
+_OPENERS = {"{": "}", "[": "]"}
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_ESCAPED = re.compile(r'\\(["\\])')
+_MAX_DEPTH = 3
+_VALUE_START = re.compile(r"[{\[]")
+_RAW_DECODE_ATTEMPTS = 8
+_raw_decode = json.JSONDecoder().raw_decode
+
+
+class LLMJSONError(ValueError):
+    """Raised when no usable JSON value can be recovered from an LLM output."""
+
+    def __init__(self, message: str, raw=None):
+        super().__init__(message)
+        self.raw = raw
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove one outer ```lang ... ``` fence; fences nested inside the payload are left alone."""
+    text = text.strip()
+    if text.startswith("```"):
+        newline = text.find("\n")
+        text = text[newline + 1:] if newline != -1 else text[3:]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def iter_json_spans(text: str):
+    """Yield ``(start, end, complete)`` for each top-level ``{...}``/``[...]`` span in ``text``.
+
+    Strings are tracked only inside a span, so quotes and brackets in surrounding
+    prose cannot unbalance it. A span still open at the end of the text is yielded
+    with ``complete=False`` so the caller can try to close it.
+    """
+    stack = []
+    start = None
+    in_string = False
+    skip = -1
+    for match in _STRUCTURAL.finditer(text):
+        pos = match.start()
+        if pos <= skip:
+            continue
+        ch = match.group()
+        if in_string:
+            if ch == "\\":
+                skip = pos + 1
+            elif ch == '"':
+                in_string = False
+            continue
+        if not stack:
+            if ch in _OPENERS:
+                stack.append(_OPENERS[ch])
+                start = pos
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch == "\\":
+            # \" outside a string only occurs in double-escaped payloads
+            skip = pos + 1
+        elif ch in _OPENERS:
+            stack.append(_OPENERS[ch])
+        elif ch in "}]":
+            if ch != stack[-1]:
+                # Mismatched closer: this was prose, not JSON
+                stack.clear()
+                continue
+            stack.pop()
+            if not stack:
+                yield start, pos + 1, True
+    if stack:
+        yield start, len(text), False
+
+
+def close_truncated(fragment: str) -> str:
+    """Close an unterminated string and any open brackets of a truncated JSON fragment."""
+    stack = []
+    in_string = False
+    skip = -1
+    for match in _STRUCTURAL.finditer(fragment):
+        pos = match.start()
+        if pos <= skip:
+            continue
+        ch = match.group()
+        if in_string:
+            if ch == "\\":
+                skip = pos + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _OPENERS:
+            stack.append(_OPENERS[ch])
+        elif ch in "}]" and stack:
+            stack.pop()
+    out = fragment + '"' if in_string else fragment.rstrip()
+    out = out.rstrip().rstrip(",")
+    if out.endswith(":"):
+        out += "null"
+    return out + "".join(reversed(stack))
+
+
+_REPAIR = re.compile(
+    r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|,(?=\s*[}\]])|\b(?:True|False|None)\b', re.DOTALL
+)
+_SINGLE_QUOTED_BODY = re.compile(r'\\.|"', re.DOTALL)
+_CONTROL_CHARS = str.maketrans({"\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def _repair_token(match) -> str:
+    token = match.group()
+    first = token[0]
+    if first == '"':
+        return token.translate(_CONTROL_CHARS)
+    if first == "'":
+        # \' is valid in Python strings but not JSON; bare " must be escaped
+        body = _SINGLE_QUOTED_BODY.sub(
+            lambda m: '\\"' if m.group() == '"' else ("'" if m.group() == "\\'" else m.group()), token[1:-1]
+        )
+        return '"' + body.translate(_CONTROL_CHARS) + '"'
+    if first == ",":
+        return ""
+    return _PY_LITERALS[token]
+
+
+def repair_json(text: str) -> str:
+    """Fix the usual LLM mistakes outside of string contents in one regex pass:
+    trailing commas, Python literals, single-quoted strings, raw newlines inside strings.
+    """
+    return _REPAIR.sub(_repair_token, text)
+
+
+def _parse_candidate(candidate: str):
+    """Try progressively more forgiving decoders; return ``(ok, value)``."""
+    try:
+        return True, _loads(candidate)
+    except ValueError:
+        pass
+    literal_first = candidate.startswith(("['", "[\""))
+    if literal_first:
+        # Python repr of chunks, e.g. "['```json\n{...', '...']": the C literal parser is fastest
+        try:
+            return True, ast.literal_eval(candidate)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            pass
+    try:
+        return True, _loads(repair_json(candidate))
+    except ValueError:
+        pass
+    if not literal_first:
+        try:
+            return True, ast.literal_eval(candidate)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            pass
+    if '\\"' in candidate:
+        # Double-escaped payload: undo one level of \" and \\ escaping in a single pass
+        try:
+            return True, _loads(repair_json(_ESCAPED.sub(r"\1", candidate)))
+        except ValueError:
+            pass
+    return False, None
+
+
+def _candidate_spans(text: str):
+    """Top-level spans in order; when one fails to parse the caller gets its inner spans next."""
+    for start, end, complete in iter_json_spans(text):
+        yield start, end, complete
+        # Only reached when the caller kept iterating, i.e. the span was unusable
+        for inner_start, inner_end, inner_complete in iter_json_spans(text[start + 1:end]):
+            yield start + 1 + inner_start, start + 1 + inner_end, inner_complete
+
+
+def _matches(value, expect) -> bool:
+    if expect is None:
+        return isinstance(value, (dict, list))
+    return isinstance(value, expect)
+
+
+def _is_chunk_list(value) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(v, str) for v in value)
+
+
+def iter_json_values(value, expect: type | tuple | None = None, _depth: int = 0):
+    """Lazily yield every JSON value recoverable from ``value`` (str, list of str chunks, dict or list), in order."""
+    if isinstance(value, (dict, list)) and not _is_chunk_list(value):
+        if _matches(value, expect):
+            yield value
+        return
+    if _is_chunk_list(value):
+        value = "".join(value)
+    if not isinstance(value, str):
+        return
+
+    text = strip_code_fences(value)
+    if not text:
+        return
+
+    # Fast path: the whole output is the JSON value
+    if text[0] in "{[" and text[-1] in "}]":
+        try:
+            parsed = _loads(text)
+        except ValueError:
+            parsed = None
+        if parsed is not None and _matches(parsed, expect):
+            yield parsed
+
+    # Valid JSON embedded in prose: let the C decoder find where each value ends. Stop at the
+    # first opener that starts real-but-broken JSON, so values nested inside it are never
+    # mistaken for the answer; the bracket-aware scan below repairs that span instead.
+    pos = attempts = 0
+    while attempts < _RAW_DECODE_ATTEMPTS:
+        match = _VALUE_START.search(text, pos)
+        if match is None:
+            break
+        start = match.start()
+        try:
+            parsed, pos = _raw_decode(text, start)
+        except json.JSONDecodeError as e:
+            if text.startswith("['", start) or text.startswith('["', start):
+                # Python repr of output chunks: the list usually runs to the last ']'
+                try:
+                    chunks = ast.literal_eval(text[start:text.rindex("]") + 1])
+                except (ValueError, SyntaxError, MemoryError, RecursionError):
+                    chunks = None
+                if _is_chunk_list(chunks) and _depth < _MAX_DEPTH:
+                    yield from iter_json_values(chunks, expect, _depth + 1)
+                break
+            if e.pos > start + 1 or text[start + 1:start + 2] in ("'", '"'):
+                break
+            attempts += 1
+            pos = start + 1
+            continue
+        if _is_chunk_list(parsed) and _depth < _MAX_DEPTH:
+            yield from iter_json_values(parsed, expect, _depth + 1)
+        elif _matches(parsed, expect):
+            yield parsed
+
+    # Broken JSON: bracket-aware scan, then repair each candidate span
+    for start, end, complete in _candidate_spans(text):
+        candidate = text[start:end] if complete else close_truncated(text[start:end])
+        ok, parsed = _parse_candidate(candidate)
+        if not ok:
+            continue
+        if _is_chunk_list(parsed) and _depth < _MAX_DEPTH:
+            # e.g. "Agent returned invalid content: ['```json\n{...', '...}```']"
+            yield from iter_json_values(parsed, expect, _depth + 1)
+        elif _matches(parsed, expect):
+            yield parsed
+
+
+def extract_json(value, expect: type | tuple | None = None):
+    """Return the first JSON value in ``value``; raise ``LLMJSONError`` if there is none."""
+    for parsed in iter_json_values(value, expect):
+        return parsed
+    raise LLMJSONError("No JSON value found in output", raw=value)
+
+
+@lru_cache(maxsize=64)
+def _type_adapter(model):
+    from pydantic import TypeAdapter
+
+    return TypeAdapter(model)
+
+
+def validate(data, model):
+    """Validate decoded data into a pydantic model, msgspec Struct or any pydantic-supported type."""
+    if hasattr(model, "model_validate"):
+        return model.model_validate(data)
+    if _msgspec is not None and isinstance(model, type) and issubclass(model, _msgspec.Struct):
+        return _msgspec.convert(data, model)
+    return _type_adapter(model).validate_python(data)
+
+
+def decode_llm_json(value, model=None, expect: type | tuple | None = None):
+    """Extract, repair and (optionally) validate JSON from an LLM output.
+
+    Raises ``LLMJSONError`` (a ``ValueError``) when nothing usable is found or validation fails.
+    """
+    if model is None:
+        return extract_json(value, expect=expect)
+    first_error = None
+    # Later candidates are only decoded when earlier ones fail validation
+    for data in iter_json_values(value, expect):
+        try:
+            return validate(data, model)
+        except Exception as e:
+            first_error = first_error or LLMJSONError(
+                f"Output did not match {getattr(model, '__name__', model)}: {e}", raw=data
+            )
+    raise first_error or LLMJSONError("No JSON value found in output", raw=value)
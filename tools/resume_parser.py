@@ -1,4 +1,6 @@
 """Minimal resume text extraction placeholder tool."""
+import re
+
 from pydantic import BaseModel, Field
 
 class ResumeTextInput(BaseModel):
@@ -11,3 +13,55 @@ class ResumeTextOutput(BaseModel):
 def extract_resume_text(input: ResumeTextInput) -> ResumeTextOutput:
     # In real usage you'd parse PDF/DOCX. For now, return text as-is.
     return ResumeTextOutput(text=input.text, chars=len(input.text))
+
+
+SECTION_HEADING = re.compile(
+    r"^\s*(summary|profile|about me|skills|technical skills|core skills|education|certifications?|"
+    r"experience|work experience|professional experience|employment|projects?|achievements|awards)\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """Split a resume into ``(title, body)`` at standard section headings.
+
+    Text before the first heading is the ``Header`` section; repeated titles get a ``(2)`` suffix.
+    """
+    sections, title, lines, seen = [], "Header", [], {}
+    for line in text.splitlines(keepends=True):
+        heading = SECTION_HEADING.match(line)
+        if heading is None:
+            lines.append(line)
+            continue
+        if lines or title != "Header":
+            sections.append((title, "".join(lines)))
+        name = heading.group(1).strip().title()
+        seen[name] = seen.get(name, 0) + 1
+        title, lines = (name if seen[name] == 1 else f"{name} ({seen[name]})"), []
+    if lines or title != "Header":
+        sections.append((title, "".join(lines)))
+    return sections
+
+
+def read_resume_stream(stream, name: str) -> str:
+    """Plain text from a binary file object; ``name`` picks the format (.pdf, .docx, otherwise text)."""
+    suffix = name.lower().rsplit(".", 1)[-1] if "." in name else ""
+    if suffix == "pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise RuntimeError("Reading PDF resumes needs pypdf: pip install pypdf")
+        return "\n".join(page.extract_text() or "" for page in PdfReader(stream).pages)
+    if suffix == "docx":
+        try:
+            import docx2txt
+        except ImportError:
+            raise RuntimeError("Reading DOCX resumes needs docx2txt: pip install docx2txt")
+        return docx2txt.process(stream) or ""
+    return stream.read().decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def read_resume_file(path: str) -> str:
+    """Plain text from a .pdf, .docx or text resume file."""
+    with open(path, "rb") as f:
+        return read_resume_stream(f, path)
@@ -0,0 +1,73 @@
+"""Pydantic models for structured LLM outputs (interview prep, extracted job leads)."""
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+
+class InterviewQuestion(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    category: str = Field("general", description="Question category, e.g. technical or behavioral")
+    question: str = Field(..., description="Interview question")
+    sample_answer: str = Field("", description="Sample answer")
+    key_points: list[str] = Field(default_factory=list, description="Points the answer should cover")
+    interviewer_focus: str = Field("", description="What the interviewer is evaluating")
+
+    @field_validator("category", "sample_answer", "interviewer_focus", mode="before")
+    @classmethod
+    def _text(cls, v: Any) -> str:
+        return "" if v is None else str(v)
+
+    @field_validator("key_points", mode="before")
+    @classmethod
+    def _points(cls, v: Any) -> list[str]:
+        # LLMs often return key points as one "; "-separated string
+        if v is None:
+            return []
+        if isinstance(v, str):
+            parts = [p.strip(" -•\t") for p in v.replace("\n", ";").split(";")]
+            return [p for p in parts if p]
+        return [str(p) for p in v]
+
+
+class InterviewPrep(BaseModel):
+    interview_prep: list[InterviewQuestion] = Field(..., description="Generated interview questions")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _bare_list(cls, data: Any) -> Any:
+        # Accept a bare array of questions as well as {"interview_prep": [...]}
+        if isinstance(data, list):
+            return {"interview_prep": data}
+        return data
+
+
+class JobLead(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    date: str = Field("", description="Email or posting date")
+    company: str = Field("", description="Company name")
+    role: str = Field("", description="Role / position title")
+    source: str = Field("", description="Where the lead came from")
+    url: str = Field("", description="Application or posting URL")
+    deadline: str = Field("", description="Application deadline, if any")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _aliases(cls, data: Any) -> Any:
+        if isinstance(data, dict) and not data.get("role"):
+            for alias in ("position", "title", "job_title"):
+                if data.get(alias):
+                    return {**data, "role": data[alias]}
+        return data
+
+    @field_validator("date", "company", "role", "source", "url", "deadline", mode="before")
+    @classmethod
+    def _text(cls, v: Any) -> str:
+        return "" if v is None else str(v)
+
+    def as_row(self) -> list[str]:
+        return [self.date, self.company, self.role, self.source, self.url, self.deadline]
+
+
+LEAD_HEADERS = ["Date", "Company", "Role", "Source", "URL", "Deadline"]
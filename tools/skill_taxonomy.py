@@ -0,0 +1,271 @@
+"""Skill taxonomy and the precomputed per-user skill profile.
+
+Skills are matched with one compiled Aho–Corasick automaton over every canonical skill
+and alias, so a resume or JD is scanned once, in a single pass, however big the
+taxonomy grows. ``profile_index`` turns a resume plus the sidebar profile into a
+``SkillProfile``; it is cached on the content, so it is rebuilt only when the resume or
+the sidebar changes and every tool (ATS score, JD parser, interview prompt, question bank)
+reuses the same result instead of re-scanning the resume.
+"""
+import bisect
+import datetime
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+
+from pydantic import BaseModel, Field
+
+from tools.resume_parser import split_sections
+
+# canonical skill -> aliases (matched case-insensitively, on word boundaries)
+SKILL_TAXONOMY: dict[str, tuple[str, ...]] = {
+    # languages
+    "python": ("python3", "py"),
+    "java": (),
+    "javascript": ("js", "ecmascript"),
+    "typescript": ("ts",),
+    "go": ("golang",),
+    "rust": (),
+    "c++": ("cpp",),
+    "c#": ("csharp", ".net", "dotnet"),
+    "sql": ("t-sql", "pl/sql"),
+    "r": (),
+    "scala": (),
+    "kotlin": (),
+    "swift": (),
+    # web / backend
+    "django": (),
+    "flask": (),
+    "fastapi": (),
+    "react": ("react.js", "reactjs"),
+    "node": ("node.js", "nodejs"),
+    "rest": ("rest api", "restful"),
+    "graphql": (),
+    "microservices": ("microservice",),
+    "system design": ("distributed systems",),
+    # data
+    "pandas": (),
+    "numpy": (),
+    "spark": ("pyspark", "apache spark"),
+    "airflow": ("apache airflow",),
+    "kafka": ("apache kafka",),
+    "postgresql": ("postgres", "psql"),
+    "mysql": (),
+    "mongodb": ("mongo",),
+    "redis": (),
+    "nosql": (),
+    "data analysis": ("data analytics",),
+    "statistics": ("statistical analysis",),
+    "excel": ("ms excel", "microsoft excel"),
+    "tableau": (),
+    "power bi": ("powerbi",),
+    # ml / ai
+    "machine learning": ("ml",),
+    "deep learning": ("dl",),
+    "llm": ("llms", "large language models", "large language model", "genai", "generative ai"),
+    "nlp": ("natural language processing",),
+    "computer vision": (),  # not "CV": in a JD that is the résumé
+    "pytorch": ("torch",),
+    "tensorflow": ("tf", "keras"),
+    "multi-agent": ("multi agent", "multi-agent systems", "agentic"),
+    # cloud / ops
+    "aws": ("amazon web services", "ec2", "s3"),
+    "gcp": ("google cloud", "google cloud platform"),
+    "azure": ("microsoft azure",),
+    "docker": ("containerization",),
+    "kubernetes": ("k8s",),
+    "terraform": (),
+    "linux": ("unix",),
+    "git": (),  # "GitHub" alone is usually a profile link
+    "ci/cd": ("cicd", "continuous integration", "continuous delivery", "github actions"),
+    "security": ("cybersecurity", "appsec"),
+    "testing": ("unit testing", "pytest", "tdd", "test automation"),
+    # process / design
+    "agile": (),
+    "scrum": (),
+    "figma": (),
+}
+
+# Aliases that are also common English words; only matched when written in upper case
+_CASE_SENSITIVE = {"go": "Go", "r": "R", "rest": "REST", "ts": "TS", "tf": "TF", "dl": "DL"}
+
+
+class SkillAutomaton:
+    """Aho–Corasick automaton over all skill names and aliases, with word-boundary matching."""
+
+    def __init__(self, taxonomy: dict[str, tuple[str, ...]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[int, str]]] = [[]]  # (pattern length, canonical)
+        for canonical, aliases in taxonomy.items():
+            for pattern in (canonical, *aliases):
+                self._add(pattern.lower(), canonical)
+        self._build()
+
+    def _add(self, pattern: str, canonical: str):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), canonical))
+
+    def _build(self):
+        queue = list(self._goto[0].values())  # depth-1 nodes fail to the root
+        for node in queue:
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    @staticmethod
+    def _boundary(text: str, i: int) -> bool:
+        return i < 0 or i >= len(text) or not (text[i].isalnum() or text[i] in "+#")
+
+    def find(self, text: str) -> list[tuple[int, int, str]]:
+        """Non-overlapping ``(start, end, canonical)`` matches, longest match first at each position."""
+        lowered = text.lower()
+        original = text if len(text) == len(lowered) else lowered
+        node, hits = 0, []
+        for i, ch in enumerate(lowered):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for length, canonical in self._out[node]:
+                start = i - length + 1
+                if not (self._boundary(lowered, start - 1) and self._boundary(lowered, i + 1)):
+                    continue
+                cased = _CASE_SENSITIVE.get(lowered[start:i + 1])
+                if cased is not None and original[start:i + 1] != cased:
+                    continue
+                hits.append((start, i + 1, canonical))
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+        matches, end = [], -1
+        for hit in hits:
+            if hit[0] >= end:
+                matches.append(hit)
+                end = hit[1]
+        return matches
+
+    def counts(self, text: str) -> Counter:
+        return Counter(canonical for _, _, canonical in self.find(text or ""))
+
+    def skills(self, text: str) -> set[str]:
+        return set(self.counts(text))
+
+
+@lru_cache(maxsize=1)
+def get_automaton() -> SkillAutomaton:
+    return SkillAutomaton(SKILL_TAXONOMY)
+
+
+def extract_skills(text: str) -> set[str]:
+    return get_automaton().skills(text)
+
+
+_YEAR = re.compile(r"\b(19[89]\d|20\d\d)\b")
+_RANGE = re.compile(r"\b(19[89]\d|20\d\d)\s*(?:-|–|—|to)\s*(?:(19[89]\d|20\d\d)|(present|current|now|today))\b",
+                    re.IGNORECASE)
+_YEARS_OF_EXPERIENCE = re.compile(r"\b(\d{1,2})\+?\s*(?:years|yrs)\b[^.\n]{0,30}?\bexperience", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _index_section(title: str, text: str, this_year: int):
+    """Skill counts, latest year per skill, earliest dated start and stated years for one resume section.
+
+    Cached per section, so editing one section of a resume only re-scans that section.
+    A dated line (``2021 - Present``) starts an entry; skills below it get its latest year
+    until the next dated line. Date ranges under Education are not experience.
+    """
+    line_starts, line_years = [], []
+    current, earliest, pos = None, None, 0
+    education = title.lower().startswith("education")
+    for line in text.splitlines(keepends=True):
+        ranges = _RANGE.findall(line)
+        years = [int(y) for y in _YEAR.findall(line) if int(y) <= this_year]
+        if any(open_end for _, _, open_end in ranges):
+            years.append(this_year)
+        if years:
+            current = max(years)
+        if ranges and not education:
+            start = min(int(r[0]) for r in ranges)
+            earliest = start if earliest is None else min(earliest, start)
+        line_starts.append(pos)
+        line_years.append(current)
+        pos += len(line)
+
+    matches = get_automaton().find(text)
+    skill_years: dict[str, int] = {}
+    for start, _, skill in matches:
+        year = line_years[bisect.bisect_right(line_starts, start) - 1] if line_starts else None
+        if year is not None and year > skill_years.get(skill, 0):
+            skill_years[skill] = year
+    stated = _YEARS_OF_EXPERIENCE.search(text)
+    counts = Counter(skill for _, _, skill in matches)
+    return tuple(counts.items()), tuple(skill_years.items()), earliest, int(stated.group(1)) if stated else None
+
+
+class SkillProfile(BaseModel):
+    """What we know about the candidate's skills; shared by every workflow for the same inputs."""
+
+    key: str = Field(..., description="Content hash of the resume and sidebar profile")
+    skills: list[str] = Field(default_factory=list, description="Canonical skills from resume and sidebar")
+    resume_skills: dict[str, int] = Field(default_factory=dict, description="Canonical skill -> mentions in resume")
+    sidebar_skills: list[str] = Field(default_factory=list, description="Canonical skills listed in the sidebar")
+    unrecognized_skills: list[str] = Field(default_factory=list, description="Sidebar skills not in the taxonomy")
+    experience_years: int | None = Field(None, description="From the sidebar, else derived from the resume")
+    skill_years: dict[str, int] = Field(default_factory=dict, description="Canonical skill -> latest year used")
+
+
+@lru_cache(maxsize=32)
+def _build_profile(resume_text: str, sidebar_skills: str, experience_years) -> SkillProfile:
+    automaton = get_automaton()
+    this_year = datetime.date.today().year
+    resume_counts, skill_years, earliest, stated = Counter(), {}, None, None
+    for title, body in split_sections(resume_text):
+        counts, years, start, said = _index_section(title, body, this_year)
+        resume_counts.update(dict(counts))
+        for skill, year in years:
+            skill_years[skill] = max(year, skill_years.get(skill, 0))
+        if start is not None:
+            earliest = start if earliest is None else min(earliest, start)
+        stated = stated if stated is not None else said
+    resume_years = stated if stated is not None else (this_year - earliest if earliest is not None else None)
+    sidebar, unrecognized = [], []
+    for item in re.split(r"[,\n;]+", sidebar_skills):
+        item = item.strip()
+        if not item:
+            continue
+        found = automaton.skills(item)
+        sidebar.extend(sorted(found - set(sidebar)))
+        if not found:
+            unrecognized.append(item)
+    key = hashlib.sha1(f"{resume_text}\x1f{sidebar_skills}\x1f{experience_years}".encode("utf-8")).hexdigest()
+    years = int(experience_years) if str(experience_years).isdigit() else resume_years
+    return SkillProfile(
+        key=key,
+        skills=sorted(set(resume_counts) | set(sidebar)),
+        resume_skills=dict(resume_counts.most_common()),
+        sidebar_skills=sidebar,
+        unrecognized_skills=unrecognized,
+        experience_years=years,
+        skill_years=skill_years,
+    )
+
+
+def profile_index(resume_text: str = "", user_profile: dict | None = None) -> SkillProfile:
+    """The candidate's ``SkillProfile``; recomputed only when the resume or sidebar fields change."""
+    user_profile = user_profile or {}
+    skills = user_profile.get("skills") or ""
+    if isinstance(skills, (list, tuple)):
+        skills = ", ".join(map(str, skills))
+    return _build_profile(resume_text or "", str(skills), user_profile.get("experience_years"))